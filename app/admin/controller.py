@@ -0,0 +1,89 @@
+# Endpoints de Administración (diagnóstico del worker)
+
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config.settings import settings
+from app.utils.dependencies import require_admin
+from app.utils.exceptions import ProfileNotFoundException, ProfilerBusyException, ValidationException
+from app.utils.profiler import SamplingProfiler, acquire_profiler, release_profiler, request_profiles
+from app.admin.schemas import ProfileSummary, RequestProfileInfo
+
+# Configuración del Router (todo el módulo es solo para administradores)
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+PROFILE_FORMATS = ("collapsed", "json")
+
+
+def _render(profiler: SamplingProfiler, format: str):
+    if format == "json":
+        return ProfileSummary(**profiler.summary())
+    # Texto para flamegraph.pl / speedscope / inferno
+    return PlainTextResponse(profiler.collapsed())
+
+# Endpoints de Perfilado -->
+
+@router.post(
+    "/profile",
+    summary="Perfilar el worker (Admin)",
+    description=(
+        "Muestrea las pilas de todos los hilos de este worker durante `seconds` "
+        "segundos. `collapsed` retorna una pila por línea (formato de flamegraph); "
+        "`json` un resumen por categoría y función"
+    ),
+    responses={200: {"content": {"text/plain": {}, "application/json": {}}}}
+)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(settings.PROFILER_INTERVAL_MS, ge=1, le=1000),
+    format: str = Query("collapsed", description="collapsed o json")
+):
+    if not settings.PROFILER_ENABLED:
+        raise ValidationException("El profiler está desactivado")
+    if format not in PROFILE_FORMATS:
+        raise ValidationException(f"Formato debe ser uno de: {', '.join(PROFILE_FORMATS)}")
+    if not acquire_profiler():
+        raise ProfilerBusyException()
+
+    profiler = SamplingProfiler(interval_ms / 1000)
+    try:
+        # Mientras tanto el event loop sigue atendiendo (y se perfila) el tráfico
+        profiler.start()
+        await asyncio.sleep(seconds)
+    finally:
+        await asyncio.to_thread(profiler.stop)
+        release_profiler()
+
+    return _render(profiler, format)
+
+
+@router.get(
+    "/profiles",
+    response_model=List[RequestProfileInfo],
+    summary="Perfiles de peticiones (Admin)",
+    description="Últimas peticiones perfiladas con el encabezado X-Profile: 1 en este worker"
+)
+async def list_request_profiles():
+    return [profile.info() for profile in request_profiles.list()]
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Perfil de una petición (Admin)",
+    description="El id es el del encabezado X-Profile-Id de la respuesta perfilada",
+    responses={200: {"content": {"text/plain": {}, "application/json": {}}}}
+)
+async def get_request_profile(
+    profile_id: str,
+    format: str = Query("collapsed", description="collapsed o json")
+):
+    if format not in PROFILE_FORMATS:
+        raise ValidationException(f"Formato debe ser uno de: {', '.join(PROFILE_FORMATS)}")
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise ProfileNotFoundException(profile_id)
+    return _render(profile.profiler, format)
@@ -0,0 +1,28 @@
+# Esquemas para el módulo de Administración
+
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class FunctionSamples(BaseModel):
+    function: str = Field(..., description="módulo:función")
+    self_samples: int
+    self_percent: float
+
+class ProfileSummary(BaseModel):
+    samples: int = Field(..., description="Muestras con el hilo trabajando")
+    idle_samples: int = Field(..., description="Muestras con el hilo esperando (no cuentan)")
+    duration_seconds: float
+    interval_ms: float
+    categories: Dict[str, float] = Field(..., description="Porcentaje de muestras por categoría (bcrypt, pydantic, sqlalchemy...)")
+    top_functions: List[FunctionSamples]
+
+class RequestProfileInfo(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    duration_ms: float
+    samples: int
+    created_at: datetime
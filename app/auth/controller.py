@@ -5,18 +5,23 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.utils.database import get_db
+from app.utils.database import get_db, get_read_db
 from app.utils.dependencies import get_current_user, require_admin, validate_pagination
+from app.utils.rate_limit import login_ip_limiter, login_account_limiter, register_ip_limiter
+from app.utils.idempotency import IdempotentRoute, not_idempotent
 from app.auth.service import UserService
 from app.auth.schemas import (
     UserCreate, UserLogin, UserResponse, UserUpdate, UserCreateByAdmin,
-    Token, UserList, UserSummary
+    Token, UserList, UserSummary,
+    BulkUserSelection, BulkRoleChange, BulkUserResult
 )
 
 # Configuración del Router
 
 # Crear router para agrupar endpoints de autenticación
-router = APIRouter()
+# (los POST aceptan Idempotency-Key para que los reintentos no se repitan;
+# /login no, para no guardar el token en memoria)
+router = APIRouter(route_class=IdempotentRoute)
 
 # Esquema de seguridad para documentación Swagger
 security = HTTPBearer()
@@ -28,7 +33,8 @@ security = HTTPBearer()
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Registrar nuevo usuario",
-    description="Permite a una persona crear una cuenta nueva en el sistema"
+    description="Permite a una persona crear una cuenta nueva en el sistema",
+    dependencies=[Depends(register_ip_limiter)]
 )
 async def register(
     user_data: UserCreate,
@@ -45,8 +51,10 @@ async def register(
     "/login",
     response_model=Token,
     summary="Iniciar sesión",
-    description="Autenticar usuario y obtener token JWT"
+    description="Autenticar usuario y obtener token JWT",
+    dependencies=[Depends(login_ip_limiter), Depends(login_account_limiter)]
 )
+@not_idempotent
 async def login(
     credentials: UserLogin,
     db: Session = Depends(get_db)
@@ -73,9 +81,12 @@ async def login(
     description="Obtener datos del usuario autenticado"
 )
 async def get_my_profile(
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    return current_user
+    # La dependencia solo trae la identidad: la entidad completa se carga aquí
+    user_service = UserService(db)
+    return await user_service.get_user_by_id(current_user.id)
 
 
 @router.put(
@@ -91,9 +102,10 @@ async def update_my_profile(
 ):
     user_service = UserService(db)
     
-    # Si no es admin, quitar el campo rol del update
-    if current_user.rol != "admin":
-        user_data.rol = None
+    # Si no es admin, quitar el campo rol del update (sin marcarlo como
+    # enviado: un rol None rompería la restricción NOT NULL)
+    if not current_user.is_admin() and "rol" in user_data.model_fields_set:
+        user_data = UserUpdate(**user_data.model_dump(exclude_unset=True, exclude={"rol"}))
     
     updated_user = await user_service.update_user(current_user.id, user_data)
     return updated_user
@@ -110,7 +122,7 @@ async def update_my_profile(
 async def get_all_users(
     pagination: tuple = Depends(validate_pagination),
     include_inactive: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     skip, limit = pagination
     user_service = UserService(db)
@@ -148,7 +160,7 @@ async def create_user_by_admin(
 )
 async def get_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user_service = UserService(db)
     user = await user_service.get_user_by_id(user_id)
@@ -226,6 +238,67 @@ async def activate_user(
     activated_user = await user_service.activate_user(user_id)
     return activated_user
 
+# Endpoints de Operaciones Masivas --> Admin (por ids y/o filtros, con tope por petición)
+
+@router.post(
+    "/users/bulk/deactivate",
+    response_model=BulkUserResult,
+    summary="Desactivar usuarios en bloque (Admin)",
+    description="Desactivar los usuarios seleccionados con una sola sentencia"
+)
+async def bulk_deactivate_users(
+    selection: BulkUserSelection,
+    current_user = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    user_service = UserService(db)
+    return await user_service.bulk_set_active(selection, False, current_user.id)
+
+
+@router.post(
+    "/users/bulk/activate",
+    response_model=BulkUserResult,
+    summary="Activar usuarios en bloque (Admin)",
+    description="Reactivar los usuarios seleccionados con una sola sentencia"
+)
+async def bulk_activate_users(
+    selection: BulkUserSelection,
+    current_user = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    user_service = UserService(db)
+    return await user_service.bulk_set_active(selection, True, current_user.id)
+
+
+@router.post(
+    "/users/bulk/role",
+    response_model=BulkUserResult,
+    summary="Cambiar rol en bloque (Admin)",
+    description="Asignar el mismo rol a los usuarios seleccionados"
+)
+async def bulk_change_role(
+    selection: BulkRoleChange,
+    current_user = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    user_service = UserService(db)
+    return await user_service.bulk_change_role(selection, current_user.id)
+
+
+@router.post(
+    "/users/bulk/delete",
+    response_model=BulkUserResult,
+    summary="Eliminar usuarios en bloque (Admin)",
+    description="Eliminar permanentemente los usuarios seleccionados y sus reservas"
+)
+async def bulk_delete_users(
+    selection: BulkUserSelection,
+    current_user = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    user_service = UserService(db)
+    return await user_service.bulk_delete_users(selection, current_user.id)
+
 # Endpoints de Estadística --> Admin
 
 @router.get(
@@ -235,7 +308,7 @@ async def activate_user(
     dependencies=[Depends(require_admin)]
 )
 async def get_users_stats(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user_service = UserService(db)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Enum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -59,6 +59,27 @@ class User(Base):
         nullable=False       
     )
     
+    # Sistema de penalizaciones -->
+    # Contador de cancelaciones del mes en curso (se reinicia al cambiar de mes)
+    cancelaciones_mes = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    
+    # Primer día del mes al que pertenece el contador
+    cancelaciones_periodo = Column(
+        Date,
+        nullable=True
+    )
+    
+    # Fecha hasta la que el usuario no puede reservar (inclusive)
+    penalized_until = Column(
+        Date,
+        nullable=True
+    )
+    
     # Fecha de creación --> Se llena automáticamente
     created_at = Column(
         DateTime(timezone=True),           
@@ -78,7 +99,9 @@ class User(Base):
     reservas = relationship(
         "Reservation",           
         back_populates="usuario",  
-        cascade="all, delete-orphan"  # Si elimino user, elimina sus reservas
+        cascade="all, delete-orphan",  # Si elimino user, elimina sus reservas
+        # La base de datos las borra (ON DELETE CASCADE) sin cargarlas
+        passive_deletes=True
     )
     
     def __repr__(self):
@@ -91,6 +114,7 @@ class User(Base):
             "email": self.email,
             "rol": self.rol.value,  # .value convierte el Enum a string
             "is_active": self.is_active,
+            "penalized_until": self.penalized_until.isoformat() if self.penalized_until else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
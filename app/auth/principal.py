@@ -0,0 +1,124 @@
+# Identidad del Usuario Autenticado (sin la entidad del ORM)
+
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from app.auth.model import User, UserRole
+from app.utils.invalidation import invalidation_bus, CHANNEL_USERS
+from app.config.settings import settings
+
+
+class Principal:
+    """
+    Lo que las dependencias de autenticación necesitan del usuario: id,
+    email, rol, estado y penalización. Es inmutable y no pertenece a ninguna
+    sesión, así que se comparte entre peticiones y nunca dispara consultas.
+
+    Los endpoints que necesitan la entidad completa (ej: para responder con
+    UserResponse) la cargan con UserService.get_user_by_id(principal.id).
+    """
+
+    __slots__ = ("id", "email", "rol", "is_active", "penalized_until")
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        rol: UserRole,
+        is_active: bool,
+        penalized_until: Optional[date] = None
+    ):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "email", email)
+        object.__setattr__(self, "rol", rol)
+        object.__setattr__(self, "is_active", is_active)
+        object.__setattr__(self, "penalized_until", penalized_until)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Principal es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Principal es inmutable")
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, email='{self.email}', rol='{self.rol.value}')>"
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.email, user.rol, user.is_active, user.penalized_until)
+
+    # Mismos permisos que User -->
+
+    def is_admin(self) -> bool:
+        return self.rol == UserRole.ADMIN
+
+    def can_make_reservation(self) -> bool:
+        return self.is_active
+
+    def can_admin_rooms(self) -> bool:
+        return self.is_active and self.rol == UserRole.ADMIN
+
+    def can_view_all_reservations(self) -> bool:
+        return self.is_active and self.rol == UserRole.ADMIN
+
+
+class PrincipalCache:
+    """
+    Principals por id con TTL (una entrada por usuario activo en el proceso).
+    Cualquier cambio en el usuario (rol, estado, penalización, borrado) debe
+    publicar su id en CHANNEL_USERS; "*" vacía la caché.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # user_id -> (vence, principal)
+        self._entries: Dict[int, Tuple[float, Principal]] = {}
+        # Aumenta con cada invalidación: una carga que empezó antes no se guarda
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, principal: Principal, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for key in [k for k, e in self._entries.items() if e[0] < now]:
+                    del self._entries[key]
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def _on_message(self, key: str) -> None:
+        if key == "*":
+            self.clear()
+        else:
+            self.invalidate(int(key))
+
+
+# Instancia global de la caché (una por proceso)
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SECONDS)
+invalidation_bus.subscribe(CHANNEL_USERS, principal_cache._on_message)
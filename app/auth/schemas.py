@@ -1,18 +1,20 @@
 # Estructuración de Datos
 
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
+from typing import Annotated, List, Optional
+from datetime import datetime, date
 from app.auth.model import UserRole
 
+# Tipos reutilizables (las restricciones se validan en el núcleo compilado)
+NombreStr = Annotated[str, Field(min_length=2, max_length=100)]
+PasswordStr = Annotated[str, Field(min_length=8, max_length=50)]
+
 # Estructura Registro de Usuario
 
 class UserCreate(BaseModel):
     
-    nombre: str = Field(
-        ...,  
-        min_length=2,
-        max_length=100,
+    nombre: NombreStr = Field(
+        ...,
         description="Nombre completo del usuario"
     )
     
@@ -21,15 +23,14 @@ class UserCreate(BaseModel):
         description="Email válido del usuario"
     )
     
-    password: str = Field(
+    password: PasswordStr = Field(
         ...,
-        min_length=8,
-        max_length=50,
         description="Contraseña (mínimo 8 caracteres)"
     )
     
-    @validator('nombre')
-    def validate_nombre(cls, v):
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre(cls, v: str) -> str:
         
         # Eliminar espacios extra
         v = v.strip()
@@ -44,10 +45,10 @@ class UserCreate(BaseModel):
             
         return v.title()  # Convierte a formato título: "Juan Pérez"
     
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('La contraseña debe tener al menos 8 caracteres')
+    @field_validator('password')
+    @classmethod
+    def validate_password(cls, v: str) -> str:
+        # La longitud ya la valida PasswordStr
         
         # Verificar que tenga al menos una mayúscula
         if not any(c.isupper() for c in v):
@@ -85,15 +86,16 @@ class UserResponse(BaseModel):
     email: str
     rol: UserRole
     is_active: bool
+    penalized_until: Optional[date] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
+    model_config = ConfigDict(
         # Permite que Pydantic trabaje con objetos SQLAlchemy
-        from_attributes = True
+        from_attributes=True,
         
         # Ejemplo de respuesta en la documentación de Swagger
-        schema_extra = {
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "nombre": "Juan Pérez",
@@ -104,6 +106,7 @@ class UserResponse(BaseModel):
                 "updated_at": "2024-01-15T10:30:00"
             }
         }
+    )
 
 class UserSummary(BaseModel):
     id: int
@@ -112,8 +115,7 @@ class UserSummary(BaseModel):
     rol: UserRole
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Estructura para JWT 
 
@@ -139,8 +141,8 @@ class Token(BaseModel):
         description="Información básica del usuario autenticado"
     )
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...",
                 "token_type": "bearer",
@@ -154,6 +156,7 @@ class Token(BaseModel):
                 }
             }
         }
+    )
 
 class TokenData(BaseModel):
     """
@@ -166,11 +169,7 @@ class TokenData(BaseModel):
 # Estructuras de Administración
 
 class UserUpdate(BaseModel):
-    nombre: Optional[str] = Field(
-        None,
-        min_length=2,
-        max_length=100
-    )
+    nombre: Optional[NombreStr] = None
     
     email: Optional[EmailStr] = None
     
@@ -179,8 +178,9 @@ class UserUpdate(BaseModel):
     # Solo admin puede cambiar roles
     rol: Optional[UserRole] = None
     
-    @validator('nombre')
-    def validate_nombre_update(cls, v):
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre_update(cls, v: Optional[str]) -> Optional[str]:
         if v is not None:
             v = v.strip()
             if not v:
@@ -190,14 +190,15 @@ class UserUpdate(BaseModel):
 
 class UserCreateByAdmin(BaseModel):
     
-    nombre: str = Field(..., min_length=2, max_length=100)
+    nombre: NombreStr
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=50)
+    password: PasswordStr
     rol: UserRole = Field(default=UserRole.USER)
     is_active: bool = Field(default=True)
     
-    @validator('nombre')
-    def validate_nombre(cls, v):
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre(cls, v: str) -> str:
         return v.strip().title()
 
 # Estructura para Listados
@@ -209,8 +210,8 @@ class UserList(BaseModel):
     per_page: int
     pages: int
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "users": [
                     {
@@ -226,4 +227,42 @@ class UserList(BaseModel):
                 "per_page": 10,
                 "pages": 5
             }
-        }
\ No newline at end of file
+        }
+    )
+
+# Operaciones Masivas (Admin) -->
+
+class BulkUserFilter(BaseModel):
+    rol: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+    email_domain: Optional[str] = Field(None, description="Dominio del email (ej: empresa.com)")
+    created_before: Optional[datetime] = None
+
+    @field_validator('email_domain')
+    @classmethod
+    def validate_email_domain(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            v = v.strip().lstrip("@").lower()
+            if not v or "@" in v:
+                raise ValueError('El dominio no es válido')
+        return v
+
+class BulkUserSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, description="IDs de los usuarios")
+    filter: Optional[BulkUserFilter] = Field(None, description="Con ids, solo los que además cumplan el filtro")
+
+    @model_validator(mode='after')
+    def validate_selection(self) -> 'BulkUserSelection':
+        # Sin ids ni filtro la operación alcanzaría a todos los usuarios
+        has_filter = self.filter is not None and bool(self.filter.model_dump(exclude_none=True))
+        if not self.ids and not has_filter:
+            raise ValueError('Debe indicar ids o al menos un filtro')
+        return self
+
+class BulkRoleChange(BulkUserSelection):
+    rol: UserRole
+
+class BulkUserResult(BaseModel):
+    matched: int = Field(..., description="Usuarios seleccionados")
+    affected: int = Field(..., description="Usuarios modificados (los que ya estaban así no cuentan)")
+    ids: List[int]
@@ -1,29 +1,72 @@
 # Lógica de Negocio
 
+from collections import defaultdict
+from sqlalchemy import select, update, delete, func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import Optional, List
-from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Sequence
 from app.auth.model import User, UserRole
-from app.auth.schemas import UserCreate, UserUpdate, UserCreateByAdmin
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.auth.principal import Principal, principal_cache
+from app.auth.schemas import (
+    UserCreate, UserUpdate, UserCreateByAdmin,
+    BulkUserSelection, BulkRoleChange, BulkUserResult
+)
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.reservations.availability import hour_bit, publish_availability_change
+from app.reservations.expiry import reservation_expiry
+from app.utils.security import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_LIFETIME
 from app.utils.exceptions import (
     UserAlreadyExistsException, 
     UserNotFoundException,
     InvalidCredentialsException,
-    InactiveUserException
+    InactiveUserException,
+    ValidationException,
+    BulkLimitExceededException
+)
+from app.utils.invalidation import (
+    invalidation_bus, CHANNEL_USERS, CHANNEL_USER_HOURS, CHANNEL_USER_RESERVATIONS
 )
+from app.utils.clock import Clock, get_clock
+from app.utils.singleflight import single_flight
+from app.utils.tracing import traced_methods
 from app.config.settings import settings
 
+@traced_methods("UserService")
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, clock: Optional[Clock] = None):
         self.db = db
+        self.clock = clock or get_clock()
 
     # Métodos de Consulta -->
     
-    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+    # Las peticiones simultáneas por el mismo usuario comparten la consulta
+    @single_flight("users.by_id", merge=True)
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
     
+    # Lo usan las dependencias de autenticación: sin entidad del ORM ni sesión
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        if principal_cache.enabled:
+            principal = principal_cache.get(user_id)
+            if principal is not None:
+                return principal
+        return await self._load_principal(user_id)
+    
+    @single_flight("users.principal")
+    def _load_principal(self, user_id: int) -> Optional[Principal]:
+        generation = principal_cache.generation
+        row = (
+            self.db.query(User.id, User.email, User.rol, User.is_active, User.penalized_until)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row is None:
+            return None
+        principal = Principal(*row)
+        if principal_cache.enabled:
+            principal_cache.set(principal, generation)
+        return principal
+    
     async def get_user_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
     
@@ -139,8 +182,7 @@ class UserService:
         }
         
         # Crear token con tiempo de expiración
-        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(token_data, expires_delta)
+        access_token = create_access_token(token_data, ACCESS_TOKEN_LIFETIME)
         
         return {
             "access_token": access_token,
@@ -159,18 +201,19 @@ class UserService:
             raise UserNotFoundException(user_id)
         
         # 2. Actualizar campos que vengan en el request
-        update_data = user_data.dict(exclude_unset=True)  # Solo campos no None
+        update_data = user_data.model_dump(exclude_unset=True)  # Solo campos no None
         
         for field, value in update_data.items():
             if hasattr(user, field):
                 setattr(user, field, value)  # user.nombre = "Nuevo Nombre"
         
         # 3. Actualizar timestamp
-        user.updated_at = datetime.utcnow()
+        user.updated_at = self.clock.now()
         
         try:
             self.db.commit()
             self.db.refresh(user)
+            invalidation_bus.publish(CHANNEL_USERS, str(user_id))
             return user
             
         except IntegrityError:
@@ -186,10 +229,11 @@ class UserService:
             raise UserNotFoundException(user_id)
         
         user.is_active = False
-        user.updated_at = datetime.utcnow()
+        user.updated_at = self.clock.now()
         
         self.db.commit()
         self.db.refresh(user)
+        invalidation_bus.publish(CHANNEL_USERS, str(user_id))
         return user
     
     async def activate_user(self, user_id: int) -> User:
@@ -198,10 +242,11 @@ class UserService:
             raise UserNotFoundException(user_id)
         
         user.is_active = True
-        user.updated_at = datetime.utcnow()
+        user.updated_at = self.clock.now()
         
         self.db.commit()
         self.db.refresh(user)
+        invalidation_bus.publish(CHANNEL_USERS, str(user_id))
         return user
     
     # Métodos de Eliminación -->
@@ -211,6 +256,125 @@ class UserService:
         if not user:
             raise UserNotFoundException(user_id)
         
+        # Las reservas se borran con ON DELETE CASCADE (sin cargarlas)
+        released = self._active_reservations([user_id])
         self.db.delete(user)
         self.db.commit()
-        return True
\ No newline at end of file
+        
+        invalidation_bus.publish(CHANNEL_USERS, str(user_id))
+        self._publish_users_deleted([user_id], released)
+        return True
+    
+    def _active_reservations(self, user_ids: Sequence[int]) -> list:
+        # Antes del DELETE: bloques que se liberan y pendientes con temporizador
+        return self.db.execute(
+            select(
+                Reservation.id,
+                Reservation.sala_id,
+                Reservation.fecha,
+                Reservation.hora_inicio,
+                Reservation.estado
+            )
+            .where(
+                Reservation.usuario_id.in_(user_ids),
+                Reservation.estado.in_(ACTIVE_STATUSES),
+                Reservation.fecha >= self.clock.today()
+            )
+        ).all()
+    
+    def _publish_users_deleted(self, user_ids: Sequence[int], released: list) -> None:
+        # Un mensaje por (sala, fecha) con todos los bloques liberados
+        masks: Dict[tuple, int] = defaultdict(int)
+        for reservation_id, sala_id, fecha, hora_inicio, estado in released:
+            masks[(sala_id, fecha)] |= hour_bit(hora_inicio)
+            if estado == ReservationStatus.PENDIENTE:
+                reservation_expiry.cancel(reservation_id)
+        for (sala_id, fecha), mask in masks.items():
+            publish_availability_change(sala_id, fecha, released=mask)
+        
+        for user_id in user_ids:
+            invalidation_bus.publish(CHANNEL_USER_HOURS, str(user_id))
+            invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(user_id))
+    
+    # Operaciones Masivas --> (sentencias sobre el conjunto, sin cargar entidades)
+    
+    def _select_bulk_ids(self, selection: BulkUserSelection, admin_id: int) -> List[int]:
+        limit = settings.MAX_BULK_USER_OPERATIONS
+        ids = set(selection.ids or ())
+        if admin_id in ids:
+            raise ValidationException("No puedes incluir tu propia cuenta en una operación masiva")
+        if len(ids) > limit:
+            raise BulkLimitExceededException(limit)
+        
+        # El admin que ejecuta nunca entra por un filtro
+        query = select(User.id).where(User.id != admin_id)
+        if ids:
+            query = query.where(User.id.in_(ids))
+        
+        filters = selection.filter
+        if filters is not None:
+            if filters.rol is not None:
+                query = query.where(User.rol == filters.rol)
+            if filters.is_active is not None:
+                query = query.where(User.is_active == filters.is_active)
+            if filters.email_domain:
+                query = query.where(
+                    func.lower(User.email).endswith(f"@{filters.email_domain}", autoescape=True)
+                )
+            if filters.created_before is not None:
+                query = query.where(User.created_at < filters.created_before)
+        
+        # Uno más que el máximo basta para saber si se pasa
+        matched = self.db.execute(query.order_by(User.id).limit(limit + 1)).scalars().all()
+        if len(matched) > limit:
+            raise BulkLimitExceededException(limit)
+        return list(matched)
+    
+    def _bulk_update(self, ids: List[int], changed, **values) -> int:
+        # `changed` deja fuera a los que ya tienen el valor: rowcount = modificados
+        result = self.db.execute(
+            update(User)
+            .where(User.id.in_(ids), changed)
+            .values(**values, updated_at=self.clock.now())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    async def bulk_set_active(
+        self,
+        selection: BulkUserSelection,
+        is_active: bool,
+        admin_id: int
+    ) -> BulkUserResult:
+        ids = self._select_bulk_ids(selection, admin_id)
+        affected = self._bulk_update(ids, User.is_active != is_active, is_active=is_active) if ids else 0
+        
+        if affected:
+            invalidation_bus.publish(CHANNEL_USERS, "*")
+        return BulkUserResult(matched=len(ids), affected=affected, ids=ids)
+    
+    async def bulk_change_role(self, selection: BulkRoleChange, admin_id: int) -> BulkUserResult:
+        ids = self._select_bulk_ids(selection, admin_id)
+        affected = self._bulk_update(ids, User.rol != selection.rol, rol=selection.rol) if ids else 0
+        
+        if affected:
+            invalidation_bus.publish(CHANNEL_USERS, "*")
+        return BulkUserResult(matched=len(ids), affected=affected, ids=ids)
+    
+    async def bulk_delete_users(self, selection: BulkUserSelection, admin_id: int) -> BulkUserResult:
+        ids = self._select_bulk_ids(selection, admin_id)
+        if not ids:
+            return BulkUserResult(matched=0, affected=0, ids=[])
+        
+        released = self._active_reservations(ids)
+        result = self.db.execute(
+            delete(User)
+            .where(User.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        
+        invalidation_bus.publish(CHANNEL_USERS, "*")
+        self._publish_users_deleted(ids, released)
+        return BulkUserResult(matched=len(ids), affected=result.rowcount, ids=ids)
\ No newline at end of file
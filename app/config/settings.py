@@ -1,7 +1,7 @@
 # Configuración de la Aplicación usando Pydantic Settings
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -11,6 +11,36 @@ class Settings(BaseSettings):
     APP_NAME: str = "Coworking Booking API"
     DEBUG: bool = True
     VERSION: str = "1.0.0"
+    ENVIRONMENT: str = "development"  # "development" o "production"
+    
+    @property
+    def is_production(self) -> bool:
+        return self.ENVIRONMENT == "production"
+    
+    # Logging (JSON por una cola, sin bloquear las peticiones)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" o "text"
+    LOG_QUEUE_SIZE: int = 10000  # Registros en espera; si se llena se descartan
+    LOG_ACCESS_ENABLED: bool = True
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0  # Fracción de peticiones registradas
+    LOG_ACCESS_SAMPLE_ROUTES: Dict[str, float] = {"/health": 0.0}  # Por prefijo de ruta
+    LOG_SLOW_REQUEST_MS: int = 1000  # Las peticiones lentas se registran siempre
+    SQL_ECHO: bool = False  # Registrar cada sentencia SQL (nunca en producción)
+    
+    # Trazas (formato OpenTelemetry, sin collector externo)
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.01  # Fracción de peticiones trazadas (si no llega traceparent)
+    TRACING_EXPORTER: str = "memory"  # "memory", "file" (OTLP/JSON por línea) o "none"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_MEMORY_MAX_SPANS: int = 10000
+    TRACING_QUEUE_SIZE: int = 1000  # Trazas en espera de exportar; si se llena se descartan
+    
+    # Profiler estadístico (endpoint de admin y encabezado X-Profile)
+    PROFILER_ENABLED: bool = True
+    PROFILER_INTERVAL_MS: float = 5  # Tiempo entre muestras de las pilas
+    PROFILER_MAX_SECONDS: int = 60  # Duración máxima de un perfil del worker
+    PROFILER_REQUEST_HEADER_ENABLED: bool = True  # Perfilar una petición con X-Profile: 1 (solo admins)
+    PROFILER_MAX_STORED: int = 50  # Perfiles de petición guardados por worker
     
     # Base de datos MySQL
     DB_HOST: str = "localhost"
@@ -23,20 +53,119 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    # Réplicas de lectura: "host1:3306,host2:3306" (mismo usuario y base de datos)
+    DB_REPLICA_HOSTS: str = ""
+    DB_REPLICA_RETRY_SECONDS: int = 30  # Tiempo fuera de servicio tras un fallo
+    READ_YOUR_WRITES_SECONDS: int = 5  # Tiempo que un usuario lee del primario tras escribir
+    
+    @property
+    def REPLICA_DATABASE_URLS(self) -> list[str]:
+        urls = []
+        for host in filter(None, (h.strip() for h in self.DB_REPLICA_HOSTS.split(","))):
+            if ":" not in host:
+                host = f"{host}:{self.DB_PORT}"
+            urls.append(f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{host}/{self.DB_NAME}")
+        return urls
+    
+    # Pool de conexiones
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 300  # Segundos antes de reciclar una conexión
+    DB_POOL_TIMEOUT: int = 30  # Segundos máximos esperando una conexión libre
+    DB_POOL_PRE_PING: str = "idle"  # "always" (cada checkout), "idle" (solo si estuvo inactiva) u "off"
+    DB_POOL_PRE_PING_IDLE_SECONDS: int = 30
+    DB_POOL_ADAPTIVE: bool = False  # Ajustar el tamaño según la concurrencia observada
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 30
+    DB_POOL_ADAPT_INTERVAL_SECONDS: int = 60
+    
+    # Outbox de eventos de dominio
+    OUTBOX_ENABLED: bool = True  # Iniciar el despachador en este proceso
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10  # Después de esto el evento queda como "dead letter"
+    OUTBOX_MAX_POLL_INTERVAL_SECONDS: float = 30.0  # Sin eventos el sondeo se espacia hasta aquí
+    OUTBOX_LEASE_SECONDS: float = 60.0  # Un evento reclamado no se reparte durante este plazo
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0  # Espera tras el primer fallo (se duplica en cada uno)
+    OUTBOX_RETRY_MAX_SECONDS: float = 600.0
+    OUTBOX_RETENTION_DAYS: int = 7  # Luego se borran los entregados y los "dead letters"
+    OUTBOX_CLEANUP_INTERVAL_SECONDS: float = 3600.0
+    
     # Configuración JWT
     SECRET_KEY: str = "281209"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Zonas horarias (IANA). Las fechas de reserva son locales a la sede
+    TIMEZONE: str = "UTC"  # Zona por defecto (ej: "America/Bogota")
+    SEDE_TIMEZONES: Dict[str, str] = {}  # JSON: {"Campus Norte": "America/Bogota"}
+    
     # Configuración de reservas
     RESERVATION_BLOCK_HOURS: int = 1  # Bloques de 1 hora exactos
     MAX_RESERVATION_DAYS_ADVANCE: int = 30  # Máximo 30 días de anticipación
     MAX_DAILY_RESERVATIONS_PER_USER: int = 3  # Máximo 3 reservas por día por usuario
+    RESERVATION_REQUIRES_CONFIRMATION: bool = False  # Crear como pendiente hasta confirmar
+    PENDING_RESERVATION_TTL_MINUTES: int = 15  # Luego de esto la pendiente se libera
+    RESERVATION_EXPIRY_ENABLED: bool = True  # Vencer pendientes desde este proceso
+    RESERVATION_EXPIRY_BATCH_SIZE: int = 500
     
     # Sistema de penalizaciones --> Adicional
     MAX_CANCELLATIONS_PER_MONTH: int = 3  # Máximo 3 cancelaciones por mes
     PENALTY_DAYS: int = 7  # Días de penalización por exceso de cancelaciones
     
+    # Limitación de peticiones (token bucket, peticiones por ventana).
+    # Los contadores viven en memoria de cada worker: con N workers
+    # (WEB_CONCURRENCY) el límite efectivo llega a N× estos valores, salvo
+    # que se configure un backend compartido con set_rate_limit_backend
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_LOGIN_PER_IP: int = 20
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 5
+    RATE_LIMIT_REGISTER_PER_IP: int = 5
+    RATE_LIMIT_BOOKING_PER_IP: int = 120
+    RATE_LIMIT_BOOKING_PER_USER: int = 30
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_TRUST_PROXY: bool = False  # Usar X-Forwarded-For (solo detrás de un proxy confiable)
+    
+    # Idempotency-Key en los POST de autenticación y reservas
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # Cuánto tiempo se puede repetir una respuesta
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000  # Respuestas guardadas en memoria por proceso
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # Espera por un duplicado en curso en otro worker
+    
+    # Operaciones masivas de administración sobre usuarios
+    MAX_BULK_USER_OPERATIONS: int = 500  # Usuarios por petición
+    
+    # Identidad del usuario autenticado (id, rol, estado) cacheada por proceso
+    PRINCIPAL_CACHE_SECONDS: int = 60  # 0 desactiva la caché
+    
+    # Dashboard de reservas del usuario
+    DASHBOARD_UPCOMING_LIMIT: int = 5
+    DASHBOARD_CACHE_SECONDS: int = 60  # 0 desactiva la caché
+    
+    # Reportes de ocupación
+    REPORTS_DEFAULT_RANGE_DAYS: int = 30
+    REPORTS_MAX_RANGE_DAYS: int = 366  # Un año completo como máximo por consulta
+    USER_HOURS_REBUILD_SECONDS: int = 900  # Recarga completa del índice de horas (0 = nunca)
+    
+    # Caché HTTP del catálogo de salas
+    ROOMS_CACHE_MAX_AGE: int = 30  # Segundos que el cliente puede reutilizar la respuesta
+    
+    # Compresión de respuestas
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes mínimos para comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Solo si el paquete brotli está instalado
+    COMPRESSION_THREAD_THRESHOLD: int = 65536  # Desde este tamaño se comprime en un hilo
+    COMPRESSION_CPU_BUDGET: float = 0.5  # Fracción de un núcleo dedicada a comprimir
+    
+    # Invalidación de cachés entre workers
+    INVALIDATION_BACKEND: str = "local"  # "local" (un proceso) o "unix" (varios workers en el mismo host)
+    INVALIDATION_SOCKET_DIR: str = "/tmp/coworking-invalidation"
+    INVALIDATION_QUEUE_SIZE: int = 10000  # Mensajes en espera de envío; si se llena se descartan
+    # Respaldo de los canales con deltas (la entrega entre workers puede perder mensajes)
+    AVAILABILITY_INDEX_TTL_SECONDS: int = 300  # Un día cargado se vuelve a consultar pasado este plazo
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
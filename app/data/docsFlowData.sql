@@ -106,6 +106,17 @@ INSERT INTO rooms (nombre, sede, capacidad, recursos, is_active, created_at) VAL
     '{"proyector": true, "wifi": true}', 
     FALSE, '2024-01-13 12:30:00');
 
+-- Máscara de recursos (la aplicación la mantiene al crear o editar salas)
+UPDATE rooms SET recursos_mask =
+      IF(JSON_CONTAINS(recursos, 'true', '$.proyector'), 1, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.wifi'), 2, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.pizarra'), 4, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.aire_acondicionado'), 8, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.video_conferencia'), 16, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.sonido'), 32, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.computador'), 64, 0)
+    | IF(JSON_CONTAINS(recursos, 'true', '$.tv'), 128, 0);
+
 
 -- DATOS DE RESERVAS
 
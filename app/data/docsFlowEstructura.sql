@@ -19,6 +19,9 @@ CREATE TABLE users (
     contraseña_hash VARCHAR(255) NOT NULL,
     rol ENUM('user', 'admin') NOT NULL DEFAULT 'user',
     is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    cancelaciones_mes INT NOT NULL DEFAULT 0,
+    cancelaciones_periodo DATE NULL,
+    penalized_until DATE NULL,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
     
@@ -41,6 +44,7 @@ CREATE TABLE rooms (
     sede VARCHAR(100) NOT NULL,
     capacidad INT NOT NULL CHECK (capacidad > 0),
     recursos JSON NULL,
+    recursos_mask INT NOT NULL DEFAULT 0,  -- Un bit por recurso disponible (app/rooms/resources.py)
     is_active BOOLEAN NOT NULL DEFAULT TRUE,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
@@ -51,6 +55,7 @@ CREATE TABLE rooms (
     INDEX idx_rooms_capacidad (capacidad),
     INDEX idx_rooms_active (is_active),
     INDEX idx_rooms_sede_nombre (sede, nombre),
+    INDEX idx_rooms_active_recursos (is_active, recursos_mask),
     
     -- Constraint único para nombre-sede
     UNIQUE KEY uk_rooms_nombre_sede (nombre, sede)
@@ -68,7 +73,12 @@ CREATE TABLE reservations (
     fecha DATE NOT NULL,
     hora_inicio TIME NOT NULL,
     hora_fin TIME NOT NULL,
-    estado ENUM('pendiente', 'confirmada', 'cancelada') NOT NULL DEFAULT 'confirmada',
+    estado ENUM('pendiente', 'confirmada', 'cancelada', 'expirada') NOT NULL DEFAULT 'confirmada',
+    expires_at DATETIME NULL DEFAULT NULL,
+    -- 1 si la reserva ocupa su horario, NULL si está cancelada o expirada
+    slot_activo TINYINT GENERATED ALWAYS AS (
+        CASE WHEN LOWER(estado) IN ('pendiente', 'confirmada') THEN 1 END
+    ) STORED,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
     
@@ -79,15 +89,21 @@ CREATE TABLE reservations (
         FOREIGN KEY (sala_id) REFERENCES rooms(id) ON DELETE CASCADE,
     
     -- Índices
-    INDEX idx_reservations_usuario (usuario_id),
-    INDEX idx_reservations_sala (sala_id),
     INDEX idx_reservations_fecha (fecha),
     INDEX idx_reservations_estado (estado),
     INDEX idx_reservations_fecha_hora (fecha, hora_inicio),
-    INDEX idx_reservations_sala_fecha (sala_id, fecha),
     
-    -- Constraint único para evitar solapamiento de reservas
-    UNIQUE KEY uk_reservations_sala_fecha_hora (sala_id, fecha, hora_inicio),
+    -- Índices compuestos (cubren las consultas frecuentes)
+    -- Ocupación por sala y día
+    INDEX idx_reservations_sala_fecha_estado (sala_id, fecha, estado, hora_inicio),
+    -- Cupo diario por usuario
+    INDEX idx_reservations_usuario_fecha_estado (usuario_id, fecha, estado),
+    -- Reservas pendientes y su plazo de confirmación
+    INDEX idx_reservations_estado_expira (estado, expires_at),
+    
+    -- Constraint único para evitar solapamiento de reservas activas
+    -- (los NULL no chocan: canceladas y expiradas liberan el horario)
+    UNIQUE KEY uk_reservations_sala_fecha_hora (sala_id, fecha, hora_inicio, slot_activo),
     
     -- Constraints de validación
     CONSTRAINT chk_reservations_horario 
@@ -96,6 +112,25 @@ CREATE TABLE reservations (
         CHECK (fecha >= CURDATE())
 );
 
+-- TABLA: OUTBOX DE EVENTOS
+
+DROP TABLE IF EXISTS outbox_events;
+
+CREATE TABLE outbox_events (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    event_type VARCHAR(100) NOT NULL,
+    aggregate_id INT NOT NULL,
+    payload JSON NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    dispatched_at DATETIME NULL DEFAULT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    claimed_until DATETIME NULL DEFAULT NULL,
+    last_error VARCHAR(500) NULL,
+    
+    -- Índice para buscar eventos pendientes en orden
+    INDEX idx_outbox_pending (dispatched_at, attempts, id)
+);
+
 -- PROCEDIMIENTOS ALMACENADOS
 
 -- Procedimiento para obtener disponibilidad de una sala en una fecha
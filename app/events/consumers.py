@@ -0,0 +1,67 @@
+# Consumidores del Outbox
+#
+# Los servicios publican en el bus de invalidación justo después del commit,
+# pero esa publicación es "best effort" (si el proceso muere entre el commit
+# y el publish, o el bus pierde el mensaje, las cachés de los demás workers
+# quedan atrasadas). Estos consumidores repiten la invalidación a partir de
+# los eventos del outbox, que se entregan al menos una vez. Solo publican
+# invalidaciones (nunca deltas), así que repetirlas es seguro.
+
+from typing import List, Set
+
+from app.events.dispatcher import outbox_dispatcher
+from app.events.service import (
+    RESERVATION_CANCELLED,
+    RESERVATION_CONFIRMED,
+    RESERVATION_CREATED,
+    RESERVATION_EXPIRED,
+    RESERVATION_RESCHEDULED
+)
+from app.utils.invalidation import (
+    CHANNEL_AVAILABILITY,
+    CHANNEL_USER_HOURS,
+    CHANNEL_USER_RESERVATIONS,
+    invalidation_bus
+)
+
+RESERVATION_EVENTS = (
+    RESERVATION_CREATED,
+    RESERVATION_CANCELLED,
+    RESERVATION_RESCHEDULED,
+    RESERVATION_CONFIRMED,
+    RESERVATION_EXPIRED
+)
+
+
+def invalidate_availability(events: List[dict]) -> None:
+    """Recarga el día de la sala (y el día anterior si se reprogramó)"""
+    keys: Set[str] = set()
+    for event in events:
+        payload = event["payload"]
+        keys.add(f"{payload['sala_id']}:{payload['fecha']}")
+        previous = payload.get("previous")
+        if previous:
+            keys.add(f"{payload['sala_id']}:{previous['fecha']}")
+    for key in sorted(keys):
+        invalidation_bus.publish(CHANNEL_AVAILABILITY, key)
+
+
+def invalidate_dashboards(events: List[dict]) -> None:
+    for usuario_id in sorted({event["payload"]["usuario_id"] for event in events}):
+        invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(usuario_id))
+
+
+def refresh_user_hours(events: List[dict]) -> None:
+    # "<usuario_id>" recarga las horas del usuario desde la base
+    for usuario_id in sorted({event["payload"]["usuario_id"] for event in events}):
+        invalidation_bus.publish(CHANNEL_USER_HOURS, str(usuario_id))
+
+
+def register_consumers() -> None:
+    for event_type in RESERVATION_EVENTS:
+        outbox_dispatcher.register(event_type, invalidate_availability)
+        outbox_dispatcher.register(event_type, invalidate_dashboards)
+        outbox_dispatcher.register(event_type, refresh_user_hours)
+
+
+register_consumers()
@@ -0,0 +1,348 @@
+# Despachador del Outbox (entrega por lotes, al menos una vez)
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.events.model import OutboxEvent
+from app.utils.clock import get_clock
+from app.utils.database import SessionLocal
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Un consumidor recibe la lista de eventos (dicts) de un mismo tipo.
+# Puede ejecutarse más de una vez para el mismo evento: debe ser idempotente.
+EventHandler = Callable[[List[dict]], Union[None, Awaitable[None]]]
+
+
+class OutboxDispatcher:
+    """
+    Lee eventos pendientes del outbox en lotes y los entrega a los
+    consumidores registrados. Un evento se marca como entregado solo si
+    todos sus consumidores terminaron sin error; si no, se reintenta con
+    espera exponencial.
+
+    - Solo se reclaman eventos de tipos con consumidores, y los tipos sin
+      consumidores ni se escriben (add_reservation_event). Sin consumidores
+      el despachador igual arranca para aplicar la retención.
+    - Reclamar es una transacción corta que deja el evento "en préstamo"
+      (claimed_until) y se confirma antes de ejecutar los consumidores; si el
+      worker muere, el evento vuelve a estar disponible al vencer el préstamo.
+    - Sin trabajo, el intervalo de sondeo se duplica hasta `max_poll_interval`
+      (notify() lo despierta al instante en el worker que escribió).
+    - Los eventos entregados y los "dead letters" se borran pasados
+      `retention_days`.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+        max_poll_interval: float = 30.0,
+        lease_seconds: float = 60.0,
+        retry_base_seconds: float = 5.0,
+        retry_max_seconds: float = 600.0,
+        retention_days: int = 7,
+        cleanup_interval: float = 3600.0,
+        cleanup_batch_size: int = 1000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.retention_days = retention_days
+        self.cleanup_interval = cleanup_interval
+        self.cleanup_batch_size = cleanup_batch_size
+        self._handlers: Dict[str, List[EventHandler]] = defaultdict(list)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        self._next_cleanup = 0.0
+
+        # Métricas
+        self.delivered = 0
+        self.failed = 0
+        self.deleted = 0
+        self.last_batch_size = 0
+        self.last_run_at: Optional[float] = None
+
+    # Registro de consumidores -->
+
+    def register(self, event_type: str, handler: EventHandler) -> None:
+        self._handlers[event_type].append(handler)
+
+    def handler(self, event_type: str):
+        """Decorador: @outbox_dispatcher.handler("reservation.created")"""
+        def decorator(func: EventHandler) -> EventHandler:
+            self.register(event_type, func)
+            return func
+        return decorator
+
+    @property
+    def event_types(self) -> List[str]:
+        return sorted(event_type for event_type, handlers in self._handlers.items() if handlers)
+
+    def handles(self, event_type: str) -> bool:
+        return bool(self._handlers.get(event_type))
+
+    # Ciclo de vida -->
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        if not self.event_types:
+            logger.info("Outbox sin consumidores registrados: solo se aplica la retención")
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is None:
+            return
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    def notify(self) -> None:
+        # Llamar tras un commit con eventos nuevos para no esperar al siguiente sondeo
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        interval = self.poll_interval
+        while self._running:
+            try:
+                processed = await self.dispatch_once()
+                if time.monotonic() >= self._next_cleanup:
+                    self._next_cleanup = time.monotonic() + self.cleanup_interval
+                    await asyncio.to_thread(self.cleanup)
+            except Exception:
+                logger.exception("Error en el despachador del outbox")
+                processed = 0
+
+            # Si el lote vino lleno probablemente hay más: seguir sin esperar
+            if processed >= self.batch_size:
+                continue
+            interval = self.poll_interval if processed else min(interval * 2, self.max_poll_interval)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+                interval = self.poll_interval
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # Entrega -->
+
+    def retry_delay(self, attempts: int) -> float:
+        """Espera antes del siguiente intento tras `attempts` fallos"""
+        return min(self.retry_max_seconds, self.retry_base_seconds * 2 ** max(attempts - 1, 0))
+
+    def _claim(self, event_types: List[str]) -> List[dict]:
+        db = self.session_factory()
+        try:
+            now = get_clock().now()
+            # SKIP LOCKED: varios workers pueden reclamar sin repartirse el mismo evento
+            events = (
+                db.query(OutboxEvent)
+                .filter(
+                    OutboxEvent.dispatched_at.is_(None),
+                    OutboxEvent.attempts < self.max_attempts,
+                    OutboxEvent.event_type.in_(event_types),
+                    or_(OutboxEvent.claimed_until.is_(None), OutboxEvent.claimed_until <= now)
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            claimed = [event.to_dict() for event in events]
+            if events:
+                (
+                    db.query(OutboxEvent)
+                    .filter(OutboxEvent.id.in_([event["id"] for event in claimed]))
+                    .update(
+                        {OutboxEvent.claimed_until: now + timedelta(seconds=self.lease_seconds)},
+                        synchronize_session=False
+                    )
+                )
+            # El préstamo se confirma antes de llamar a los consumidores
+            db.commit()
+            return claimed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _finish(self, events: List[dict], errors: Dict[int, str]) -> None:
+        db = self.session_factory()
+        try:
+            delivered = [event["id"] for event in events if event["id"] not in errors]
+            if delivered:
+                now = db.query(func.now()).scalar()
+                (
+                    db.query(OutboxEvent)
+                    .filter(OutboxEvent.id.in_(delivered))
+                    .update(
+                        {OutboxEvent.dispatched_at: now, OutboxEvent.claimed_until: None},
+                        synchronize_session=False
+                    )
+                )
+
+            now = get_clock().now()
+            for event in db.query(OutboxEvent).filter(OutboxEvent.id.in_(list(errors))).all():
+                event.attempts += 1
+                event.last_error = errors[event.id][:500]
+                event.claimed_until = now + timedelta(seconds=self.retry_delay(event.attempts))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _deliver(self, events: List[dict]) -> Dict[int, str]:
+        errors: Dict[int, str] = {}
+
+        by_type: Dict[str, List[dict]] = defaultdict(list)
+        for event in events:
+            by_type[event["event_type"]].append(event)
+
+        for event_type, batch in by_type.items():
+            for handler in self._handlers.get(event_type, ()):
+                try:
+                    result = handler(batch)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.exception("Consumidor de %s falló", event_type)
+                    for event in batch:
+                        errors[event["id"]] = f"{type(e).__name__}: {e}"
+
+        return errors
+
+    async def dispatch_once(self) -> int:
+        event_types = self.event_types
+        if not event_types:
+            return 0
+
+        # Las consultas bloqueantes van a un hilo para no frenar el event loop;
+        # ninguna transacción queda abierta mientras corren los consumidores
+        events = await asyncio.to_thread(self._claim, event_types)
+        if not events:
+            return 0
+
+        errors = await self._deliver(events)
+        await asyncio.to_thread(self._finish, events, errors)
+
+        self.delivered += len(events) - len(errors)
+        self.failed += len(errors)
+        self.last_batch_size = len(events)
+        self.last_run_at = time.time()
+        return len(events)
+
+    # Retención -->
+
+    def cleanup(self) -> int:
+        """Borra por lotes los eventos entregados y los "dead letters" antiguos"""
+        db = self.session_factory()
+        deleted = 0
+        try:
+            cutoff = db.query(func.now()).scalar() - timedelta(days=self.retention_days)
+            expired = or_(
+                OutboxEvent.dispatched_at < cutoff,
+                and_(
+                    OutboxEvent.dispatched_at.is_(None),
+                    OutboxEvent.attempts >= self.max_attempts,
+                    OutboxEvent.created_at < cutoff
+                )
+            )
+            while True:
+                ids = [
+                    row.id for row in
+                    db.query(OutboxEvent.id).filter(expired).limit(self.cleanup_batch_size).all()
+                ]
+                if not ids:
+                    break
+                db.query(OutboxEvent).filter(OutboxEvent.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                deleted += len(ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.deleted += deleted
+        return deleted
+
+    # Métricas -->
+
+    def metrics(self, db: Session) -> dict:
+        backlog, oldest, now = (
+            db.query(
+                func.count(OutboxEvent.id),
+                func.min(OutboxEvent.created_at),
+                func.now()
+            )
+            .filter(
+                OutboxEvent.dispatched_at.is_(None),
+                OutboxEvent.attempts < self.max_attempts
+            )
+            .one()
+        )
+        dead_letters = (
+            db.query(func.count(OutboxEvent.id))
+            .filter(
+                OutboxEvent.dispatched_at.is_(None),
+                OutboxEvent.attempts >= self.max_attempts
+            )
+            .scalar()
+        )
+        lag = (now - oldest).total_seconds() if oldest is not None and now is not None else 0.0
+
+        return {
+            "running": self._task is not None,
+            "event_types": self.event_types,
+            "backlog": backlog,
+            "lag_seconds": max(0.0, lag),
+            "dead_letters": dead_letters,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "deleted": self.deleted,
+            "last_batch_size": self.last_batch_size,
+            "last_run_at": self.last_run_at
+        }
+
+
+# Instancia global del despachador (una por proceso)
+outbox_dispatcher = OutboxDispatcher(
+    SessionLocal,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    max_poll_interval=settings.OUTBOX_MAX_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+    retry_base_seconds=settings.OUTBOX_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.OUTBOX_RETRY_MAX_SECONDS,
+    retention_days=settings.OUTBOX_RETENTION_DAYS,
+    cleanup_interval=settings.OUTBOX_CLEANUP_INTERVAL_SECONDS
+)
@@ -0,0 +1,49 @@
+# Outbox de Eventos de Dominio
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+
+from app.utils.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    Evento pendiente de entregar a los consumidores internos.
+    Se guarda en la misma transacción que el cambio que lo origina.
+    """
+    __tablename__ = "outbox_events"
+    
+    # Índice para buscar pendientes en orden de llegada
+    __table_args__ = (
+        Index("idx_outbox_pending", "dispatched_at", "attempts", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Tipo de evento (ej: "reservation.created") y entidad afectada
+    event_type = Column(String(100), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    
+    # Datos del evento
+    payload = Column(JSON, nullable=False)
+    
+    # Control de entrega
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Reclamado por un worker hasta este instante (UTC); tras un fallo,
+    # momento a partir del cual se puede reintentar
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String(500), nullable=True)
+    
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}', aggregate_id={self.aggregate_id})>"
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "event_type": self.event_type,
+            "aggregate_id": self.aggregate_id,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
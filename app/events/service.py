@@ -0,0 +1,56 @@
+# Registro de Eventos en el Outbox
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.events.dispatcher import outbox_dispatcher
+
+from app.events.model import OutboxEvent
+from app.reservations.model import Reservation
+
+# Tipos de eventos del ciclo de vida de una reserva
+RESERVATION_CREATED = "reservation.created"
+RESERVATION_CANCELLED = "reservation.cancelled"
+RESERVATION_RESCHEDULED = "reservation.rescheduled"
+RESERVATION_CONFIRMED = "reservation.confirmed"
+RESERVATION_EXPIRED = "reservation.expired"
+
+
+def reservation_payload(reservation: Reservation) -> dict:
+    return {
+        "id": reservation.id,
+        "usuario_id": reservation.usuario_id,
+        "sala_id": reservation.sala_id,
+        "fecha": reservation.fecha.isoformat(),
+        "hora_inicio": reservation.hora_inicio.strftime("%H:%M"),
+        "hora_fin": reservation.hora_fin.strftime("%H:%M"),
+        "estado": reservation.estado.value
+    }
+
+
+def add_reservation_event(
+    db: Session,
+    event_type: str,
+    reservation: Reservation,
+    **extra
+) -> Optional[OutboxEvent]:
+    """
+    Agrega el evento a la sesión sin hacer commit:
+    se confirma junto con el cambio de la reserva (o no se confirma).
+    La reserva debe tener id (hacer flush antes si es nueva).
+    Si el tipo no tiene consumidores no se escribe (nadie lo entregaría).
+    """
+    if not outbox_dispatcher.handles(event_type):
+        return None
+
+    payload = reservation_payload(reservation)
+    payload.update(extra)
+
+    event = OutboxEvent(
+        event_type=event_type,
+        aggregate_id=reservation.id,
+        payload=payload
+    )
+    db.add(event)
+    return event
@@ -1,29 +1,64 @@
 # Punto de Entrada Principal de Gestor de Reservas
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 # from app.auth.controller import router as auth_router
 from app.routes.example_route import router as example_router
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config.settings import settings
-from app.utils.database import create_tables
+from app.utils.logger import configure_logging, shutdown_logging, logging_metrics, AccessLogMiddleware
+
+# Antes de importar el resto: los módulos registran mensajes al cargarse
+configure_logging()
+
+import logging
+from app.utils.database import create_tables, engine, replica_engines, SessionLocal
+from app.utils.pool import pool_stats
+from app.utils.compression import CompressionMiddleware
+from app.utils.invalidation import invalidation_bus
+from app.utils import singleflight
+from app.utils.tracing import tracer, TracingMiddleware
+from app.utils.profiler import ProfilingMiddleware
+from app.events.dispatcher import outbox_dispatcher
+import app.events.consumers  # noqa: F401 (registra los consumidores del outbox)
+from app.reservations.expiry import reservation_expiry
 from app.auth.controller import router as auth_router
 from app.users.controller import router as users_router
 from app.rooms.controller import router as rooms_router
 from app.reservations.controller import router as reservations_router
 from app.reports.controller import router as reports_router
+from app.admin.controller import router as admin_router
+from app.utils.dependencies import require_admin
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestiona el ciclo de vida de la aplicación"""
     # Startup: Crear tablas si no existen
-    print("🚀 Iniciando aplicación...")
+    configure_logging()
+    logger.info("Iniciando aplicación", extra={"environment": settings.ENVIRONMENT})
     await create_tables()
-    print("✅ Base de datos configurada")
+    
+    # Escuchar invalidaciones de cachés de los demás workers
+    invalidation_bus.start()
+    
+    # Entregar eventos de dominio del outbox en segundo plano
+    if settings.OUTBOX_ENABLED:
+        outbox_dispatcher.start()
+    
+    # Vencer reservas pendientes (los temporizadores se reconstruyen de la tabla)
+    if settings.RESERVATION_EXPIRY_ENABLED:
+        await reservation_expiry.start()
     
     yield
     
-    print("🔒 Cerrando aplicación...")
+    logger.info("Cerrando aplicación")
+    await reservation_expiry.stop()
+    await outbox_dispatcher.stop()
+    invalidation_bus.stop()
+    tracer.shutdown()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -43,12 +78,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+        cpu_budget=settings.COMPRESSION_CPU_BUDGET,
+        precompressed_paths=(app.openapi_url,),
+    )
+
+# Perfil de una petición con X-Profile: 1 (dentro del registro de accesos,
+# para usar su request_id como id del perfil)
+if settings.PROFILER_ENABLED and settings.PROFILER_REQUEST_HEADER_ENABLED:
+    app.add_middleware(ProfilingMiddleware, interval=settings.PROFILER_INTERVAL_MS / 1000)
+
+# Registro de accesos (mide toda la petición)
+if settings.LOG_ACCESS_ENABLED:
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=settings.LOG_ACCESS_SAMPLE_RATE,
+        route_sample_rates=settings.LOG_ACCESS_SAMPLE_ROUTES,
+        slow_request_ms=settings.LOG_SLOW_REQUEST_MS,
+    )
+
+# Trazas: por fuera del registro de accesos, que así puede incluir el trace_id
+app.add_middleware(TracingMiddleware)
+
 # Registro de rutas
 app.include_router(auth_router, prefix="/auth", tags=["Autenticación"])
 app.include_router(users_router, prefix="/users", tags=["Usuarios"])
 app.include_router(rooms_router, prefix="/rooms", tags=["Salas"])
 app.include_router(reservations_router, prefix="/reservations", tags=["Reservas"])
 app.include_router(reports_router, prefix="/reports", tags=["Reportes"])
+app.include_router(admin_router, prefix="/admin", tags=["Administración"])
 
 
 @app.get("/", tags=["Root"])
@@ -72,6 +136,60 @@ async def health_check():
     }
 
 
+# Diagnóstico del worker: solo administradores (/health sigue público)
+ADMIN_ONLY = [Depends(require_admin)]
+
+
+@app.get("/health/db", tags=["Health"], dependencies=ADMIN_ONLY)
+async def database_health():
+    """Métricas del pool de conexiones (primario y réplicas)"""
+    return {
+        "primary": pool_stats(engine),
+        "replicas": [pool_stats(replica) for replica in replica_engines]
+    }
+
+
+@app.get("/health/outbox", tags=["Health"], dependencies=ADMIN_ONLY)
+def outbox_health():
+    """Backlog y retraso del outbox de eventos"""
+    # def (no async): FastAPI la corre en el threadpool y la consulta no bloquea el event loop
+    db = SessionLocal()
+    try:
+        return outbox_dispatcher.metrics(db)
+    finally:
+        db.close()
+
+
+@app.get("/health/expiry", tags=["Health"], dependencies=ADMIN_ONLY)
+async def expiry_health():
+    """Temporizadores de vencimiento de reservas pendientes"""
+    return reservation_expiry.metrics()
+
+
+@app.get("/health/logging", tags=["Health"], dependencies=ADMIN_ONLY)
+async def logging_health():
+    """Cola del logging asíncrono (registros en espera y descartados)"""
+    return logging_metrics()
+
+
+@app.get("/health/tracing", tags=["Health"], dependencies=ADMIN_ONLY)
+async def tracing_health():
+    """Trazas muestreadas, spans exportados y descartados"""
+    return tracer.metrics()
+
+
+@app.get("/health/invalidation", tags=["Health"], dependencies=ADMIN_ONLY)
+async def invalidation_health():
+    """Mensajes de invalidación en espera de envío y descartados"""
+    return invalidation_bus.metrics()
+
+
+@app.get("/health/singleflight", tags=["Health"], dependencies=ADMIN_ONLY)
+async def singleflight_health():
+    """Llamadas agrupadas por single-flight (por grupo y claves más repetidas)"""
+    return singleflight.metrics()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
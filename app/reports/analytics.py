@@ -0,0 +1,146 @@
+# Análisis de Ocupación (matrices de bloques con NumPy)
+
+from datetime import date
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.reservations.model import Reservation, ACTIVE_STATUSES
+from app.reservations.availability import OPENING_HOUR, CLOSING_HOUR
+from app.rooms.schemas import RoomResponse
+
+SLOTS = CLOSING_HOUR - OPENING_HOUR
+HOURS = list(range(OPENING_HOUR, CLOSING_HOUR))
+
+
+class OccupancyMatrix:
+    """
+    Ocupación de un rango de fechas como un arreglo denso de forma
+    (salas, días, bloques): 1 si el bloque está reservado.
+
+    Se llena con una sola consulta y todos los reportes son reducciones
+    sobre el arreglo, en lugar de un GROUP BY por cada dimensión.
+    """
+
+    def __init__(self, rooms: Sequence[RoomResponse], fecha_inicio: date, fecha_fin: date):
+        self.rooms = list(rooms)
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.days = (fecha_fin - fecha_inicio).days + 1
+        self.room_index = {room.id: i for i, room in enumerate(self.rooms)}
+        self.slots = np.zeros((len(self.rooms), self.days, SLOTS), dtype=np.uint8)
+
+        # Día de la semana (0 = lunes) y mes de cada día del rango
+        first = fecha_inicio.toordinal()
+        self.weekdays = (np.arange(first, first + self.days) - 1) % 7
+        day_months = np.array([
+            day.year * 12 + day.month - 1
+            for day in (date.fromordinal(first + i) for i in range(self.days))
+        ], dtype=np.int64)
+        month_keys, self.month_of_day = np.unique(day_months, return_inverse=True)
+        self.months = [date(int(key) // 12, int(key) % 12 + 1, 1) for key in month_keys]
+
+    # Carga -->
+
+    def load(self, db: Session) -> "OccupancyMatrix":
+        if not self.rooms:
+            return self
+
+        # Solo las tres columnas necesarias, sin construir objetos del ORM
+        rows = db.execute(
+            select(Reservation.sala_id, Reservation.fecha, Reservation.hora_inicio)
+            .where(
+                Reservation.sala_id.in_(self.room_index.keys()),
+                Reservation.fecha.between(self.fecha_inicio, self.fecha_fin),
+                Reservation.estado.in_(ACTIVE_STATUSES)
+            )
+        ).all()
+        if not rows:
+            return self
+
+        first = self.fecha_inicio.toordinal()
+        room_index = self.room_index
+        room_idx = np.fromiter((room_index[r[0]] for r in rows), dtype=np.intp, count=len(rows))
+        day_idx = np.fromiter((r[1].toordinal() - first for r in rows), dtype=np.intp, count=len(rows))
+        slot_idx = np.fromiter((r[2].hour - OPENING_HOUR for r in rows), dtype=np.intp, count=len(rows))
+
+        # Descartar bloques fuera del horario (datos anteriores a las reglas actuales)
+        valid = (slot_idx >= 0) & (slot_idx < SLOTS)
+        self.slots[room_idx[valid], day_idx[valid], slot_idx[valid]] = 1
+        return self
+
+    # Reducciones -->
+
+    def hours_per_room(self) -> np.ndarray:
+        return self.slots.sum(axis=(1, 2), dtype=np.int64)
+
+    def utilization_per_room(self) -> np.ndarray:
+        capacity = self.days * SLOTS
+        return self.hours_per_room() / capacity if capacity else np.zeros(len(self.rooms))
+
+    def overall_utilization(self) -> float:
+        return float(self.slots.mean()) if self.slots.size else 0.0
+
+    def hours_per_slot(self) -> np.ndarray:
+        """Bloques reservados por hora del día (todas las salas y días)"""
+        return self.slots.sum(axis=(0, 1), dtype=np.int64)
+
+    def top_rooms(self, limit: int) -> List[int]:
+        """Índices de las `limit` salas con más horas, de mayor a menor"""
+        hours = self.hours_per_room()
+        limit = min(limit, len(hours))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-hours, limit - 1)[:limit]
+        # Empates por id de sala para que el orden sea estable
+        order = np.lexsort((top, -hours[top]))
+        return top[order].tolist()
+
+    def weekday_heatmap(self, room: Optional[int] = None) -> np.ndarray:
+        """
+        Utilización (0-1) por día de la semana y hora, de forma (7, bloques).
+        Con `room` se limita a una sala (índice en la matriz).
+        """
+        slots = self.slots if room is None else self.slots[room:room + 1]
+        per_day = slots.sum(axis=0, dtype=np.int64)  # (días, bloques)
+
+        used = np.zeros((7, SLOTS), dtype=np.int64)
+        np.add.at(used, self.weekdays, per_day)
+
+        capacity = np.bincount(self.weekdays, minlength=7) * slots.shape[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(capacity[:, None] > 0, used / capacity[:, None], 0.0)
+
+    def sede_monthly_utilization(self) -> tuple:
+        """
+        Utilización (0-1) por sede y mes, de forma (sedes, meses).
+        Retorna (sedes, meses, matriz).
+        """
+        sedes = sorted({room.sede for room in self.rooms})
+        sede_index = {sede: i for i, sede in enumerate(sedes)}
+        sede_of_room = np.array([sede_index[room.sede] for room in self.rooms], dtype=np.intp)
+
+        # Matrices indicadoras: (sedes x salas) @ (salas x días) @ (días x meses)
+        sede_onehot = np.zeros((len(sedes), len(self.rooms)), dtype=np.int64)
+        sede_onehot[sede_of_room, np.arange(len(self.rooms))] = 1
+        month_onehot = np.zeros((self.days, len(self.months)), dtype=np.int64)
+        month_onehot[np.arange(self.days), self.month_of_day] = 1
+
+        per_room_day = self.slots.sum(axis=2, dtype=np.int64)
+        used = sede_onehot @ per_room_day @ month_onehot
+
+        capacity = np.outer(sede_onehot.sum(axis=1), month_onehot.sum(axis=0)) * SLOTS
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = np.where(capacity > 0, used / capacity, 0.0)
+        return sedes, self.months, utilization
+
+
+def load_occupancy(
+    db: Session,
+    rooms: Sequence[RoomResponse],
+    fecha_inicio: date,
+    fecha_fin: date
+) -> OccupancyMatrix:
+    return OccupancyMatrix(rooms, fecha_inicio, fecha_fin).load(db)
@@ -1,15 +1,112 @@
-# Reportes de Gestión 
+# Endpoints de Reportes (Admin)
 
-# Controlador básico de reportes
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
 
-from fastapi import APIRouter
+from app.utils.database import get_read_db
+from app.auth.principal import Principal
+from app.utils.dependencies import get_current_active_user, require_admin
+from app.utils.exceptions import InsufficientPermissionsException
+from app.reports.service import ReportService
+from app.reports.schemas import (
+    MostBookedRooms, OccupancyHeatmap, UtilizationReport, UserHoursReport, TopUserHours
+)
+
+# Configuración del Router
 
 router = APIRouter()
 
-@router.get("/most-booked-rooms")
-async def get_most_booked_rooms():
-    return {"message": "Salas más reservadas - Por implementar"}
+# Endpoints de Ocupación --> (por defecto los últimos días configurados)
+
+@router.get(
+    "/most-booked-rooms",
+    response_model=MostBookedRooms,
+    summary="Salas más reservadas (Admin)",
+    description="Salas con más horas reservadas en el rango",
+    dependencies=[Depends(require_admin)]
+)
+async def get_most_booked_rooms(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    sede: Optional[str] = Query(None, description="Filtrar por sede"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    report_service = ReportService(db)
+    return await report_service.get_most_booked_rooms(fecha_inicio, fecha_fin, sede, limit)
+
+
+@router.get(
+    "/occupancy-heatmap",
+    response_model=OccupancyHeatmap,
+    summary="Mapa de ocupación (Admin)",
+    description="Utilización por día de la semana y hora, de todas las salas o de una",
+    dependencies=[Depends(require_admin)]
+)
+async def get_occupancy_heatmap(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    sede: Optional[str] = Query(None, description="Filtrar por sede"),
+    sala_id: Optional[int] = Query(None, gt=0, description="Limitar a una sala"),
+    db: Session = Depends(get_read_db)
+):
+    report_service = ReportService(db)
+    return await report_service.get_occupancy_heatmap(fecha_inicio, fecha_fin, sede, sala_id)
+
+
+@router.get(
+    "/utilization",
+    response_model=UtilizationReport,
+    summary="Utilización de salas (Admin)",
+    description="Utilización global, horas pico, salas más usadas y utilización mensual por sede",
+    dependencies=[Depends(require_admin)]
+)
+async def get_utilization_report(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    sede: Optional[str] = Query(None, description="Filtrar por sede"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    report_service = ReportService(db)
+    return await report_service.get_utilization_report(fecha_inicio, fecha_fin, sede, limit)
+
+# Endpoints de Horas por Usuario --> (sin fechas: toda la historia)
+
+@router.get(
+    "/user-hours",
+    response_model=TopUserHours,
+    summary="Ranking de horas (Admin)",
+    description="Usuarios con más horas confirmadas en el rango",
+    dependencies=[Depends(require_admin)]
+)
+async def get_top_user_hours(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    report_service = ReportService(db)
+    return await report_service.get_top_user_hours(fecha_inicio, fecha_fin, limit)
+
+
+@router.get(
+    "/user-hours/{user_id}",
+    response_model=UserHoursReport,
+    summary="Horas de un usuario",
+    description="Horas confirmadas de un usuario en el rango (el propio usuario o un admin)"
+)
+async def get_user_hours(
+    user_id: int,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    if user_id != current_user.id and not current_user.is_admin():
+        raise InsufficientPermissionsException("ver las horas de otro usuario")
 
-@router.get("/user-hours/{user_id}")
-async def get_user_hours(user_id: int):
-    return {"message": f"Horas del usuario {user_id} - Por implementar"}
\ No newline at end of file
+    report_service = ReportService(db)
+    return await report_service.get_user_hours(user_id, fecha_inicio, fecha_fin)
@@ -0,0 +1,84 @@
+# Esquemas para el módulo de Reportes
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from datetime import date
+
+
+class RoomUtilization(BaseModel):
+    sala_id: int
+    nombre: str
+    sede: str
+    horas_reservadas: int
+    utilizacion: float = Field(..., description="Fracción de bloques reservados (0-1)")
+
+class PeakHour(BaseModel):
+    hora: int
+    reservas: int
+
+class SedeUtilization(BaseModel):
+    sede: str
+    meses: List[str] = Field(..., description="Meses del rango (YYYY-MM)")
+    utilizacion: List[float]
+
+class MostBookedRooms(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    salas: List[RoomUtilization]
+
+class OccupancyHeatmap(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    sede: Optional[str] = None
+    sala_id: Optional[int] = None
+    horas: List[int] = Field(..., description="Hora de inicio de cada columna")
+    dias: List[str] = Field(..., description="Día de la semana de cada fila (lunes primero)")
+    valores: List[List[float]] = Field(..., description="Utilización (0-1) por día y hora")
+
+class UtilizationReport(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    utilizacion_global: float
+    horas_pico: List[PeakHour]
+    top_salas: List[RoomUtilization]
+    sedes: List[SedeUtilization]
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "fecha_inicio": "2024-01-01",
+                "fecha_fin": "2024-12-31",
+                "utilizacion_global": 0.42,
+                "horas_pico": [{"hora": 10, "reservas": 820}],
+                "top_salas": [
+                    {
+                        "sala_id": 1,
+                        "nombre": "Sala A",
+                        "sede": "Campus Norte",
+                        "horas_reservadas": 1630,
+                        "utilizacion": 0.45
+                    }
+                ],
+                "sedes": [
+                    {"sede": "Campus Norte", "meses": ["2024-01", "2024-02"], "utilizacion": [0.38, 0.41]}
+                ]
+            }
+        }
+    )
+
+class UserHoursReport(BaseModel):
+    usuario_id: int
+    fecha_inicio: date
+    fecha_fin: date
+    horas: int
+
+class UserHoursRank(BaseModel):
+    usuario_id: int
+    nombre: str
+    email: str
+    horas: int
+
+class TopUserHours(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    usuarios: List[UserHoursRank]
@@ -0,0 +1,212 @@
+# Reportes de Gestión 
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.auth.model import User
+from app.reports.analytics import OccupancyMatrix, load_occupancy, HOURS
+from app.reports.user_hours import user_hours_index, FIRST_DAY, LAST_DAY
+from app.reports.schemas import (
+    RoomUtilization, PeakHour, SedeUtilization, MostBookedRooms,
+    OccupancyHeatmap, UtilizationReport, UserHoursReport, UserHoursRank, TopUserHours
+)
+from app.rooms.catalog import room_catalog
+from app.utils.clock import Clock, get_clock
+from app.utils.singleflight import single_flight
+from app.utils.exceptions import RoomNotFoundException, ValidationException
+from app.config.settings import settings
+
+WEEKDAYS = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+
+class ReportService:
+    """
+    Los reportes son lecturas pesadas e idénticas entre administradores:
+    las consultas simultáneas con los mismos filtros comparten una ejecución.
+    """
+
+    def __init__(self, db: Session, clock: Optional[Clock] = None):
+        self.db = db
+        self.clock = clock or get_clock()
+
+    def _resolve_range(
+        self,
+        fecha_inicio: Optional[date],
+        fecha_fin: Optional[date]
+    ) -> Tuple[date, date]:
+        fecha_fin = fecha_fin or self.clock.today()
+        fecha_inicio = fecha_inicio or fecha_fin - timedelta(days=settings.REPORTS_DEFAULT_RANGE_DAYS - 1)
+
+        if fecha_fin < fecha_inicio:
+            raise ValidationException("La fecha de fin debe ser posterior a la fecha de inicio")
+        if (fecha_fin - fecha_inicio).days + 1 > settings.REPORTS_MAX_RANGE_DAYS:
+            raise ValidationException(
+                f"El rango no puede superar {settings.REPORTS_MAX_RANGE_DAYS} días"
+            )
+        return fecha_inicio, fecha_fin
+
+    def _load(
+        self,
+        fecha_inicio: Optional[date],
+        fecha_fin: Optional[date],
+        sede: Optional[str] = None
+    ) -> OccupancyMatrix:
+        fecha_inicio, fecha_fin = self._resolve_range(fecha_inicio, fecha_fin)
+
+        # Las salas salen del catálogo en memoria; incluye las inactivas
+        # porque pueden tener reservas dentro del rango
+        rooms = room_catalog.get_snapshot().filter(
+            include_inactive=True,
+            sede=sede.strip().title() if sede else None
+        )
+        return load_occupancy(self.db, rooms, fecha_inicio, fecha_fin)
+
+    def _room_utilization(self, matrix: OccupancyMatrix, limit: int):
+        hours = matrix.hours_per_room()
+        utilization = matrix.utilization_per_room()
+        return [
+            RoomUtilization(
+                sala_id=matrix.rooms[i].id,
+                nombre=matrix.rooms[i].nombre,
+                sede=matrix.rooms[i].sede,
+                horas_reservadas=int(hours[i]),
+                utilizacion=round(float(utilization[i]), 4)
+            )
+            for i in matrix.top_rooms(limit)
+        ]
+
+    # Métodos de Consulta -->
+
+    @single_flight("reports.most_booked_rooms")
+    def get_most_booked_rooms(
+        self,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        sede: Optional[str] = None,
+        limit: int = 10
+    ) -> MostBookedRooms:
+        matrix = self._load(fecha_inicio, fecha_fin, sede)
+        return MostBookedRooms(
+            fecha_inicio=matrix.fecha_inicio,
+            fecha_fin=matrix.fecha_fin,
+            salas=self._room_utilization(matrix, limit)
+        )
+
+    @single_flight("reports.occupancy_heatmap")
+    def get_occupancy_heatmap(
+        self,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        sede: Optional[str] = None,
+        sala_id: Optional[int] = None
+    ) -> OccupancyHeatmap:
+        matrix = self._load(fecha_inicio, fecha_fin, sede)
+
+        room = None
+        if sala_id is not None:
+            room = matrix.room_index.get(sala_id)
+            if room is None:
+                raise RoomNotFoundException(sala_id)
+
+        heatmap = matrix.weekday_heatmap(room)
+        return OccupancyHeatmap(
+            fecha_inicio=matrix.fecha_inicio,
+            fecha_fin=matrix.fecha_fin,
+            sede=sede,
+            sala_id=sala_id,
+            horas=HOURS,
+            dias=WEEKDAYS,
+            valores=heatmap.round(4).tolist()
+        )
+
+    @single_flight("reports.utilization")
+    def get_utilization_report(
+        self,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        sede: Optional[str] = None,
+        limit: int = 10
+    ) -> UtilizationReport:
+        matrix = self._load(fecha_inicio, fecha_fin, sede)
+
+        per_slot = matrix.hours_per_slot()
+        peak_order = per_slot.argsort(kind="stable")[::-1]
+
+        sedes, months, utilization = matrix.sede_monthly_utilization()
+        month_labels = [month.strftime("%Y-%m") for month in months]
+
+        return UtilizationReport(
+            fecha_inicio=matrix.fecha_inicio,
+            fecha_fin=matrix.fecha_fin,
+            utilizacion_global=round(matrix.overall_utilization(), 4),
+            horas_pico=[
+                PeakHour(hora=HOURS[i], reservas=int(per_slot[i]))
+                for i in peak_order[:3] if per_slot[i] > 0
+            ],
+            top_salas=self._room_utilization(matrix, limit),
+            sedes=[
+                SedeUtilization(
+                    sede=sede_name,
+                    meses=month_labels,
+                    utilizacion=utilization[i].round(4).tolist()
+                )
+                for i, sede_name in enumerate(sedes)
+            ]
+        )
+
+    # Horas por Usuario --> (índice en memoria, toda la historia por defecto)
+
+    @staticmethod
+    def _history_range(fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> Tuple[date, date]:
+        fecha_inicio, fecha_fin = fecha_inicio or FIRST_DAY, fecha_fin or LAST_DAY
+        if fecha_fin < fecha_inicio:
+            raise ValidationException("La fecha de fin debe ser posterior a la fecha de inicio")
+        return fecha_inicio, fecha_fin
+
+    @single_flight("reports.user_hours")
+    def get_user_hours(
+        self,
+        user_id: int,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None
+    ) -> UserHoursReport:
+        fecha_inicio, fecha_fin = self._history_range(fecha_inicio, fecha_fin)
+        return UserHoursReport(
+            usuario_id=user_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            horas=user_hours_index.hours(user_id, fecha_inicio, fecha_fin)
+        )
+
+    @single_flight("reports.top_user_hours")
+    def get_top_user_hours(
+        self,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        limit: int = 10
+    ) -> TopUserHours:
+        fecha_inicio, fecha_fin = self._history_range(fecha_inicio, fecha_fin)
+        top = user_hours_index.top_users(fecha_inicio, fecha_fin, limit)
+
+        # Nombres solo de los usuarios del ranking
+        users = {
+            row.id: row
+            for row in self.db.query(User.id, User.nombre, User.email)
+            .filter(User.id.in_([user_id for user_id, _ in top]))
+        } if top else {}
+
+        return TopUserHours(
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            usuarios=[
+                UserHoursRank(
+                    usuario_id=user_id,
+                    nombre=users[user_id].nombre,
+                    email=users[user_id].email,
+                    horas=hours
+                )
+                for user_id, hours in top if user_id in users
+            ]
+        )
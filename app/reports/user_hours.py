@@ -0,0 +1,236 @@
+# Horas Reservadas por Usuario (sumas de prefijos por mes y día)
+
+import heapq
+import threading
+import time
+from datetime import date
+from typing import Collection, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from app.reservations.model import Reservation, ReservationStatus
+from app.utils.database import SessionLocal
+from app.utils.fenwick import FenwickTree, SparseFenwickTree
+from app.utils.invalidation import invalidation_bus, CHANNEL_USER_HOURS
+from app.config.settings import settings
+
+# Meses cubiertos por el índice: desde enero de EPOCH_YEAR, 200 años
+EPOCH_YEAR = 2000
+MONTH_SLOTS = 200 * 12
+FIRST_DAY = date(EPOCH_YEAR, 1, 1)
+LAST_DAY = date(EPOCH_YEAR + MONTH_SLOTS // 12 - 1, 12, 31)
+
+
+def month_index(fecha: date) -> int:
+    """Posición (desde 1) del mes de `fecha` en el árbol de meses"""
+    return (fecha.year - EPOCH_YEAR) * 12 + fecha.month
+
+
+class UserHours:
+    """
+    Horas de un usuario en dos niveles:
+    - Un árbol disperso con el total de cada mes (toda la historia)
+    - Un árbol de 31 días por cada mes con reservas
+
+    Un rango se responde con el resto del primer mes, los meses completos
+    del medio y el inicio del último: O(log n) sin importar su longitud.
+    """
+
+    __slots__ = ("months", "days")
+
+    def __init__(self):
+        self.months = SparseFenwickTree(MONTH_SLOTS)
+        self.days: Dict[int, FenwickTree] = {}
+
+    def add(self, fecha: date, hours: int) -> None:
+        month = month_index(fecha)
+        self.months.add(month, hours)
+        days = self.days.get(month)
+        if days is None:
+            days = self.days[month] = FenwickTree(31)
+        days.add(fecha.day, hours)
+
+    def _days_sum(self, month: int, start: int, end: int) -> int:
+        days = self.days.get(month)
+        return days.range_sum(start, end) if days is not None else 0
+
+    def range_sum(self, start: date, end: date) -> int:
+        start, end = max(start, FIRST_DAY), min(end, LAST_DAY)
+        if end < start:
+            return 0
+
+        first, last = month_index(start), month_index(end)
+        if first == last:
+            return self._days_sum(first, start.day, end.day)
+        return (
+            self._days_sum(first, start.day, 31)
+            + self.months.range_sum(first + 1, last - 1)
+            + self._days_sum(last, 1, end.day)
+        )
+
+    def total(self) -> int:
+        return self.months.prefix(MONTH_SLOTS)
+
+
+class UserHoursIndex:
+    """
+    Horas confirmadas de todos los usuarios, en memoria.
+
+    Se construye con una sola consulta agrupada la primera vez que se usa y
+    después se mantiene con los cambios publicados en CHANNEL_USER_HOURS
+    (crear, confirmar, cancelar y reprogramar), sin volver a consultar.
+
+    La carga usa una sesión propia del primario (una réplica atrasada
+    quedaría fija, porque después solo llegan deltas). Cada
+    `rebuild_seconds` se recarga completo: un cambio perdido por el bus de
+    invalidación no se arrastra para siempre. Un usuario marcado con
+    `refresh` (ej: por el consumidor del outbox) se recarga solo en la
+    siguiente consulta.
+    """
+
+    def __init__(self, session_factory: sessionmaker, rebuild_seconds: float = 0):
+        self.session_factory = session_factory
+        self.rebuild_seconds = rebuild_seconds
+        self._users: Optional[Dict[int, UserHours]] = None
+        self._expires_at = 0.0
+        # Usuarios que se recargan de la base en la siguiente consulta
+        self._stale: Set[int] = set()
+        self._lock = threading.Lock()
+        # Una sola carga a la vez: las consultas simultáneas la esperan
+        # (primera vez) o siguen con el índice actual (recarga)
+        self._load_lock = threading.Lock()
+        # Igual que en el índice de disponibilidad: una carga que empezó
+        # antes de un cambio no se guarda
+        self._generation = 0
+
+    def _is_fresh(self) -> bool:
+        return self.rebuild_seconds <= 0 or time.monotonic() < self._expires_at
+
+    def _load(self) -> Dict[int, UserHours]:
+        """
+        Índice vigente; lo carga, lo recarga o recarga los usuarios marcados
+        si hace falta. Consulta la base: llamarlo desde el threadpool (los
+        métodos del servicio de reportes usan single_flight).
+        """
+        with self._lock:
+            users = self._users
+            if users is not None and (
+                self._load_lock.locked() or (self._is_fresh() and not self._stale)
+            ):
+                # Mientras otro hilo recarga se sigue usando el índice actual
+                return users
+
+        with self._load_lock:
+            with self._lock:
+                full = self._users is None or not self._is_fresh()
+                if not full and not self._stale:
+                    return self._users
+                # La carga completa también cubre a los usuarios marcados
+                stale, self._stale = self._stale, set()
+                generation = self._generation
+
+            loaded = self._query() if full else self._query(stale)
+
+            with self._lock:
+                if generation != self._generation:
+                    # Hubo cambios durante la carga: se conserva el índice con
+                    # los deltas y se reintenta en la siguiente consulta
+                    self._stale |= stale
+                    return self._users if self._users is not None else loaded
+                if full:
+                    self._users = loaded
+                    self._expires_at = time.monotonic() + self.rebuild_seconds
+                else:
+                    for user_id in stale:
+                        if user_id in loaded:
+                            self._users[user_id] = loaded[user_id]
+                        else:
+                            self._users.pop(user_id, None)
+                return self._users
+
+    def _query(self, user_ids: Optional[Collection[int]] = None) -> Dict[int, UserHours]:
+        # Usa idx_reservations_usuario_fecha_estado
+        with self.session_factory() as db:
+            query = (
+                db.query(Reservation.usuario_id, Reservation.fecha, func.count())
+                .filter(Reservation.estado == ReservationStatus.CONFIRMADA)
+            )
+            if user_ids is not None:
+                query = query.filter(Reservation.usuario_id.in_(list(user_ids)))
+            rows = query.group_by(Reservation.usuario_id, Reservation.fecha).all()
+        users: Dict[int, UserHours] = {}
+        for usuario_id, fecha, count in rows:
+            hours = users.get(usuario_id)
+            if hours is None:
+                hours = users[usuario_id] = UserHours()
+            hours.add(fecha, count * settings.RESERVATION_BLOCK_HOURS)
+        return users
+
+    # Consultas -->
+
+    def hours(self, user_id: int, start: date, end: date) -> int:
+        users = self._load()
+        with self._lock:
+            hours = users.get(user_id)
+            return hours.range_sum(start, end) if hours is not None else 0
+
+    def top_users(self, start: date, end: date, limit: int) -> List[Tuple[int, int]]:
+        """Los `limit` usuarios con más horas en el rango: [(usuario_id, horas)]"""
+        users = self._load()
+        with self._lock:
+            totals = [(user_id, hours.range_sum(start, end)) for user_id, hours in users.items()]
+        return heapq.nlargest(
+            limit,
+            (row for row in totals if row[1] > 0),
+            key=lambda row: (row[1], -row[0])
+        )
+
+    # Actualizaciones -->
+
+    def apply(self, user_id: int, fecha: date, hours: int) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._users is None:
+                return
+            user_hours = self._users.get(user_id)
+            if user_hours is None:
+                user_hours = self._users[user_id] = UserHours()
+            user_hours.add(fecha, hours)
+
+    def refresh(self, user_id: int) -> None:
+        """Recarga al usuario de la base en la siguiente consulta (idempotente)"""
+        with self._lock:
+            if self._users is not None:
+                self._stale.add(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._users = None
+
+    def _on_message(self, key: str) -> None:
+        # "*" recarga todo; "<usuario_id>" recarga al usuario;
+        # "<usuario_id>:<fecha>:<horas>" suma (o resta) horas en el lugar
+        if key == "*":
+            self.clear()
+            return
+        parts = key.split(":")
+        if len(parts) == 3:
+            self.apply(int(parts[0]), date.fromisoformat(parts[1]), int(parts[2]))
+        else:
+            self.refresh(int(parts[0]))
+
+
+def publish_user_hours_change(user_id: int, fecha: date, reservations: int = 1) -> None:
+    """
+    Publicar después del commit con +1 al confirmar una reserva y -1 al
+    dejarla de contar (cancelación o traslado a otra fecha)
+    """
+    hours = reservations * settings.RESERVATION_BLOCK_HOURS
+    invalidation_bus.publish(CHANNEL_USER_HOURS, f"{user_id}:{fecha}:{hours}")
+
+
+# Instancia global del índice (una por proceso)
+user_hours_index = UserHoursIndex(SessionLocal, settings.USER_HOURS_REBUILD_SECONDS)
+invalidation_bus.subscribe(CHANNEL_USER_HOURS, user_hours_index._on_message)
@@ -0,0 +1,157 @@
+# Índice de Disponibilidad en Memoria
+
+import threading
+from collections import OrderedDict
+from datetime import date, time
+from time import monotonic
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.reservations.model import Reservation, ACTIVE_STATUSES
+from app.utils.invalidation import invalidation_bus, CHANNEL_AVAILABILITY
+from app.config.settings import settings
+
+# Horario de atención: bloques de 1 hora entre 8:00 y 18:00 (10 bloques)
+OPENING_HOUR = 8
+CLOSING_HOUR = 18
+
+SlotKey = Tuple[int, date]
+
+
+def hour_bit(hora: time) -> int:
+    """Bit del bloque que empieza en `hora` (bit 0 = 8:00)"""
+    return 1 << (hora.hour - OPENING_HOUR)
+
+
+def mask_to_hours(mask: int) -> List[int]:
+    return [
+        OPENING_HOUR + i
+        for i in range(CLOSING_HOUR - OPENING_HOUR)
+        if mask & (1 << i)
+    ]
+
+
+FULL_MASK = (1 << (CLOSING_HOUR - OPENING_HOUR)) - 1
+
+
+class AvailabilityIndex:
+    """
+    Horarios ocupados por (sala_id, fecha) como una máscara de bits.
+    Se carga desde la base de datos la primera vez que se consulta un día
+    y después se actualiza con los cambios publicados en CHANNEL_AVAILABILITY,
+    sin volver a consultar.
+
+    Es una caché de lectura: las reservas siguen validándose contra la
+    base de datos dentro de la transacción. Cada día cargado vence a los
+    `ttl_seconds` (0 = nunca): un cambio perdido entre workers no queda
+    para siempre.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # (sala_id, fecha) -> (vence, máscara)
+        self._masks: "OrderedDict[SlotKey, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Cambia con cada actualización: una carga que empezó antes de un
+        # cambio no debe guardar su resultado (podría estar desactualizado)
+        self._generation = 0
+
+    def _expires_at(self) -> float:
+        return monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+
+    def _fresh(self, key: SlotKey) -> Optional[int]:
+        entry = self._masks.get(key)
+        if entry is None or entry[0] < monotonic():
+            return None
+        return entry[1]
+
+    def get_mask(self, db: Session, sala_id: int, fecha: date) -> int:
+        key = (sala_id, fecha)
+        with self._lock:
+            mask = self._fresh(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+            generation = self._generation
+
+        # Usa idx_reservations_sala_fecha_estado (responde desde el índice)
+        rows = (
+            db.query(Reservation.hora_inicio)
+            .filter(
+                Reservation.sala_id == sala_id,
+                Reservation.fecha == fecha,
+                Reservation.estado.in_(ACTIVE_STATUSES)
+            )
+            .all()
+        )
+        mask = 0
+        for (hora_inicio,) in rows:
+            mask |= hour_bit(hora_inicio)
+
+        with self._lock:
+            if generation == self._generation:
+                self._masks[key] = (self._expires_at(), mask)
+                self._masks.move_to_end(key)
+                if len(self._masks) > self.max_entries:
+                    self._masks.popitem(last=False)
+        return mask
+
+    def peek(self, sala_id: int, fecha: date) -> Optional[int]:
+        """Máscara del día si ya está cargada, sin consultar"""
+        with self._lock:
+            return self._fresh((sala_id, fecha))
+
+    def free_hours(self, db: Session, sala_id: int, fecha: date) -> List[int]:
+        return mask_to_hours(FULL_MASK & ~self.get_mask(db, sala_id, fecha))
+
+    # Actualizaciones -->
+
+    def apply(self, sala_id: int, fecha: date, occupied: int = 0, released: int = 0) -> None:
+        """Aplica un cambio incremental si el día está cargado"""
+        key = (sala_id, fecha)
+        with self._lock:
+            self._generation += 1
+            entry = self._masks.get(key)
+            if entry is not None:
+                # El delta no renueva el plazo: el respaldo es la recarga
+                self._masks[key] = (entry[0], (entry[1] & ~released) | occupied)
+
+    def invalidate(self, sala_id: int, fecha: date) -> None:
+        with self._lock:
+            self._generation += 1
+            self._masks.pop((sala_id, fecha), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._masks.clear()
+
+    def _on_message(self, key: str) -> None:
+        # "<sala_id>:<fecha>" invalida el día;
+        # "<sala_id>:<fecha>:<ocupados>:<liberados>" lo actualiza en el lugar
+        if key == "*":
+            self.clear()
+            return
+        parts = key.split(":")
+        sala_id, fecha = int(parts[0]), date.fromisoformat(parts[1])
+        if len(parts) == 4:
+            self.apply(sala_id, fecha, int(parts[2]), int(parts[3]))
+        else:
+            self.invalidate(sala_id, fecha)
+
+
+def publish_availability_change(
+    sala_id: int,
+    fecha: date,
+    occupied: int = 0,
+    released: int = 0
+) -> None:
+    """Publicar después del commit: actualiza el índice en todos los workers"""
+    invalidation_bus.publish(CHANNEL_AVAILABILITY, f"{sala_id}:{fecha}:{occupied}:{released}")
+
+
+# Instancia global del índice (una por proceso)
+availability_index = AvailabilityIndex(ttl_seconds=settings.AVAILABILITY_INDEX_TTL_SECONDS)
+invalidation_bus.subscribe(CHANNEL_AVAILABILITY, availability_index._on_message)
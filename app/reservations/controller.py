@@ -1,13 +1,179 @@
-# Controlador básico de Reservas
+# Endpoints de Reservas
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import date
 
-router = APIRouter()
+from app.utils.database import get_db, get_read_db
+from app.utils.dependencies import get_current_active_user, validate_pagination
+from app.utils.rate_limit import booking_ip_limiter, booking_account_limiter
+from app.utils.idempotency import IdempotentRoute
+from app.reservations.service import ReservationService
+from app.reservations.schemas import (
+    ReservationCreate, ReservationUpdate, ReservationResponse, ReservationCancel,
+    RoomAvailability, UserReservationDashboard
+)
 
-@router.get("/me")
-async def get_my_reservations():
-    return {"message": "Mis reservas - Por implementar"}
+# Configuración del Router
 
-@router.post("/")
-async def create_reservation():
-    return {"message": "Crear reserva - Por implementar"}
\ No newline at end of file
+# Los POST aceptan Idempotency-Key (un reintento repite la respuesta guardada)
+router = APIRouter(route_class=IdempotentRoute)
+
+# Solo las rutas que modifican reservas consumen los límites (primero por
+# IP, antes de autenticar; luego por cuenta). Las consultas no cuentan.
+BOOKING_LIMITS = [Depends(booking_ip_limiter), Depends(booking_account_limiter)]
+
+# Endpoints de Usuario
+
+@router.get(
+    "/me",
+    response_model=List[ReservationResponse],
+    summary="Mis reservas",
+    description="Obtener las reservas del usuario autenticado"
+)
+async def get_my_reservations(
+    pagination: tuple = Depends(validate_pagination),
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    skip, limit = pagination
+    reservation_service = ReservationService(db)
+
+    return await reservation_service.get_user_reservations(
+        current_user.id,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get(
+    "/dashboard",
+    response_model=UserReservationDashboard,
+    summary="Mi dashboard",
+    description="Próximas reservas y contadores del usuario autenticado"
+)
+async def get_my_dashboard(
+    current_user = Depends(get_current_active_user),
+    # Primario: el dashboard queda en caché y no debe salir de una réplica atrasada
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return await reservation_service.get_dashboard(current_user.id)
+
+
+@router.post(
+    "/",
+    response_model=ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear reserva",
+    description="Reservar una sala en un bloque de 1 hora",
+    dependencies=BOOKING_LIMITS
+)
+async def create_reservation(
+    reservation_data: ReservationCreate,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return await reservation_service.create_reservation(reservation_data, current_user)
+
+
+@router.get(
+    "/availability",
+    response_model=RoomAvailability,
+    summary="Disponibilidad de una sala",
+    description="Bloques libres de una sala en un día (servido desde el índice en memoria)"
+)
+async def get_room_availability(
+    sala_id: int = Query(..., gt=0),
+    fecha: date = Query(...),
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return RoomAvailability(
+        sala_id=sala_id,
+        fecha=fecha,
+        horas_libres=await reservation_service.get_free_hours(sala_id, fecha)
+    )
+
+
+@router.get(
+    "/{reservation_id}",
+    response_model=ReservationResponse,
+    summary="Obtener reserva",
+    description="Obtener el detalle de una reserva propia (o cualquiera si es admin)"
+)
+async def get_reservation(
+    reservation_id: int,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    reservation_service = ReservationService(db)
+    reservation = await reservation_service.get_reservation_by_id(reservation_id)
+
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reserva con ID {reservation_id} no encontrada"
+        )
+
+    # Si no es admin y no es su reserva, denegar acceso
+    if not current_user.is_admin() and reservation.usuario_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No puedes ver reservas de otros usuarios"
+        )
+
+    return reservation
+
+
+@router.patch(
+    "/{reservation_id}/confirm",
+    response_model=ReservationResponse,
+    summary="Confirmar reserva",
+    description="Confirmar una reserva pendiente antes de que venza su plazo",
+    dependencies=BOOKING_LIMITS
+)
+async def confirm_reservation(
+    reservation_id: int,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return await reservation_service.confirm_reservation(reservation_id, current_user)
+
+
+@router.patch(
+    "/{reservation_id}/cancel",
+    response_model=ReservationResponse,
+    summary="Cancelar reserva",
+    description="Cancelar una reserva. Exceder el máximo de cancelaciones del mes genera una penalización",
+    dependencies=BOOKING_LIMITS
+)
+async def cancel_reservation(
+    reservation_id: int,
+    cancel_data: ReservationCancel = None,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return await reservation_service.cancel_reservation(reservation_id, current_user)
+
+
+@router.patch(
+    "/{reservation_id}",
+    response_model=ReservationResponse,
+    summary="Reprogramar reserva",
+    description="Mover una reserva a otra fecha u hora. Si el nuevo horario no está libre se conserva el actual",
+    dependencies=BOOKING_LIMITS
+)
+async def reschedule_reservation(
+    reservation_id: int,
+    update_data: ReservationUpdate,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    reservation_service = ReservationService(db)
+    return await reservation_service.reschedule_reservation(reservation_id, update_data, current_user)
@@ -0,0 +1,153 @@
+# Dashboard de Reservas del Usuario
+
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.reservations.schemas import ReservationSummary, UserReservationDashboard
+from app.rooms.model import Room
+from app.utils.invalidation import invalidation_bus, CHANNEL_ROOMS, CHANNEL_USER_RESERVATIONS
+from app.config.settings import settings
+
+
+def build_dashboard(db: Session, user_id: int, today: date) -> UserReservationDashboard:
+    """
+    Dos consultas, ambas sobre idx_reservations_usuario_fecha_estado:
+    - Contadores con agregados condicionales (una sola pasada por el índice)
+    - Próximas reservas con LIMIT
+    """
+
+    # 1. Contadores
+    past_count, cancelled_count, confirmed_count = (
+        db.query(
+            func.count(case((
+                and_(Reservation.fecha < today, Reservation.estado == ReservationStatus.CONFIRMADA),
+                1
+            ))),
+            func.count(case((Reservation.estado == ReservationStatus.CANCELADA, 1))),
+            func.count(case((Reservation.estado == ReservationStatus.CONFIRMADA, 1)))
+        )
+        .filter(Reservation.usuario_id == user_id)
+        .one()
+    )
+
+    # 2. Próximas reservas (solo las columnas del resumen)
+    upcoming = (
+        db.query(
+            Reservation.id,
+            Reservation.fecha,
+            Reservation.hora_inicio,
+            Reservation.hora_fin,
+            Reservation.estado,
+            Room.nombre.label("sala_nombre"),
+            Room.sede.label("sala_sede")
+        )
+        .join(Room, Room.id == Reservation.sala_id)
+        .filter(
+            Reservation.usuario_id == user_id,
+            Reservation.fecha >= today,
+            Reservation.estado.in_(ACTIVE_STATUSES)
+        )
+        .order_by(Reservation.fecha, Reservation.hora_inicio)
+        .limit(settings.DASHBOARD_UPCOMING_LIMIT)
+        .all()
+    )
+
+    return UserReservationDashboard(
+        upcoming_reservations=[ReservationSummary.model_validate(row) for row in upcoming],
+        past_reservations_count=past_count,
+        cancelled_reservations_count=cancelled_count,
+        # Todas las reservas son bloques de duración fija
+        total_hours_reserved=confirmed_count * settings.RESERVATION_BLOCK_HOURS
+    )
+
+
+class DashboardCache:
+    """
+    Dashboards por usuario con TTL.
+    Cualquier cambio en las reservas de un usuario debe publicar su id en
+    CHANNEL_USER_RESERVATIONS; cambios en salas vacían todo (nombre y sede
+    aparecen en el resumen).
+
+    Como en PrincipalCache, quien construye un dashboard toma antes
+    `generation(user_id)` y lo pasa a `set`: si hubo una invalidación
+    mientras tanto, el resultado (posiblemente viejo) no se guarda.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # user_id -> (día, vence, dashboard)
+        self._entries: Dict[int, Tuple[date, float, UserReservationDashboard]] = {}
+        # Invalidaciones por usuario y de toda la caché
+        self._user_generations: Dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: int, today: date) -> Optional[UserReservationDashboard]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        day, expires, dashboard = entry
+        # Al cambiar el día las "próximas" y las "pasadas" cambian
+        if day != today or expires < time.monotonic():
+            return None
+        return dashboard
+
+    def generation(self, user_id: int) -> Tuple[int, int]:
+        return self._generation, self._user_generations.get(user_id, 0)
+
+    def set(
+        self,
+        user_id: int,
+        today: date,
+        dashboard: UserReservationDashboard,
+        generation: Tuple[int, int]
+    ) -> None:
+        with self._lock:
+            if generation != self.generation(user_id):
+                return
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for key in [k for k, e in self._entries.items() if e[1] < now]:
+                    del self._entries[key]
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user_id] = (today, time.monotonic() + self.ttl_seconds, dashboard)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if len(self._user_generations) >= self.max_entries:
+                # Vaciar los contadores equivale a invalidar toda la caché
+                self._user_generations.clear()
+                self._entries.clear()
+                self._generation += 1
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._user_generations.clear()
+            self._entries.clear()
+
+    def _on_message(self, key: str) -> None:
+        if key == "*":
+            self.clear()
+        else:
+            self.invalidate(int(key))
+
+
+# Instancia global de la caché (una por proceso)
+dashboard_cache = DashboardCache(settings.DASHBOARD_CACHE_SECONDS)
+invalidation_bus.subscribe(CHANNEL_USER_RESERVATIONS, dashboard_cache._on_message)
+invalidation_bus.subscribe(CHANNEL_ROOMS, lambda key: dashboard_cache.clear())
@@ -0,0 +1,215 @@
+# Vencimiento de Reservas Pendientes
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.reservations.model import Reservation, ReservationStatus
+from app.reservations.availability import hour_bit, publish_availability_change
+from app.events.service import add_reservation_event, RESERVATION_EXPIRED
+from app.events.dispatcher import outbox_dispatcher
+from app.utils.database import SessionLocal
+from app.utils.scheduler import TimerScheduler
+from app.utils.invalidation import invalidation_bus, CHANNEL_USER_RESERVATIONS
+from app.utils.clock import get_clock, as_utc
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def pending_expires_at(now: datetime) -> datetime:
+    return now + timedelta(minutes=settings.PENDING_RESERVATION_TTL_MINUTES)
+
+
+class ReservationExpiry:
+    """
+    Libera las reservas PENDIENTE que no se confirmaron a tiempo.
+
+    Cada reserva pendiente tiene un temporizador en memoria. Al arrancar se
+    reconstruyen desde la tabla, así que un reinicio no pierde vencimientos.
+    Con varios workers cada uno puede tener el mismo temporizador: el UPDATE
+    solo afecta a las filas que siguen pendientes y vencidas, y SKIP LOCKED
+    evita que dos workers procesen la misma fila.
+
+    Solo vencen las pendientes con plazo (expires_at). Las pendientes sin
+    plazo son anteriores al vencimiento: reciben uno al arrancar si la
+    confirmación está activa (`requires_confirmation`) y, si no, se dejan
+    como están.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        batch_size: int = 500,
+        requires_confirmation: bool = False
+    ):
+        self.session_factory = session_factory
+        self.requires_confirmation = requires_confirmation
+        self.scheduler = TimerScheduler(
+            self._expire_batch,
+            resolution=1.0,
+            batch_size=batch_size
+        )
+        self.expired = 0
+
+    # Temporizadores -->
+
+    def schedule(self, reservation_id: int, expires_at: datetime) -> None:
+        delay = (as_utc(expires_at) - get_clock().now()).total_seconds()
+        self.scheduler.schedule(reservation_id, delay)
+
+    def cancel(self, reservation_id: int) -> None:
+        self.scheduler.cancel(reservation_id)
+
+    def _load_pending(self) -> List[Tuple[int, datetime]]:
+        db = self.session_factory()
+        try:
+            if self.requires_confirmation:
+                # Pendientes sin plazo (creadas antes de existir el
+                # vencimiento): el plazo empieza a contar ahora
+                (
+                    db.query(Reservation)
+                    .filter(
+                        Reservation.estado == ReservationStatus.PENDIENTE,
+                        Reservation.expires_at.is_(None)
+                    )
+                    .update(
+                        {Reservation.expires_at: pending_expires_at(get_clock().now())},
+                        synchronize_session=False
+                    )
+                )
+                db.commit()
+
+            # Usa idx_reservations_estado_expira (responde desde el índice)
+            return (
+                db.query(Reservation.id, Reservation.expires_at)
+                .filter(
+                    Reservation.estado == ReservationStatus.PENDIENTE,
+                    Reservation.expires_at.isnot(None)
+                )
+                .all()
+            )
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def rebuild(self) -> int:
+        """Reprograma todas las reservas pendientes de la tabla"""
+        pending = await asyncio.to_thread(self._load_pending)
+        self.scheduler.clear()
+        for reservation_id, expires_at in pending:
+            self.schedule(reservation_id, expires_at)
+        return len(pending)
+
+    # Vencimiento -->
+
+    def expire(self, db: Session, reservation_ids: List[int]) -> Tuple[List[tuple], Dict[int, datetime]]:
+        """
+        Vence en un solo UPDATE las reservas de la lista que sigan pendientes
+        y cuyo plazo ya pasó (las que no tienen plazo nunca vencen).
+        Retorna los bloques liberados (usuario_id, sala_id, fecha, hora_inicio)
+        y las reservas que aún no vencen (por ejemplo, si el reloj del
+        temporizador se adelantó).
+        """
+        now = get_clock().now()
+        rows = (
+            db.query(Reservation)
+            .filter(
+                Reservation.id.in_(reservation_ids),
+                Reservation.estado == ReservationStatus.PENDIENTE,
+                Reservation.expires_at.isnot(None)
+            )
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        expired, not_yet = [], {}
+        for reservation in rows:
+            if as_utc(reservation.expires_at) <= now:
+                expired.append(reservation)
+            else:
+                not_yet[reservation.id] = reservation.expires_at
+
+        if expired:
+            (
+                db.query(Reservation)
+                .filter(Reservation.id.in_([r.id for r in expired]))
+                .update(
+                    {Reservation.estado: ReservationStatus.EXPIRADA},
+                    synchronize_session=False
+                )
+            )
+            for reservation in expired:
+                add_reservation_event(
+                    db,
+                    RESERVATION_EXPIRED,
+                    reservation,
+                    estado=ReservationStatus.EXPIRADA.value
+                )
+
+        # Antes del commit: después los atributos se recargarían fila a fila
+        released = [(r.usuario_id, r.sala_id, r.fecha, r.hora_inicio) for r in expired]
+        db.commit()
+        return released, not_yet
+
+    def _expire_sync(self, reservation_ids: List[int]):
+        db = self.session_factory()
+        try:
+            return self.expire(db, reservation_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _expire_batch(self, reservation_ids: List[int]) -> None:
+        released, not_yet = await asyncio.to_thread(self._expire_sync, reservation_ids)
+
+        for reservation_id, expires_at in not_yet.items():
+            self.schedule(reservation_id, expires_at)
+
+        if not released:
+            return
+        self.expired += len(released)
+        outbox_dispatcher.notify()
+
+        # Un mensaje por (sala, fecha) con todos los bloques liberados
+        masks: Dict[tuple, int] = defaultdict(int)
+        for _, sala_id, fecha, hora_inicio in released:
+            masks[(sala_id, fecha)] |= hour_bit(hora_inicio)
+        for (sala_id, fecha), mask in masks.items():
+            publish_availability_change(sala_id, fecha, released=mask)
+
+        for user_id in {row[0] for row in released}:
+            invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(user_id))
+
+        logger.info("%s reservas pendientes vencidas", len(released))
+
+    # Ciclo de vida -->
+
+    async def start(self) -> None:
+        count = await self.rebuild()
+        self.scheduler.start()
+        logger.info("Vencimiento de reservas iniciado con %s pendientes", count)
+
+    async def stop(self) -> None:
+        await self.scheduler.stop()
+
+    def metrics(self) -> dict:
+        metrics = self.scheduler.metrics()
+        metrics["expired"] = self.expired
+        return metrics
+
+
+# Instancia global (una por proceso)
+reservation_expiry = ReservationExpiry(
+    SessionLocal,
+    batch_size=settings.RESERVATION_EXPIRY_BATCH_SIZE,
+    requires_confirmation=settings.RESERVATION_REQUIRES_CONFIRMATION
+)
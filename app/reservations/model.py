@@ -2,7 +2,10 @@
 # Representa las Reservas de Salas
 
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, ForeignKey, Enum
+from sqlalchemy import (
+    Column, Integer, String, Boolean, DateTime, Date, Time, ForeignKey, Enum, Index,
+    UniqueConstraint, Computed
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -15,11 +18,50 @@ class ReservationStatus(str, enum.Enum):
     PENDIENTE = "pendiente"
     CONFIRMADA = "confirmada"
     CANCELADA = "cancelada"
+    EXPIRADA = "expirada"  # Pendiente que no se confirmó a tiempo
+
+
+# Estados que ocupan un horario
+ACTIVE_STATUSES = (ReservationStatus.PENDIENTE, ReservationStatus.CONFIRMADA)
+
+# 1 si la reserva ocupa su horario, NULL si no (canceladas y expiradas).
+# LOWER: MySQL guarda el valor del ENUM y SQLAlchemy envía el nombre.
+SLOT_ACTIVO_SQL = "CASE WHEN LOWER(estado) IN ('pendiente', 'confirmada') THEN 1 END"
 
 
 class Reservation(Base):
     __tablename__ = "reservations"
     
+    # Índices compuestos para las consultas más frecuentes.
+    # Cada uno cubre por completo su consulta: MySQL responde desde el
+    # índice sin leer las filas de la tabla.
+    __table_args__ = (
+        # Un solo horario activo por sala: los NULL de slot_activo no chocan,
+        # así que una reserva cancelada o expirada no bloquea el horario
+        UniqueConstraint(
+            "sala_id", "fecha", "hora_inicio", "slot_activo",
+            name="uk_reservations_sala_fecha_hora"
+        ),
+        # Ocupación de una sala en un día:
+        # WHERE sala_id = ? AND fecha = ? AND estado IN (...) -> hora_inicio
+        Index(
+            "idx_reservations_sala_fecha_estado",
+            "sala_id", "fecha", "estado", "hora_inicio"
+        ),
+        # Cupo diario por usuario (MAX_DAILY_RESERVATIONS_PER_USER):
+        # WHERE usuario_id = ? AND fecha = ? AND estado IN (ACTIVE_STATUSES)
+        Index(
+            "idx_reservations_usuario_fecha_estado",
+            "usuario_id", "fecha", "estado"
+        ),
+        # Reconstrucción de los temporizadores de vencimiento al arrancar:
+        # WHERE estado = 'pendiente' -> id, expires_at
+        Index(
+            "idx_reservations_estado_expira",
+            "estado", "expires_at"
+        ),
+    )
+    
     # Clave primaria
     id = Column(Integer, primary_key=True, index=True)
     
@@ -27,15 +69,13 @@ class Reservation(Base):
     usuario_id = Column(
         Integer, 
         ForeignKey("users.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     sala_id = Column(
         Integer,
         ForeignKey("rooms.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Información de la reserva
@@ -51,6 +91,12 @@ class Reservation(Base):
         index=True
     )
     
+    # Calculada por la base de datos a partir del estado (ver SLOT_ACTIVO_SQL)
+    slot_activo = Column(Integer, Computed(SLOT_ACTIVO_SQL, persisted=True))
+    
+    # Plazo para confirmar una reserva pendiente (UTC)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
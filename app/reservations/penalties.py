@@ -0,0 +1,61 @@
+# Sistema de Penalizaciones por Cancelaciones
+
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Union
+
+from app.auth.model import User
+from app.auth.principal import Principal
+from app.utils.exceptions import UserPenalizedException
+from app.config.settings import settings
+
+
+class PenaltyService:
+    """
+    Mantiene contadores de cancelaciones por usuario y su penalización.
+
+    - Los contadores se actualizan al cancelar (en la misma transacción)
+    - Al reservar solo se revisa `penalized_until`, sin consultas agregadas
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Métodos de Consulta -->
+
+    @staticmethod
+    def is_penalized(user: Union[User, Principal], today: date) -> bool:
+        return user.penalized_until is not None and user.penalized_until >= today
+
+    @staticmethod
+    def ensure_can_book(user: Principal, today: date) -> None:
+        # Revisión O(1): el dato viaja con el usuario autenticado
+        if PenaltyService.is_penalized(user, today):
+            raise UserPenalizedException(user.penalized_until.isoformat())
+
+    # Métodos de Actualización -->
+
+    def register_cancellation(self, user_id: int, today: date) -> User:
+
+        # 1. Bloquear la fila del usuario para evitar carreras entre cancelaciones
+        user = (
+            self.db.query(User)
+            .filter(User.id == user_id)
+            .with_for_update()
+            .one()
+        )
+
+        # 2. Reiniciar el contador si cambió el mes
+        periodo = today.replace(day=1)
+        if user.cancelaciones_periodo != periodo:
+            user.cancelaciones_periodo = periodo
+            user.cancelaciones_mes = 0
+
+        user.cancelaciones_mes += 1
+
+        # 3. Penalizar si se excede el máximo permitido
+        if user.cancelaciones_mes > settings.MAX_CANCELLATIONS_PER_MONTH:
+            user.penalized_until = today + timedelta(days=settings.PENALTY_DAYS)
+
+        # El commit lo hace quien llama (misma transacción que la cancelación)
+        return user
@@ -1,70 +1,67 @@
 # Esquemas para el módulo de Reservas
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Annotated, Optional, List
 from datetime import datetime, date, time
 from app.reservations.model import ReservationStatus
+from app.reservations.availability import OPENING_HOUR, CLOSING_HOUR
+from app.config.settings import settings
+
+BLOCK_MINUTES = settings.RESERVATION_BLOCK_HOURS * 60
+
+SalaId = Annotated[int, Field(gt=0)]
+
+
+def validate_time_block(hora_inicio: time, hora_fin: time) -> None:
+    """Reglas de un bloque de reserva; lanza ValueError si no se cumplen"""
+    
+    # Verificar que hora_fin sea después de hora_inicio
+    if hora_fin <= hora_inicio:
+        raise ValueError('La hora de fin debe ser posterior a la hora de inicio')
+    
+    # Verificar que sea exactamente 1 hora
+    duracion = (hora_fin.hour * 60 + hora_fin.minute) - (hora_inicio.hour * 60 + hora_inicio.minute)
+    if duracion != BLOCK_MINUTES:
+        raise ValueError('Las reservas deben ser de exactamente 1 hora')
+    
+    # Verificar horarios de trabajo (8:00 - 18:00)
+    if hora_inicio.hour < OPENING_HOUR or hora_fin.hour > CLOSING_HOUR:
+        raise ValueError(
+            f'Las reservas solo pueden hacerse entre {OPENING_HOUR}:00 y {CLOSING_HOUR}:00'
+        )
+    
+    # Verificar que sean en punto
+    if hora_inicio.minute != 0 or hora_fin.minute != 0:
+        raise ValueError('Las reservas solo pueden hacerse en horarios en punto (ej: 09:00-10:00)')
+
 
 class ReservationBase(BaseModel):
     """Schema base para reservas"""
-    sala_id: int = Field(..., gt=0, description="ID de la sala a reservar")
+    sala_id: SalaId = Field(..., description="ID de la sala a reservar")
     fecha: date = Field(..., description="Fecha de la reserva")
     hora_inicio: time = Field(..., description="Hora de inicio (formato HH:MM)")
     hora_fin: time = Field(..., description="Hora de fin (formato HH:MM)")
 
 class ReservationCreate(ReservationBase):
-    @validator('fecha')
-    def validate_fecha(cls, v):
-        if v < date.today():
-            raise ValueError('No se pueden hacer reservas en fechas pasadas')
-        
-        # No más de 30 días de anticipación
-        from datetime import timedelta
-        max_date = date.today() + timedelta(days=30)
-        if v > max_date:
-            raise ValueError('No se pueden hacer reservas con más de 30 días de anticipación')
-        
-        return v
+    # La fecha (pasada o con demasiada anticipación) la valida el servicio:
+    # "hoy" depende de la zona horaria de la sede
     
-    @validator('hora_fin')
-    def validate_horario(cls, v, values):
-        if 'hora_inicio' not in values:
-            return v
-        
-        hora_inicio = values['hora_inicio']
-        
-        # Verificar que hora_fin sea después de hora_inicio
-        if v <= hora_inicio:
-            raise ValueError('La hora de fin debe ser posterior a la hora de inicio')
-        
-        # Verificar que sea exactamente 1 hora
-        inicio_minutes = hora_inicio.hour * 60 + hora_inicio.minute
-        fin_minutes = v.hour * 60 + v.minute
-        duracion = fin_minutes - inicio_minutes
-        
-        if duracion != 60:
-            raise ValueError('Las reservas deben ser de exactamente 1 hora')
-        
-        # Verificar horarios de trabajo (8:00 - 18:00)
-        if hora_inicio.hour < 8 or v.hour > 18:
-            raise ValueError('Las reservas solo pueden hacerse entre 8:00 y 18:00')
-        
-        # Verificar que sean en punto
-        if hora_inicio.minute != 0 or v.minute != 0:
-            raise ValueError('Las reservas solo pueden hacerse en horarios en punto (ej: 09:00-10:00)')
-        
-        return v
+    @model_validator(mode='after')
+    def validate_horario(self) -> 'ReservationCreate':
+        validate_time_block(self.hora_inicio, self.hora_fin)
+        return self
 
 class ReservationUpdate(BaseModel):
     fecha: Optional[date] = None
     hora_inicio: Optional[time] = None
     hora_fin: Optional[time] = None
     
-    @validator('fecha')
-    def validate_fecha(cls, v):
-        if v and v < date.today():
-            raise ValueError('No se pueden reprogramar reservas a fechas pasadas')
-        return v
+    @model_validator(mode='after')
+    def validate_horario(self) -> 'ReservationUpdate':
+        # Con una sola hora, la otra la completa el servicio
+        if self.hora_inicio is not None and self.hora_fin is not None:
+            validate_time_block(self.hora_inicio, self.hora_fin)
+        return self
 
 class ReservationResponse(BaseModel):
     id: int
@@ -82,9 +79,9 @@ class ReservationResponse(BaseModel):
     sala_nombre: Optional[str] = None
     sala_sede: Optional[str] = None
     
-    class Config:
-        from_attributes = True
-        schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "usuario_id": 1,
@@ -99,6 +96,7 @@ class ReservationResponse(BaseModel):
                 "sala_sede": "Campus Norte"
             }
         }
+    )
 
 class ReservationSummary(BaseModel):
     id: int
@@ -109,8 +107,7 @@ class ReservationSummary(BaseModel):
     sala_nombre: str
     sala_sede: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ReservationList(BaseModel):
     reservations: List[ReservationSummary]
@@ -126,8 +123,8 @@ class ReservationStats(BaseModel):
     this_month_reservations: int
     most_used_room: Optional[str] = None
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "total_reservations": 45,
                 "active_reservations": 12,
@@ -136,6 +133,7 @@ class ReservationStats(BaseModel):
                 "most_used_room": "Sala Reuniones A"
             }
         }
+    )
 
 class ReservationFilter(BaseModel):
     fecha_inicio: Optional[date] = None
@@ -144,6 +142,12 @@ class ReservationFilter(BaseModel):
     estado: Optional[ReservationStatus] = None
     usuario_id: Optional[int] = None  # Solo para admin
 
+# Schema de disponibilidad de una sala en un día
+class RoomAvailability(BaseModel):
+    sala_id: int
+    fecha: date
+    horas_libres: List[int] = Field(..., description="Horas de inicio de los bloques libres")
+
 # Schema para cancelación de reserva
 class ReservationCancel(BaseModel):
     motivo: Optional[str] = Field(None, max_length=200, description="Motivo de la cancelación")
@@ -155,8 +159,8 @@ class UserReservationDashboard(BaseModel):
     cancelled_reservations_count: int
     total_hours_reserved: int
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "upcoming_reservations": [
                     {
@@ -173,4 +177,5 @@ class UserReservationDashboard(BaseModel):
                 "cancelled_reservations_count": 2,
                 "total_hours_reserved": 25
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
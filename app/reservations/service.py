@@ -0,0 +1,486 @@
+# Lógica de Negocio de Reservas
+
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List, Dict
+from datetime import date, datetime, timedelta
+
+from app.auth.principal import Principal
+from app.rooms.model import Room
+from app.rooms.catalog import room_catalog
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.reservations.schemas import ReservationCreate, ReservationUpdate
+from app.reservations.penalties import PenaltyService
+from app.reservations.availability import (
+    OPENING_HOUR,
+    CLOSING_HOUR,
+    FULL_MASK,
+    hour_bit,
+    mask_to_hours,
+    availability_index,
+    publish_availability_change
+)
+from app.reservations.expiry import reservation_expiry, pending_expires_at
+from app.reservations.dashboard import build_dashboard, dashboard_cache
+from app.reservations.schemas import UserReservationDashboard
+from app.reports.user_hours import publish_user_hours_change
+from app.events.service import (
+    add_reservation_event,
+    RESERVATION_CREATED,
+    RESERVATION_CANCELLED,
+    RESERVATION_RESCHEDULED,
+    RESERVATION_CONFIRMED
+)
+from app.events.dispatcher import outbox_dispatcher
+from app.utils.exceptions import (
+    ReservationNotFoundException,
+    RoomNotFoundException,
+    RoomNotAvailableException,
+    TimeSlotNotAvailableException,
+    ReservationLimitExceededException,
+    CannotCancelReservationException,
+    CannotConfirmReservationException,
+    CannotRescheduleReservationException,
+    InsufficientPermissionsException,
+    InvalidTimeBlockException,
+    PastDateReservationException,
+    ReservationTooFarInAdvanceException
+)
+from app.utils.invalidation import invalidation_bus, CHANNEL_USERS, CHANNEL_USER_RESERVATIONS
+from app.utils.clock import Clock, get_clock, as_utc
+from app.utils.singleflight import single_flight
+from app.config.settings import settings
+
+
+class ReservationService:
+    def __init__(self, db: Session, clock: Optional[Clock] = None):
+        self.db = db
+        self.clock = clock or get_clock()
+        self.penalties = PenaltyService(db)
+
+    def _today_for_room(self, sala_id: int) -> date:
+        # Las fechas de reserva son locales a la sede (catálogo en memoria, sin consulta)
+        room = room_catalog.get_snapshot().by_id.get(sala_id)
+        return self.clock.today(room.sede if room else None)
+
+    @staticmethod
+    def _ensure_bookable_date(fecha: date, today: date) -> None:
+        # `today` es el día local de la sede de la sala
+        if fecha < today:
+            raise PastDateReservationException()
+        if fecha > today + timedelta(days=settings.MAX_RESERVATION_DAYS_ADVANCE):
+            raise ReservationTooFarInAdvanceException(settings.MAX_RESERVATION_DAYS_ADVANCE)
+
+    # Métodos de Consulta -->
+
+    async def get_reservation_by_id(self, reservation_id: int) -> Optional[Reservation]:
+        return self.db.query(Reservation).filter(Reservation.id == reservation_id).first()
+
+    async def get_user_reservations(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Reservation]:
+        return (
+            self.db.query(Reservation)
+            .filter(Reservation.usuario_id == user_id)
+            .order_by(Reservation.fecha.desc(), Reservation.hora_inicio.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    async def count_user_reservations_for_day(self, user_id: int, fecha: date) -> int:
+        # Usa idx_reservations_usuario_fecha_estado
+        return (
+            self.db.query(Reservation.id)
+            .filter(
+                Reservation.usuario_id == user_id,
+                Reservation.fecha == fecha,
+                Reservation.estado.in_(ACTIVE_STATUSES)
+            )
+            .count()
+        )
+
+    async def is_slot_taken(self, sala_id: int, fecha: date, hora_inicio) -> bool:
+        # Usa idx_reservations_sala_fecha_estado
+        return (
+            self.db.query(Reservation.id)
+            .filter(
+                Reservation.sala_id == sala_id,
+                Reservation.fecha == fecha,
+                Reservation.estado.in_(ACTIVE_STATUSES),
+                Reservation.hora_inicio == hora_inicio
+            )
+            .first()
+        ) is not None
+
+    async def get_free_hours(self, sala_id: int, fecha: date) -> List[int]:
+        # Camino rápido: el día ya está en el índice
+        mask = availability_index.peek(sala_id, fecha)
+        if mask is not None:
+            return mask_to_hours(FULL_MASK & ~mask)
+        return await self._load_free_hours(sala_id, fecha)
+
+    @single_flight("reservations.free_hours")
+    def _load_free_hours(self, sala_id: int, fecha: date) -> List[int]:
+        # Muchos clientes piden el mismo día a la vez: una sola carga
+        return availability_index.free_hours(self.db, sala_id, fecha)
+
+    async def get_dashboard(self, user_id: int) -> UserReservationDashboard:
+        today = self.clock.today()
+        if dashboard_cache.enabled:
+            dashboard = dashboard_cache.get(user_id, today)
+            if dashboard is not None:
+                return dashboard
+
+        generation = dashboard_cache.generation(user_id)
+        dashboard = build_dashboard(self.db, user_id, today)
+        if dashboard_cache.enabled:
+            dashboard_cache.set(user_id, today, dashboard, generation)
+        return dashboard
+
+    # Métodos de Creación -->
+
+    async def create_reservation(
+        self,
+        reservation_data: ReservationCreate,
+        current_user: Principal
+    ) -> Reservation:
+        today = self.clock.today()
+
+        # 1. Verificar penalización (sin consultas adicionales)
+        PenaltyService.ensure_can_book(current_user, today)
+
+        # 2. Verificar que la sala exista y esté activa
+        room = self.db.get(Room, reservation_data.sala_id)
+        if not room:
+            raise RoomNotFoundException(reservation_data.sala_id)
+        if not room.is_active:
+            raise RoomNotAvailableException(reservation_data.sala_id)
+        self._ensure_bookable_date(reservation_data.fecha, self.clock.today(room.sede))
+
+        # 3. Verificar el cupo diario del usuario
+        daily_count = await self.count_user_reservations_for_day(
+            current_user.id,
+            reservation_data.fecha
+        )
+        if daily_count >= settings.MAX_DAILY_RESERVATIONS_PER_USER:
+            raise ReservationLimitExceededException(settings.MAX_DAILY_RESERVATIONS_PER_USER)
+
+        # 4. Verificar que el horario esté libre
+        if await self.is_slot_taken(
+            reservation_data.sala_id,
+            reservation_data.fecha,
+            reservation_data.hora_inicio
+        ):
+            raise TimeSlotNotAvailableException(
+                str(reservation_data.fecha),
+                str(reservation_data.hora_inicio),
+                str(reservation_data.hora_fin)
+            )
+
+        # 5. Guardar en base de datos (pendiente si requiere confirmación)
+        db_reservation = Reservation(
+            usuario_id=current_user.id,
+            sala_id=reservation_data.sala_id,
+            fecha=reservation_data.fecha,
+            hora_inicio=reservation_data.hora_inicio,
+            hora_fin=reservation_data.hora_fin,
+            estado=ReservationStatus.CONFIRMADA
+        )
+        if settings.RESERVATION_REQUIRES_CONFIRMATION:
+            db_reservation.estado = ReservationStatus.PENDIENTE
+            db_reservation.expires_at = pending_expires_at(self.clock.now())
+
+        try:
+            self.db.add(db_reservation)
+            self.db.flush()  # Obtiene el ID para el evento
+
+            # 6. Evento de dominio en la misma transacción
+            add_reservation_event(self.db, RESERVATION_CREATED, db_reservation)
+
+            self.db.commit()
+            self.db.refresh(db_reservation)
+            outbox_dispatcher.notify()
+            invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(db_reservation.usuario_id))
+            if db_reservation.estado == ReservationStatus.PENDIENTE:
+                reservation_expiry.schedule(db_reservation.id, db_reservation.expires_at)
+            else:
+                publish_user_hours_change(db_reservation.usuario_id, db_reservation.fecha)
+            publish_availability_change(
+                db_reservation.sala_id,
+                db_reservation.fecha,
+                occupied=hour_bit(db_reservation.hora_inicio)
+            )
+            return db_reservation
+
+        except IntegrityError:
+            # Otra petición tomó el horario al mismo tiempo
+            self.db.rollback()
+            raise TimeSlotNotAvailableException(
+                str(reservation_data.fecha),
+                str(reservation_data.hora_inicio),
+                str(reservation_data.hora_fin)
+            )
+
+    # Métodos de Confirmación -->
+
+    async def confirm_reservation(self, reservation_id: int, current_user: Principal) -> Reservation:
+
+        # 1. Bloquear la reserva para no competir con el vencimiento
+        reservation = (
+            self.db.query(Reservation)
+            .filter(Reservation.id == reservation_id)
+            .with_for_update()
+            .first()
+        )
+        if not reservation:
+            raise ReservationNotFoundException(reservation_id)
+
+        # 2. Solo el propietario o un admin pueden confirmar
+        if reservation.usuario_id != current_user.id and not current_user.is_admin():
+            raise InsufficientPermissionsException("confirmar esta reserva")
+
+        # 3. Debe seguir pendiente y dentro del plazo
+        if reservation.estado != ReservationStatus.PENDIENTE:
+            raise CannotConfirmReservationException(
+                f"La reserva no está pendiente (estado: {reservation.estado.value})"
+            )
+        if reservation.expires_at is not None and as_utc(reservation.expires_at) <= self.clock.now():
+            raise CannotConfirmReservationException("El plazo para confirmar la reserva ya venció")
+
+        reservation.estado = ReservationStatus.CONFIRMADA
+        reservation.expires_at = None
+        add_reservation_event(
+            self.db,
+            RESERVATION_CONFIRMED,
+            reservation,
+            confirmed_by=current_user.id
+        )
+
+        self.db.commit()
+        self.db.refresh(reservation)
+        outbox_dispatcher.notify()
+        invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(reservation.usuario_id))
+        publish_user_hours_change(reservation.usuario_id, reservation.fecha)
+        reservation_expiry.cancel(reservation.id)
+        return reservation
+
+    # Métodos de Cancelación -->
+
+    async def cancel_reservation(self, reservation_id: int, current_user: Principal) -> Reservation:
+        today = self.clock.today()
+
+        # 1. Bloquear la reserva mientras se cancela
+        reservation = (
+            self.db.query(Reservation)
+            .filter(Reservation.id == reservation_id)
+            .with_for_update()
+            .first()
+        )
+        if not reservation:
+            raise ReservationNotFoundException(reservation_id)
+
+        # 2. Solo el propietario o un admin pueden cancelar
+        is_owner = reservation.usuario_id == current_user.id
+        if not is_owner and not current_user.is_admin():
+            raise InsufficientPermissionsException("cancelar esta reserva")
+
+        # 3. Validar estado y fecha
+        if reservation.estado == ReservationStatus.CANCELADA:
+            raise CannotCancelReservationException("La reserva ya está cancelada")
+        if reservation.estado == ReservationStatus.EXPIRADA:
+            raise CannotCancelReservationException("La reserva expiró sin confirmarse")
+        if reservation.fecha < self._today_for_room(reservation.sala_id):
+            raise CannotCancelReservationException("No se pueden cancelar reservas pasadas")
+
+        was_confirmed = reservation.estado == ReservationStatus.CONFIRMADA
+        reservation.estado = ReservationStatus.CANCELADA
+
+        # 4. Actualizar contadores de penalización (solo si cancela el propietario)
+        if is_owner:
+            self.penalties.register_cancellation(reservation.usuario_id, today)
+
+        # 5. Evento de dominio en la misma transacción
+        add_reservation_event(
+            self.db,
+            RESERVATION_CANCELLED,
+            reservation,
+            cancelled_by=current_user.id
+        )
+
+        self.db.commit()
+        self.db.refresh(reservation)
+        outbox_dispatcher.notify()
+        invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(reservation.usuario_id))
+        reservation_expiry.cancel(reservation.id)
+
+        # 6. Invalidar cachés: horario liberado y contadores del usuario
+        publish_availability_change(
+            reservation.sala_id,
+            reservation.fecha,
+            released=hour_bit(reservation.hora_inicio)
+        )
+        if was_confirmed:
+            publish_user_hours_change(reservation.usuario_id, reservation.fecha, -1)
+        if is_owner:
+            invalidation_bus.publish(CHANNEL_USERS, str(reservation.usuario_id))
+        return reservation
+
+    # Métodos de Reprogramación -->
+
+    def _lock_slot_sets(self, sala_id: int, fechas: List[date]) -> Dict[date, List[Reservation]]:
+        """
+        Bloquea (FOR UPDATE) las reservas activas de la sala en cada fecha.
+        Sobre idx_reservations_sala_fecha_estado, InnoDB bloquea también el
+        hueco del rango: nadie puede insertar en esos días hasta el commit.
+        Se bloquea siempre en orden de fecha para no generar deadlocks.
+        """
+        locked: Dict[date, List[Reservation]] = {}
+        for fecha in sorted(set(fechas)):
+            locked[fecha] = (
+                self.db.query(Reservation)
+                .filter(
+                    Reservation.sala_id == sala_id,
+                    Reservation.fecha == fecha,
+                    Reservation.estado.in_(ACTIVE_STATUSES)
+                )
+                .order_by(Reservation.hora_inicio)
+                .with_for_update()
+                .populate_existing()
+                .all()
+            )
+        return locked
+
+    @staticmethod
+    def _resolve_new_block(reservation: Reservation, update_data: ReservationUpdate):
+        # Si solo llega una de las horas, la otra se deduce del bloque de 1 hora
+        block = timedelta(hours=settings.RESERVATION_BLOCK_HOURS)
+        hora_inicio, hora_fin = update_data.hora_inicio, update_data.hora_fin
+        if hora_inicio is None and hora_fin is None:
+            hora_inicio, hora_fin = reservation.hora_inicio, reservation.hora_fin
+        elif hora_fin is None:
+            hora_fin = (datetime.combine(date.min, hora_inicio) + block).time()
+        elif hora_inicio is None:
+            hora_inicio = (datetime.combine(date.min, hora_fin) - block).time()
+
+        duration = (
+            datetime.combine(date.min, hora_fin) - datetime.combine(date.min, hora_inicio)
+        )
+        if (
+            duration != block
+            or hora_inicio.minute != 0
+            or hora_fin.minute != 0
+            or hora_inicio.hour < OPENING_HOUR
+            or hora_fin.hour > CLOSING_HOUR
+        ):
+            raise InvalidTimeBlockException()
+
+        return update_data.fecha or reservation.fecha, hora_inicio, hora_fin
+
+    async def reschedule_reservation(
+        self,
+        reservation_id: int,
+        update_data: ReservationUpdate,
+        current_user: Principal
+    ) -> Reservation:
+        """
+        Mueve la reserva a otro horario en una sola transacción.
+        Nunca queda sin horario: si el nuevo no está libre, conserva el actual.
+        """
+        # 1. Lectura sin bloqueo para saber qué días hay que bloquear
+        reservation = self.db.get(Reservation, reservation_id)
+        if not reservation:
+            raise ReservationNotFoundException(reservation_id)
+        today = self._today_for_room(reservation.sala_id)
+
+        is_owner = reservation.usuario_id == current_user.id
+        if not is_owner and not current_user.is_admin():
+            raise InsufficientPermissionsException("reprogramar esta reserva")
+
+        new_fecha, hora_inicio, hora_fin = self._resolve_new_block(reservation, update_data)
+        self._ensure_bookable_date(new_fecha, today)
+        if is_owner:
+            PenaltyService.ensure_can_book(current_user, today)
+
+        # 2. Bloquear los horarios del día actual y del nuevo (incluye la reserva)
+        old_fecha, old_hora = reservation.fecha, reservation.hora_inicio
+        locked = self._lock_slot_sets(reservation.sala_id, [old_fecha, new_fecha])
+
+        # 3. Revalidar con los datos ya bloqueados
+        if reservation not in locked[old_fecha] or reservation.hora_inicio != old_hora:
+            # Se canceló o se movió mientras tanto
+            self.db.rollback()
+            raise CannotRescheduleReservationException(
+                "La reserva cambió mientras se reprogramaba, inténtalo de nuevo"
+            )
+        if reservation.fecha < today:
+            self.db.rollback()
+            raise CannotRescheduleReservationException("No se pueden reprogramar reservas pasadas")
+
+        if new_fecha == old_fecha and hora_inicio == old_hora:
+            self.db.rollback()
+            return reservation
+
+        # 4. El nuevo horario debe estar libre (sin contar esta misma reserva)
+        if any(
+            other.id != reservation.id and other.hora_inicio == hora_inicio
+            for other in locked[new_fecha]
+        ):
+            self.db.rollback()
+            raise TimeSlotNotAvailableException(str(new_fecha), str(hora_inicio), str(hora_fin))
+
+        # 5. Cupo diario del propietario en el nuevo día
+        if new_fecha != old_fecha:
+            daily_count = await self.count_user_reservations_for_day(
+                reservation.usuario_id,
+                new_fecha
+            )
+            if daily_count >= settings.MAX_DAILY_RESERVATIONS_PER_USER:
+                self.db.rollback()
+                raise ReservationLimitExceededException(settings.MAX_DAILY_RESERVATIONS_PER_USER)
+
+        # 6. Mover la reserva y registrar el evento en la misma transacción
+        previous = {
+            "fecha": old_fecha.isoformat(),
+            "hora_inicio": old_hora.strftime("%H:%M"),
+            "hora_fin": reservation.hora_fin.strftime("%H:%M")
+        }
+        reservation.fecha = new_fecha
+        reservation.hora_inicio = hora_inicio
+        reservation.hora_fin = hora_fin
+
+        try:
+            add_reservation_event(
+                self.db,
+                RESERVATION_RESCHEDULED,
+                reservation,
+                previous=previous,
+                rescheduled_by=current_user.id
+            )
+            self.db.commit()
+            self.db.refresh(reservation)
+        except IntegrityError:
+            self.db.rollback()
+            raise TimeSlotNotAvailableException(str(new_fecha), str(hora_inicio), str(hora_fin))
+
+        outbox_dispatcher.notify()
+        invalidation_bus.publish(CHANNEL_USER_RESERVATIONS, str(reservation.usuario_id))
+
+        # 7. Actualizar el índice de disponibilidad de ambos días
+        if new_fecha == old_fecha:
+            publish_availability_change(
+                reservation.sala_id,
+                new_fecha,
+                occupied=hour_bit(hora_inicio),
+                released=hour_bit(old_hora)
+            )
+        else:
+            publish_availability_change(reservation.sala_id, old_fecha, released=hour_bit(old_hora))
+            publish_availability_change(reservation.sala_id, new_fecha, occupied=hour_bit(hora_inicio))
+            if reservation.estado == ReservationStatus.CONFIRMADA:
+                publish_user_hours_change(reservation.usuario_id, old_fecha, -1)
+                publish_user_hours_change(reservation.usuario_id, new_fecha)
+        return reservation
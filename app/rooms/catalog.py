@@ -0,0 +1,148 @@
+# Catálogo de Salas en Memoria
+
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.rooms.model import Room
+from app.rooms.schemas import RoomResponse, RoomSummary
+from app.rooms.resources import recursos_to_mask
+from app.utils.database import SessionLocal
+from app.utils.invalidation import invalidation_bus, CHANNEL_ROOMS
+
+
+class RoomCatalogSnapshot:
+    """
+    Foto del catálogo de salas en una versión concreta.
+    Se construye completa y no se modifica: las escrituras generan una
+    nueva versión y el catálogo reemplaza la referencia de una vez, así
+    que un lector nunca ve un estado a medias.
+    """
+
+    def __init__(self, version: int, rooms: Tuple[RoomResponse, ...]):
+        self.version = version
+        self.rooms = rooms
+        self.by_id: Dict[int, RoomResponse] = {room.id: room for room in rooms}
+
+        # Equivalente en memoria de rooms.recursos_mask
+        self.recursos_masks: Dict[int, int] = {
+            room.id: recursos_to_mask(room.recursos) for room in rooms
+        }
+
+        # Índices para los filtros frecuentes
+        by_sede: Dict[str, List[RoomResponse]] = {}
+        for room in rooms:
+            by_sede.setdefault(room.sede, []).append(room)
+        self.by_sede: Dict[str, Tuple[RoomResponse, ...]] = {
+            sede: tuple(sede_rooms) for sede, sede_rooms in by_sede.items()
+        }
+        self.summaries: Dict[int, RoomSummary] = {
+            room.id: RoomSummary(
+                id=room.id,
+                nombre=room.nombre,
+                sede=room.sede,
+                capacidad=room.capacidad,
+                is_active=room.is_active,
+                recursos_count=bin(self.recursos_masks[room.id]).count("1")
+            )
+            for room in rooms
+        }
+
+        # Los ETag se calculan del contenido: son iguales entre procesos
+        self.room_etags: Dict[int, str] = {}
+        catalog_hash = hashlib.blake2b(digest_size=16, person=b"room-catalog")
+        for room in rooms:
+            payload = room.model_dump_json().encode()
+            catalog_hash.update(payload)
+            self.room_etags[room.id] = f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+        self.etag = f'W/"{catalog_hash.hexdigest()}"'
+
+        self.last_modified: Optional[datetime] = max(
+            (room.updated_at or room.created_at for room in rooms),
+            default=None
+        )
+
+    def filter(
+        self,
+        include_inactive: bool = False,
+        recursos_mask: int = 0,
+        sede: Optional[str] = None,
+        capacidad_min: Optional[int] = None
+    ) -> List[RoomResponse]:
+        masks = self.recursos_masks
+        candidates = self.rooms if sede is None else self.by_sede.get(sede, ())
+        return [
+            room for room in candidates
+            if (include_inactive or room.is_active)
+            and (capacidad_min is None or room.capacidad >= capacidad_min)
+            and masks[room.id] & recursos_mask == recursos_mask
+        ]
+
+
+class RoomCatalog:
+    """
+    Contador de versión del catálogo + snapshot en memoria.
+    Cualquier escritura sobre salas debe publicar en el canal CHANNEL_ROOMS,
+    que llama a `bump()` en todos los workers.
+
+    El snapshot se construye siempre con una sesión propia del primario,
+    nunca con la de quien lo pide: una réplica atrasada quedaría guardada
+    con la versión actual hasta la siguiente escritura.
+    """
+
+    def __init__(self, session_factory: sessionmaker):
+        self.session_factory = session_factory
+        self._version = 0
+        self._snapshot: Optional[RoomCatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def current(self) -> Optional[RoomCatalogSnapshot]:
+        """Snapshot vigente, o None si hay que reconstruirlo"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        return None
+
+    def get_snapshot(self) -> RoomCatalogSnapshot:
+        """
+        Snapshot vigente; lo reconstruye si hace falta. Consulta la base:
+        desde el event loop usar RoomService.get_catalog (threadpool).
+        """
+        # Camino rápido: snapshot vigente, sin consultar la base de datos
+        snapshot = self.current()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == self._version:
+                return snapshot
+
+            # Si hay una escritura mientras se reconstruye, la versión
+            # cambia y el siguiente lector vuelve a reconstruir
+            version = self._version
+            with self.session_factory() as db:
+                rooms = db.query(Room).order_by(Room.id).all()
+                snapshot = RoomCatalogSnapshot(
+                    version,
+                    tuple(RoomResponse.model_validate(room) for room in rooms)
+                )
+            self._snapshot = snapshot
+            return snapshot
+
+
+# Instancia global del catálogo (una por proceso)
+room_catalog = RoomCatalog(SessionLocal)
+invalidation_bus.subscribe(CHANNEL_ROOMS, lambda key: room_catalog.bump())
@@ -1,13 +1,198 @@
-# Controlador básico de Salas
+# Endpoints de Salas
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.utils.database import get_db
+from app.utils.dependencies import require_admin
+from app.utils.exceptions import RoomNotFoundException
+from app.utils.http_cache import is_not_modified, not_modified_response, set_cache_headers
+from app.rooms.service import RoomService
+from app.rooms.schemas import RoomCreate, RoomUpdate, RoomResponse, RoomList
+from app.config.settings import settings
+
+# Configuración del Router
 
 router = APIRouter()
 
-@router.get("/")
-async def get_rooms():
-    return {"message": "Endpoint de salas - Por implementar"}
+def _split_recursos(recursos: Optional[str]) -> Optional[List[str]]:
+    if not recursos:
+        return None
+    return [r.strip() for r in recursos.split(",") if r.strip()]
+
+
+# Endpoints de Consulta --> (con ETag y peticiones condicionales)
+
+@router.get(
+    "/",
+    response_model=List[RoomResponse],
+    summary="Listar salas",
+    description="Obtener el catálogo de salas. Soporta If-None-Match / If-Modified-Since"
+)
+async def get_rooms(
+    request: Request,
+    response: Response,
+    include_inactive: bool = False,
+    recursos: Optional[str] = Query(
+        None,
+        description="Recursos requeridos separados por coma (ej: proyector,video_conferencia)"
+    ),
+    sede: Optional[str] = Query(None, description="Filtrar por sede"),
+    capacidad_min: Optional[int] = Query(None, ge=1, description="Capacidad mínima")
+):
+    room_service = RoomService()
+    snapshot = await room_service.get_catalog()
+    max_age = settings.ROOMS_CACHE_MAX_AGE
+
+    if is_not_modified(request, snapshot.etag, snapshot.last_modified):
+        return not_modified_response(snapshot.etag, snapshot.last_modified, max_age)
+
+    set_cache_headers(response, snapshot.etag, snapshot.last_modified, max_age)
+    return await room_service.get_all_rooms(
+        include_inactive=include_inactive,
+        recursos=_split_recursos(recursos),
+        sede=sede,
+        capacidad_min=capacidad_min
+    )
+
+
+@router.get(
+    "/summary",
+    response_model=RoomList,
+    summary="Resumen de salas",
+    description="Listado paginado de salas con la cantidad de recursos de cada una"
+)
+async def get_room_summaries(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    include_inactive: bool = False,
+    recursos: Optional[str] = Query(None, description="Recursos requeridos separados por coma"),
+    sede: Optional[str] = Query(None, description="Filtrar por sede"),
+    capacidad_min: Optional[int] = Query(None, ge=1, description="Capacidad mínima")
+):
+    room_service = RoomService()
+    snapshot = await room_service.get_catalog()
+    max_age = settings.ROOMS_CACHE_MAX_AGE
+
+    if is_not_modified(request, snapshot.etag, snapshot.last_modified):
+        return not_modified_response(snapshot.etag, snapshot.last_modified, max_age)
+
+    set_cache_headers(response, snapshot.etag, snapshot.last_modified, max_age)
+    return await room_service.list_room_summaries(
+        skip=skip,
+        limit=limit,
+        include_inactive=include_inactive,
+        recursos=_split_recursos(recursos),
+        sede=sede,
+        capacidad_min=capacidad_min
+    )
+
+
+@router.get(
+    "/{room_id}",
+    response_model=RoomResponse,
+    summary="Obtener sala",
+    description="Obtener el detalle de una sala. Soporta If-None-Match / If-Modified-Since"
+)
+async def get_room(
+    room_id: int,
+    request: Request,
+    response: Response
+):
+    room_service = RoomService()
+    snapshot = await room_service.get_catalog()
+
+    room = snapshot.by_id.get(room_id)
+    if not room:
+        raise RoomNotFoundException(room_id)
+
+    etag = snapshot.room_etags[room_id]
+    last_modified = room.updated_at or room.created_at
+    max_age = settings.ROOMS_CACHE_MAX_AGE
+
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified, max_age)
+
+    set_cache_headers(response, etag, last_modified, max_age)
+    return room
+
+# Endpoints de Administración --> Solo Admin
+
+@router.post(
+    "/",
+    response_model=RoomResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear sala (Admin)",
+    description="Registrar una nueva sala en una sede",
+    dependencies=[Depends(require_admin)]
+)
+async def create_room(
+    room_data: RoomCreate,
+    db: Session = Depends(get_db)
+):
+    room_service = RoomService(db)
+    return await room_service.create_room(room_data)
+
+
+@router.put(
+    "/{room_id}",
+    response_model=RoomResponse,
+    summary="Actualizar sala (Admin)",
+    description="Modificar los datos de una sala",
+    dependencies=[Depends(require_admin)]
+)
+async def update_room(
+    room_id: int,
+    room_data: RoomUpdate,
+    db: Session = Depends(get_db)
+):
+    room_service = RoomService(db)
+    return await room_service.update_room(room_id, room_data)
+
+
+@router.patch(
+    "/{room_id}/deactivate",
+    response_model=RoomResponse,
+    summary="Desactivar sala (Admin)",
+    description="Retirar una sala del catálogo sin borrar sus reservas",
+    dependencies=[Depends(require_admin)]
+)
+async def deactivate_room(
+    room_id: int,
+    db: Session = Depends(get_db)
+):
+    room_service = RoomService(db)
+    return await room_service.deactivate_room(room_id)
+
+
+@router.patch(
+    "/{room_id}/activate",
+    response_model=RoomResponse,
+    summary="Activar sala (Admin)",
+    description="Volver a publicar una sala desactivada",
+    dependencies=[Depends(require_admin)]
+)
+async def activate_room(
+    room_id: int,
+    db: Session = Depends(get_db)
+):
+    room_service = RoomService(db)
+    return await room_service.activate_room(room_id)
+
 
-@router.post("/")
-async def create_room():
-    return {"message": "Crear sala - Por implementar"}
\ No newline at end of file
+@router.delete(
+    "/{room_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Eliminar sala (Admin)",
+    description="Eliminar permanentemente una sala y sus reservas",
+    dependencies=[Depends(require_admin)]
+)
+async def delete_room(
+    room_id: int,
+    db: Session = Depends(get_db)
+):
+    room_service = RoomService(db)
+    await room_service.delete_room(room_id)
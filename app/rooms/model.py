@@ -1,12 +1,13 @@
 # Representación Salas de Coworking 
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, UniqueConstraint, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from typing import List, Optional
 import json
 
 from app.utils.database import Base
+from app.rooms.resources import recursos_to_mask
 
 class Room(Base):
     """
@@ -14,6 +15,15 @@ class Room(Base):
     """
     __tablename__ = "rooms"
     
+    # Una sede no puede tener dos salas con el mismo nombre
+    __table_args__ = (
+        UniqueConstraint("nombre", "sede", name="uk_rooms_nombre_sede"),
+        # Filtro por recursos sin leer el JSON:
+        # WHERE is_active = 1 AND recursos_mask & :requeridos = :requeridos
+        # (se recorre solo el índice, que es mucho más pequeño que la tabla)
+        Index("idx_rooms_active_recursos", "is_active", "recursos_mask"),
+    )
+    
     # Clave primaria
     id = Column(Integer, primary_key=True, index=True)
     
@@ -25,6 +35,9 @@ class Room(Base):
     # Recursos disponibles (como JSON)
     recursos = Column(JSON, nullable=True)
     
+    # Derivado de `recursos`: un bit por recurso disponible (ver app/rooms/resources.py)
+    recursos_mask = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Estado
     is_active = Column(Boolean, default=True, nullable=False)
     
@@ -36,9 +49,22 @@ class Room(Base):
     reservas = relationship(
         "Reservation",
         back_populates="sala",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        # La base de datos borra las reservas (ON DELETE CASCADE) sin cargarlas
+        passive_deletes=True
     )
     
+    @validates("recursos")
+    def _sync_recursos_mask(self, key, recursos):
+        # Cualquier asignación de recursos mantiene la máscara sincronizada
+        self.recursos_mask = recursos_to_mask(recursos)
+        return recursos
+    
+    @classmethod
+    def has_recursos(cls, mask: int):
+        """Condición SQL: la sala tiene todos los recursos de `mask`"""
+        return cls.recursos_mask.op("&")(mask) == mask
+    
     def __repr__(self):
         return f"<Room(id={self.id}, nombre='{self.nombre}', sede='{self.sede}')>"
     
@@ -0,0 +1,42 @@
+# Recursos de las Salas como Máscara de Bits
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# El orden define el bit de cada recurso y se guarda en rooms.recursos_mask:
+# solo se pueden agregar recursos al final, nunca reordenar ni quitar
+RECURSOS = (
+    'proyector',            # 1
+    'wifi',                 # 2
+    'pizarra',              # 4
+    'aire_acondicionado',   # 8
+    'video_conferencia',    # 16
+    'sonido',               # 32
+    'computador',           # 64
+    'tv',                   # 128
+)
+
+RECURSO_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(RECURSOS)}
+
+
+def recursos_to_mask(recursos: Optional[Dict[str, Any]]) -> int:
+    """Bits de los recursos disponibles (valor verdadero en el JSON)"""
+    mask = 0
+    for name, available in (recursos or {}).items():
+        if available:
+            mask |= RECURSO_BITS.get(name, 0)
+    return mask
+
+
+def names_to_mask(names: Iterable[str]) -> int:
+    """Máscara de una lista de nombres; lanza ValueError con el primero desconocido"""
+    mask = 0
+    for name in names:
+        bit = RECURSO_BITS.get(name)
+        if bit is None:
+            raise ValueError(name)
+        mask |= bit
+    return mask
+
+
+def mask_to_names(mask: int) -> List[str]:
+    return [name for name, bit in RECURSO_BITS.items() if mask & bit]
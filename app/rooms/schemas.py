@@ -1,61 +1,71 @@
 # Esquemas para el módulo de Salas
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
+from app.rooms.resources import RECURSOS
+
+# Recursos permitidos
+ALLOWED_RECURSOS = frozenset(RECURSOS)
+_ALLOWED_RECURSOS_TEXT = ", ".join(sorted(ALLOWED_RECURSOS))
+
+def _check_recursos(v: Dict[str, Any]) -> Dict[str, Any]:
+    # recursos_to_mask ignora las claves desconocidas: se rechazan aquí
+    invalid = v.keys() - ALLOWED_RECURSOS
+    if invalid:
+        raise ValueError(
+            f'Recurso {sorted(invalid)[0]} no es válido. Recursos permitidos: {_ALLOWED_RECURSOS_TEXT}'
+        )
+    return v
+
+# Tipos reutilizables (las restricciones se validan en el núcleo compilado)
+NombreStr = Annotated[str, Field(min_length=2, max_length=100)]
+Capacidad = Annotated[int, Field(ge=1, le=50)]
 
 class RoomBase(BaseModel):
     """Schema base para salas"""
-    nombre: str = Field(..., min_length=2, max_length=100, description="Nombre de la sala")
-    sede: str = Field(..., min_length=2, max_length=100, description="Sede donde se encuentra la sala")
-    capacidad: int = Field(..., ge=1, le=50, description="Capacidad máxima de personas")
+    nombre: NombreStr = Field(..., description="Nombre de la sala")
+    sede: NombreStr = Field(..., description="Sede donde se encuentra la sala")
+    capacidad: Capacidad = Field(..., description="Capacidad máxima de personas")
     recursos: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Recursos disponibles")
 
 class RoomCreate(RoomBase):
     """Schema para crear una sala"""
     
-    @validator('nombre')
-    def validate_nombre(cls, v):
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre(cls, v: str) -> str:
         v = v.strip()
         if not v:
             raise ValueError('El nombre no puede estar vacío')
         return v.title()
     
-    @validator('sede')
-    def validate_sede(cls, v):
+    @field_validator('sede')
+    @classmethod
+    def validate_sede(cls, v: str) -> str:
         v = v.strip()
         if not v:
             raise ValueError('La sede no puede estar vacía')
         return v.title()
     
-    @validator('recursos')
-    def validate_recursos(cls, v):
+    @field_validator('recursos')
+    @classmethod
+    def validate_recursos(cls, v: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         if v is None:
             return {}
-        
-        # Recursos permitidos
-        allowed_recursos = {
-            'proyector', 'wifi', 'pizarra', 'aire_acondicionado', 
-            'video_conferencia', 'sonido', 'computador', 'tv'
-        }
-        
-        if isinstance(v, dict):
-            for key in v.keys():
-                if key not in allowed_recursos:
-                    raise ValueError(f'Recurso {key} no es válido. Recursos permitidos: {allowed_recursos}')
-        
-        return v
+        return _check_recursos(v)
 
 class RoomUpdate(BaseModel):
     """Schema para actualizar una sala"""
-    nombre: Optional[str] = Field(None, min_length=2, max_length=100)
-    sede: Optional[str] = Field(None, min_length=2, max_length=100)
-    capacidad: Optional[int] = Field(None, ge=1, le=50)
+    nombre: Optional[NombreStr] = None
+    sede: Optional[NombreStr] = None
+    capacidad: Optional[Capacidad] = None
     recursos: Optional[Dict[str, Any]] = None
     is_active: Optional[bool] = None
     
-    @validator('nombre')
-    def validate_nombre(cls, v):
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre(cls, v: Optional[str]) -> Optional[str]:
         if v is not None:
             v = v.strip()
             if not v:
@@ -63,14 +73,20 @@ class RoomUpdate(BaseModel):
             return v.title()
         return v
     
-    @validator('sede')
-    def validate_sede(cls, v):
+    @field_validator('sede')
+    @classmethod
+    def validate_sede(cls, v: Optional[str]) -> Optional[str]:
         if v is not None:
             v = v.strip()
             if not v:
                 raise ValueError('La sede no puede estar vacía')
             return v.title()
         return v
+    
+    @field_validator('recursos')
+    @classmethod
+    def validate_recursos(cls, v: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return _check_recursos(v) if v is not None else v
 
 class RoomResponse(BaseModel):
     """Schema para respuestas de salas"""
@@ -83,9 +99,9 @@ class RoomResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
-        schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "nombre": "Sala Reuniones A",
@@ -102,6 +118,7 @@ class RoomResponse(BaseModel):
                 "updated_at": "2024-01-15T10:30:00"
             }
         }
+    )
 
 class RoomSummary(BaseModel):
     """Schema resumido para listados"""
@@ -112,8 +129,7 @@ class RoomSummary(BaseModel):
     is_active: bool
     recursos_count: int = 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RoomList(BaseModel):
     """Schema para listas paginadas de salas"""
@@ -123,8 +139,8 @@ class RoomList(BaseModel):
     per_page: int
     pages: int
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "rooms": [
                     {
@@ -142,6 +158,7 @@ class RoomList(BaseModel):
                 "pages": 3
             }
         }
+    )
 
 class RoomAvailability(BaseModel):
     """Schema para consultar disponibilidad"""
@@ -150,12 +167,13 @@ class RoomAvailability(BaseModel):
     available_slots: List[str]
     occupied_slots: List[str]
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "room_id": 1,
                 "date": "2024-02-15",
                 "available_slots": ["09:00-10:00", "10:00-11:00", "14:00-15:00"],
                 "occupied_slots": ["11:00-12:00", "13:00-14:00"]
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
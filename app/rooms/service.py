@@ -0,0 +1,162 @@
+# Lógica de Negocio de Salas
+
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List
+
+from app.rooms.model import Room
+from app.rooms.schemas import RoomCreate, RoomUpdate, RoomResponse, RoomList
+from app.rooms.catalog import room_catalog, RoomCatalogSnapshot
+from app.rooms.resources import names_to_mask
+from app.utils.invalidation import invalidation_bus, CHANNEL_ROOMS, CHANNEL_USER_HOURS
+from app.utils.exceptions import RoomNotFoundException, RoomAlreadyExistsException, ValidationException
+from app.utils.singleflight import single_flight
+
+
+class RoomService:
+    def __init__(self, db: Optional[Session] = None):
+        # Las consultas del catálogo no usan la sesión (ver RoomCatalog)
+        self.db = db
+
+    # Métodos de Consulta --> (servidos desde el catálogo en memoria)
+
+    async def get_catalog(self) -> RoomCatalogSnapshot:
+        # Camino rápido sin salir del event loop
+        snapshot = room_catalog.current()
+        if snapshot is not None:
+            return snapshot
+        return await self._rebuild_catalog()
+
+    @single_flight("rooms.catalog", key=lambda: "catalog")
+    def _rebuild_catalog(self) -> RoomCatalogSnapshot:
+        # En el threadpool: las peticiones que llegan durante la
+        # reconstrucción esperan el mismo resultado
+        return room_catalog.get_snapshot()
+
+    async def get_all_rooms(
+        self,
+        include_inactive: bool = False,
+        recursos: Optional[List[str]] = None,
+        sede: Optional[str] = None,
+        capacidad_min: Optional[int] = None
+    ) -> List[RoomResponse]:
+        snapshot = await self.get_catalog()
+        return snapshot.filter(
+            include_inactive=include_inactive,
+            recursos_mask=self._recursos_mask(recursos),
+            sede=sede.strip().title() if sede else None,
+            capacidad_min=capacidad_min
+        )
+
+    async def list_room_summaries(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        include_inactive: bool = False,
+        recursos: Optional[List[str]] = None,
+        sede: Optional[str] = None,
+        capacidad_min: Optional[int] = None
+    ) -> RoomList:
+        rooms = await self.get_all_rooms(include_inactive, recursos, sede, capacidad_min)
+        snapshot = await self.get_catalog()
+
+        total = len(rooms)
+        return RoomList(
+            rooms=[snapshot.summaries[room.id] for room in rooms[skip:skip + limit]],
+            total=total,
+            page=(skip // limit) + 1,
+            per_page=limit,
+            pages=(total + limit - 1) // limit
+        )
+
+    async def get_room_by_id(self, room_id: int) -> Optional[RoomResponse]:
+        snapshot = await self.get_catalog()
+        return snapshot.by_id.get(room_id)
+
+    def _recursos_mask(self, recursos: Optional[List[str]]) -> int:
+        # Filtrar por recursos es una operación de bits, sin leer el JSON
+        try:
+            return names_to_mask(recursos or ())
+        except ValueError as e:
+            raise ValidationException(f"Recurso {e} no es válido")
+
+    # Métodos de Creación -->
+
+    async def create_room(self, room_data: RoomCreate) -> Room:
+
+        # 1. Verificar que no exista otra sala con el mismo nombre en la sede
+        existing = (
+            self.db.query(Room.id)
+            .filter(Room.nombre == room_data.nombre, Room.sede == room_data.sede)
+            .first()
+        )
+        if existing:
+            raise RoomAlreadyExistsException(room_data.nombre, room_data.sede)
+
+        # 2. Guardar en base de datos
+        db_room = Room(
+            nombre=room_data.nombre,
+            sede=room_data.sede,
+            capacidad=room_data.capacidad,
+            recursos=room_data.recursos,
+            is_active=True
+        )
+
+        try:
+            self.db.add(db_room)
+            self.db.commit()
+            self.db.refresh(db_room)
+        except IntegrityError:
+            self.db.rollback()
+            raise RoomAlreadyExistsException(room_data.nombre, room_data.sede)
+
+        # 3. Invalidar el catálogo en todos los workers
+        invalidation_bus.publish(CHANNEL_ROOMS)
+        return db_room
+
+    # Métodos de Actualización -->
+
+    async def update_room(self, room_id: int, room_data: RoomUpdate) -> Room:
+        room = self.db.get(Room, room_id)
+        if not room:
+            raise RoomNotFoundException(room_id)
+
+        update_data = room_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(room, field):
+                setattr(room, field, value)
+
+        try:
+            self.db.commit()
+            self.db.refresh(room)
+        except IntegrityError:
+            self.db.rollback()
+            raise RoomAlreadyExistsException(
+                update_data.get("nombre", room.nombre),
+                update_data.get("sede", room.sede)
+            )
+
+        invalidation_bus.publish(CHANNEL_ROOMS)
+        return room
+
+    async def deactivate_room(self, room_id: int) -> Room:
+        return await self.update_room(room_id, RoomUpdate(is_active=False))
+
+    async def activate_room(self, room_id: int) -> Room:
+        return await self.update_room(room_id, RoomUpdate(is_active=True))
+
+    # Métodos de Eliminación -->
+
+    async def delete_room(self, room_id: int) -> bool:
+        room = self.db.get(Room, room_id)
+        if not room:
+            raise RoomNotFoundException(room_id)
+
+        # Las reservas de la sala se borran con ON DELETE CASCADE
+        self.db.delete(room)
+        self.db.commit()
+
+        invalidation_bus.publish(CHANNEL_ROOMS)
+        # Las horas de muchos usuarios pueden cambiar: se recalculan
+        invalidation_bus.publish(CHANNEL_USER_HOURS, "*")
+        return True
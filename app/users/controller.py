@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.utils.database import get_db
+from app.utils.database import get_db, get_read_db
 from app.utils.dependencies import get_current_user, require_admin, validate_pagination
 from app.auth.service import UserService
 from app.auth.model import UserRole
@@ -23,9 +23,11 @@ router = APIRouter()
     description="Obtener información del usuario autenticado"
 )
 async def get_my_profile(
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    return current_user
+    user_service = UserService(db)
+    return await user_service.get_user_by_id(current_user.id)
 
 # Endpoints de Administración
 
@@ -42,7 +44,7 @@ async def list_users(
     search: Optional[str] = Query(None, description="Buscar por nombre o email"),
     role: Optional[UserRole] = Query(None, description="Filtrar por rol"),
     active: Optional[bool] = Query(None, description="Filtrar por estado activo"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user_service = UserService(db)
     
@@ -74,11 +76,11 @@ async def list_users(
 async def get_user(
     user_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     
     # Si no es admin y no es su propio perfil, denegar acceso
-    if current_user.rol != UserRole.ADMIN and current_user.id != user_id:
+    if not current_user.is_admin() and current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No puedes ver información de otros usuarios"
@@ -0,0 +1,102 @@
+# Reloj de la Aplicación (fechas con zona horaria)
+
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone, tzinfo
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config.settings import settings
+
+UTC = timezone.utc
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """MySQL devuelve DATETIME sin zona: se guardan en UTC, así que se interpretan así"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=UTC)
+
+
+class Clock:
+    """
+    Única fuente de "ahora" y "hoy" de la aplicación.
+
+    - `now()` siempre es UTC con zona horaria y se reutiliza dentro del
+      mismo segundo (la precisión de los tokens y timestamps es de segundos).
+    - `today(sede)` es la fecha local de la sede (o la zona por defecto) y
+      se reutiliza hasta la medianoche de esa zona.
+
+    Para pruebas se puede reemplazar con `set_clock(FixedClock(...))`.
+    """
+
+    def __init__(self, default_timezone: str = "UTC", sede_timezones: Optional[Dict[str, str]] = None):
+        self.default_timezone = ZoneInfo(default_timezone)
+        self.sede_timezones: Dict[str, tzinfo] = {
+            sede: ZoneInfo(name) for sede, name in (sede_timezones or {}).items()
+        }
+        # Tuplas inmutables: se reemplazan completas, sin locks
+        self._now_cache: Optional[Tuple[int, datetime]] = None
+        self._today_cache: Dict[tzinfo, Tuple[float, float, date]] = {}
+
+    def time(self) -> float:
+        return time.time()
+
+    def timezone_for(self, sede: Optional[str] = None) -> tzinfo:
+        if sede is None:
+            return self.default_timezone
+        return self.sede_timezones.get(sede, self.default_timezone)
+
+    def now(self) -> datetime:
+        second = int(self.time())
+        cached = self._now_cache
+        if cached is not None and cached[0] == second:
+            return cached[1]
+        value = datetime.fromtimestamp(second, UTC)
+        self._now_cache = (second, value)
+        return value
+
+    def local_now(self, sede: Optional[str] = None) -> datetime:
+        return self.now().astimezone(self.timezone_for(sede))
+
+    def today(self, sede: Optional[str] = None) -> date:
+        tz = self.timezone_for(sede)
+        current = self.time()
+        cached = self._today_cache.get(tz)
+        if cached is not None and cached[0] <= current < cached[1]:
+            return cached[2]
+
+        day = datetime.fromtimestamp(current, tz).date()
+        start = datetime.combine(day, dtime.min, tz).timestamp()
+        end = datetime.combine(day + timedelta(days=1), dtime.min, tz).timestamp()
+        self._today_cache[tz] = (start, end, day)
+        return day
+
+
+class FixedClock(Clock):
+    """Reloj detenido en un instante; avanza solo con `advance()` o `set()`"""
+
+    def __init__(self, instant: datetime, **kwargs):
+        super().__init__(**kwargs)
+        self.set(instant)
+
+    def set(self, instant: datetime) -> None:
+        self._time = as_utc(instant).timestamp()
+
+    def advance(self, **delta) -> None:
+        self._time += timedelta(**delta).total_seconds()
+
+    def time(self) -> float:
+        return self._time
+
+
+_clock = Clock(settings.TIMEZONE, settings.SEDE_TIMEZONES)
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """Reemplaza el reloj global (ej: un FixedClock en pruebas)"""
+    global _clock
+    _clock = clock
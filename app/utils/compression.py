@@ -0,0 +1,194 @@
+# Middleware de Compresión de Respuestas (gzip / brotli)
+
+import gzip
+import hashlib
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # brotli es opcional: si no está instalado solo se usa gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+class CompressionBudget:
+    """
+    Presupuesto de CPU para comprimir, como fracción de un núcleo por segundo.
+    Si se agota, las respuestas se envían sin comprimir hasta la siguiente ventana.
+    """
+
+    def __init__(self, max_fraction: float, window_seconds: float = 1.0):
+        self.max_seconds = max_fraction * window_seconds
+        self.window_seconds = window_seconds
+        self._window_start = time.monotonic()
+        self._spent = 0.0
+        self._lock = threading.Lock()
+
+    def _roll(self, now: float) -> None:
+        if now - self._window_start >= self.window_seconds:
+            self._window_start = now
+            self._spent = 0.0
+
+    def available(self) -> bool:
+        with self._lock:
+            self._roll(time.monotonic())
+            return self._spent < self.max_seconds
+
+    def charge(self, seconds: float) -> None:
+        with self._lock:
+            self._roll(time.monotonic())
+            self._spent += seconds
+
+
+class CompressionMiddleware:
+    """
+    Comprime respuestas completas (no streaming) cuando:
+    - El cliente acepta br o gzip
+    - El cuerpo supera `minimum_size` y su tipo es comprimible
+    - Queda presupuesto de CPU
+
+    Los cuerpos grandes se comprimen en un hilo para no bloquear el event loop.
+    Las rutas inmutables (ej: /openapi.json) se guardan ya comprimidas.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        thread_threshold: int = 64 * 1024,
+        cpu_budget: float = 0.5,
+        precompressed_paths: Iterable[str] = ("/openapi.json",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.thread_threshold = thread_threshold
+        self.budget = CompressionBudget(cpu_budget)
+        self.precompressed_paths = frozenset(precompressed_paths)
+        # (ruta, encoding) -> (hash del cuerpo, cuerpo comprimido)
+        self._precompressed: Dict[Tuple[str, str], Tuple[bytes, bytes]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope["path"], encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def _choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.partition(";")
+            # q=0 significa que el cliente rechaza ese encoding
+            if params.replace(" ", "").rstrip("0.") == "q=":
+                continue
+            accepted.add(name.strip().lower())
+
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        start = time.perf_counter()
+        if encoding == "br":
+            result = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            result = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self.budget.charge(time.perf_counter() - start)
+        return result
+
+    async def compress(self, path: str, body: bytes, encoding: str) -> Optional[bytes]:
+        # 1. Cuerpos precomprimidos (rutas inmutables)
+        if path in self.precompressed_paths:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            cached = self._precompressed.get((path, encoding))
+            if cached is not None and cached[0] == digest:
+                return cached[1]
+            compressed = await anyio.to_thread.run_sync(self._compress, body, encoding)
+            self._precompressed[(path, encoding)] = (digest, compressed)
+            return compressed
+
+        # 2. Sin presupuesto de CPU: enviar sin comprimir
+        if not self.budget.available():
+            return None
+
+        # 3. Cuerpos grandes en un hilo, pequeños en línea
+        if len(body) >= self.thread_threshold:
+            return await anyio.to_thread.run_sync(self._compress, body, encoding)
+        return self._compress(body, encoding)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, path: str, encoding: str, send: Send):
+        self.middleware = middleware
+        self.path = path
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._should_compress(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.downstream(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        # Respuestas en streaming o pequeñas: se envían tal cual
+        if more_body or len(body) < self.middleware.minimum_size:
+            self.passthrough = True
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        compressed = await self.middleware.compress(self.path, body, self.encoding)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+
+        if compressed is not None and len(compressed) < len(body):
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(compressed))
+            body = compressed
+
+        await self.downstream(self.start_message)
+        await self.downstream({"type": "http.response.body", "body": body})
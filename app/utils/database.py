@@ -1,49 +1,192 @@
 # Configuración Base de Datos
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from fastapi import Request
+from typing import Dict, List
+import itertools
 import logging
+import threading
+import time
 
 from app.config.settings import settings
+from app.utils.security import request_token_subject
+from app.utils.invalidation import invalidation_bus, CHANNEL_PRIMARY_PIN
+from app.utils.pool import InstrumentedQueuePool, PoolAutotuner, install_pool_instrumentation
+from app.utils.logger import install_query_counter
+from app.utils.tracing import install_sql_tracing
 
-# Configuración del logging
-logging.basicConfig(level=logging.INFO)
+# El logging se configura en app.utils.logger (SQL_ECHO controla las sentencias)
 logger = logging.getLogger(__name__)
 
-# Creación engine de SQLAlchemy
-try:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        echo=settings.DEBUG,  
-        pool_pre_ping=True,   
-        pool_recycle=300,     
-        pool_size=10,         
-        max_overflow=20       
+def _create_engine(url: str) -> Engine:
+    new_engine = create_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    
+    # Métricas del pool, pre-ping por inactividad y modo adaptativo
+    install_pool_instrumentation(
+        new_engine,
+        idle_ping_seconds=(
+            settings.DB_POOL_PRE_PING_IDLE_SECONDS
+            if settings.DB_POOL_PRE_PING == "idle" else None
+        ),
+        autotuner=PoolAutotuner(
+            settings.DB_POOL_MIN_SIZE,
+            settings.DB_POOL_MAX_SIZE,
+            settings.DB_POOL_ADAPT_INTERVAL_SECONDS
+        ) if settings.DB_POOL_ADAPTIVE else None
     )
-    logger.info("✅ Engine de base de datos creado exitosamente")
+    install_query_counter(new_engine)
+    install_sql_tracing(new_engine)
+    return new_engine
+
+
+# Creación engine de SQLAlchemy (primario + réplicas de lectura)
+try:
+    engine = _create_engine(settings.DATABASE_URL)
+    replica_engines: List[Engine] = [
+        _create_engine(url) for url in settings.REPLICA_DATABASE_URLS
+    ]
+    logger.info("Engine de base de datos creado (%s réplicas)", len(replica_engines))
 except SQLAlchemyError as e:
-    logger.error(f"❌ Error creando engine de base de datos: {e}")
+    logger.error("Error creando engine de base de datos: %s", e)
     raise
 
 # Crear sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_session_writes(session):
+    # Permite saber en get_db si la petición escribió en el primario
+    session.info["has_writes"] = True
+
+# Enrutamiento de lecturas a réplicas -->
+
+class ReplicaRouter:
+    """
+    Reparte las lecturas entre réplicas (round-robin).
+    Una réplica que falla queda fuera de servicio `retry_seconds`;
+    sin réplicas disponibles las lecturas van al primario.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], retry_seconds: int):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._down_until: Dict[int, float] = {}
+        self._cycle = itertools.cycle(range(len(replicas))) if replicas else None
+        self._lock = threading.Lock()
+
+        for replica in replicas:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # Fallo de conexión o desconexión: sacar la réplica de rotación
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[id(replica)] = time.monotonic() + self.retry_seconds
+        logger.warning("Réplica %s fuera de servicio por %ss", replica.url.host, self.retry_seconds)
+
+    def choose(self) -> Engine:
+        if not self.replicas:
+            return self.primary
+
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if self._down_until.get(id(replica), 0) <= now:
+                    return replica
+        return self.primary
+
+
+class PrimaryPins:
+    """
+    Read-your-writes: tras escribir, un usuario lee del primario durante
+    `window_seconds` para ver lo que acaba de guardar aunque la réplica
+    vaya atrasada. Los pines se comparten entre workers por el bus.
+    """
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._pins: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._pins[user_id] = now + self.window_seconds
+            # Limpieza ocasional de pines vencidos
+            if len(self._pins) > 10000:
+                self._pins = {k: v for k, v in self._pins.items() if v > now}
+
+    def pin(self, user_id: str) -> None:
+        invalidation_bus.publish(CHANNEL_PRIMARY_PIN, user_id)
+
+    def is_pinned(self, user_id: str) -> bool:
+        return self._pins.get(user_id, 0) > time.monotonic()
+
+
+replica_router = ReplicaRouter(engine, replica_engines, settings.DB_REPLICA_RETRY_SECONDS)
+primary_pins = PrimaryPins(settings.READ_YOUR_WRITES_SECONDS)
+invalidation_bus.subscribe(CHANNEL_PRIMARY_PIN, primary_pins._record)
+
 # Base para los modelos
 Base = declarative_base()
 metadata = MetaData()
 
 
-async def get_db():
+async def get_db(request: Request):
     
-    # Dependencia para obtener sesión de base de datos
+    # Dependencia para obtener sesión de base de datos (primario)
 
     db = SessionLocal()
     try:
         yield db
     except SQLAlchemyError as e:
-        logger.error(f"❌ Error en sesión de base de datos: {e}")
+        logger.error("Error en sesión de base de datos: %s", e)
+        db.rollback()
+        raise
+    finally:
+        # Si la petición escribió, fijar al usuario al primario por un tiempo
+        if db.info.get("has_writes") and replica_engines:
+            user_id = request_token_subject(request.scope)
+            if user_id is not None:
+                primary_pins.pin(user_id)
+        db.close()
+
+
+async def get_read_db(request: Request):
+    
+    # Dependencia para rutas de solo lectura (listados, disponibilidad, reportes)
+    # Usa una réplica salvo que el usuario haya escrito hace poco
+
+    bind = engine
+    if replica_engines:
+        user_id = request_token_subject(request.scope)
+        if user_id is None or not primary_pins.is_pinned(user_id):
+            bind = replica_router.choose()
+
+    db = SessionLocal(bind=bind)
+    try:
+        yield db
+    except SQLAlchemyError as e:
+        logger.error("Error en sesión de base de datos (lectura): %s", e)
         db.rollback()
         raise
     finally:
@@ -56,16 +199,17 @@ async def create_tables():
         from app.auth.model import User
         from app.rooms.model import Room
         from app.reservations.model import Reservation
+        from app.events.model import OutboxEvent
         
-        logger.info("📊 Creando tablas de base de datos...")
+        logger.info("Creando tablas de base de datos")
         Base.metadata.create_all(bind=engine)
-        logger.info("✅ Tablas creadas exitosamente")
+        logger.info("Tablas creadas")
         
     except SQLAlchemyError as e:
-        logger.error(f"❌ Error creando tablas: {e}")
+        logger.error("Error creando tablas: %s", e)
         raise
     except ImportError as e:
-        logger.error(f"❌ Error importando modelos: {e}")
+        logger.error("Error importando modelos: %s", e)
         raise
 
 
@@ -73,15 +217,15 @@ async def drop_tables():
     
     # Eliminar todas las tablas ⚠️
     
-    if not settings.DEBUG:
-        raise Exception("❌ No se puede eliminar tablas en producción")
+    if not settings.DEBUG or settings.is_production:
+        raise Exception("No se pueden eliminar tablas en producción")
     
     try:
-        logger.warning("⚠️ Eliminando todas las tablas...")
+        logger.warning("Eliminando todas las tablas")
         Base.metadata.drop_all(bind=engine)
-        logger.warning("✅ Tablas eliminadas exitosamente")
+        logger.warning("Tablas eliminadas")
     except SQLAlchemyError as e:
-        logger.error(f"❌ Error eliminando tablas: {e}")
+        logger.error("Error eliminando tablas: %s", e)
         raise
 
 
@@ -93,10 +237,10 @@ def test_connection():
     try:
         connection = engine.connect()
         connection.close()
-        logger.info("✅ Conexión a base de datos exitosa")
+        logger.info("Conexión a base de datos exitosa")
         return True
     except SQLAlchemyError as e:
-        logger.error(f"❌ Error conectando a base de datos: {e}")
+        logger.error("Error conectando a base de datos: %s", e)
         return False
 
 
@@ -1,13 +1,13 @@
 # Dependencias para FastAPI
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.utils.database import get_db
-from app.utils.security import verify_token
-from app.auth.model import User
+from app.utils.security import request_token_claims, verify_token
+from app.auth.principal import Principal
 from app.auth.service import UserService
 
 # Configurar esquema de autenticación Bearer
@@ -15,12 +15,13 @@ security = HTTPBearer()
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
 
-    # Verificar token
-    payload = verify_token(credentials.credentials)
+    # Verificar token (una sola vez por petición; si es inválido, verify_token lanza el 401)
+    payload = request_token_claims(request.scope) or verify_token(credentials.credentials)
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -29,9 +30,9 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Buscar usuario en la base de datos
+    # Identidad del usuario (caché por proceso; sin la entidad del ORM)
     user_service = UserService(db)
-    user = await user_service.get_user_by_id(int(user_id))
+    user = await user_service.get_principal(int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,8 +49,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -59,9 +60,9 @@ async def get_current_active_user(
 
 
 async def require_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
-    if current_user.rol != "admin":
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
+    if not current_user.is_admin():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos de administrador para realizar esta acción"
@@ -72,7 +73,7 @@ async def require_admin(
 async def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     if not credentials:
         return None
     
@@ -101,14 +102,14 @@ def validate_pagination(
     return skip, limit
 
 
-def validate_room_exists(
+async def validate_room_exists(
     room_id: int,
     db: Session = Depends(get_db)
 ) -> int:
     from app.rooms.service import RoomService
     
     room_service = RoomService(db)
-    room = room_service.get_room_by_id(room_id)
+    room = await room_service.get_room_by_id(room_id)
     
     if not room:
         raise HTTPException(
@@ -125,15 +126,15 @@ def validate_room_exists(
     return room_id
 
 
-def validate_user_can_modify_reservation(
+async def validate_user_can_modify_reservation(
     reservation_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> int:
     from app.reservations.service import ReservationService
     
     reservation_service = ReservationService(db)
-    reservation = reservation_service.get_reservation_by_id(reservation_id)
+    reservation = await reservation_service.get_reservation_by_id(reservation_id)
     
     if not reservation:
         raise HTTPException(
@@ -142,7 +143,7 @@ def validate_user_can_modify_reservation(
         )
     
     # Solo el propietario o un admin pueden modificar
-    if reservation.usuario_id != current_user.id and current_user.rol != "admin":
+    if reservation.usuario_id != current_user.id and not current_user.is_admin():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para modificar esta reserva"
@@ -99,6 +99,13 @@ class PastDateReservationException(HTTPException):
             detail="No se pueden hacer reservas en fechas pasadas"
         )
 
+class ReservationTooFarInAdvanceException(HTTPException):
+    def __init__(self, max_days: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No se pueden hacer reservas con más de {max_days} días de anticipación"
+        )
+
 class ReservationLimitExceededException(HTTPException):
     def __init__(self, limit: int):
         super().__init__(
@@ -113,6 +120,20 @@ class CannotCancelReservationException(HTTPException):
             detail=reason
         )
 
+class CannotRescheduleReservationException(HTTPException):
+    def __init__(self, reason: str = "No se puede reprogramar esta reserva"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=reason
+        )
+
+class CannotConfirmReservationException(HTTPException):
+    def __init__(self, reason: str = "No se puede confirmar esta reserva"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=reason
+        )
+
 class UserPenalizedException(HTTPException):
     def __init__(self, until_date: str):
         super().__init__(
@@ -137,6 +158,51 @@ class InsufficientPermissionsException(HTTPException):
             detail=f"No tienes permisos para {action}"
         )
 
+class RateLimitExceededException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Demasiadas solicitudes. Intenta de nuevo en {retry_after} segundos",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class IdempotencyKeyReusedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La Idempotency-Key ya se usó con una petición diferente"
+        )
+
+class IdempotencyRequestInProgressException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Una petición con la misma Idempotency-Key se está procesando",
+            headers={"Retry-After": "1"}
+        )
+
+class BulkLimitExceededException(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La operación alcanza a más de {limit} usuarios; divídala en partes"
+        )
+
+class ProfileNotFoundException(HTTPException):
+    def __init__(self, profile_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Perfil {profile_id} no encontrado en este worker"
+        )
+
+class ProfilerBusyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay un perfil en curso en este worker",
+            headers={"Retry-After": "5"}
+        )
+
 class DatabaseException(HTTPException):
     def __init__(self, detail: str = "Error interno del servidor"):
         super().__init__(
@@ -0,0 +1,65 @@
+# Árboles de Fenwick (sumas de prefijos con actualización en O(log n))
+
+from typing import Dict, List
+
+
+class FenwickTree:
+    """Árbol de Fenwick denso sobre las posiciones 1..size"""
+
+    __slots__ = ("size", "_tree")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree: List[int] = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        tree, size = self._tree, self.size
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Suma de las posiciones 1..index"""
+        tree, total = self._tree, 0
+        index = min(index, self.size)
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def range_sum(self, start: int, end: int) -> int:
+        """Suma de las posiciones start..end (inclusive)"""
+        if end < start:
+            return 0
+        return self.prefix(end) - self.prefix(start - 1)
+
+
+class SparseFenwickTree(FenwickTree):
+    """
+    Mismo árbol guardado en un diccionario: la memoria crece con las
+    posiciones usadas y no con `size`, útil para rangos grandes y dispersos.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree: Dict[int, int] = {}
+
+    def add(self, index: int, delta: int) -> None:
+        tree, size = self._tree, self.size
+        while index <= size:
+            value = tree.get(index, 0) + delta
+            if value:
+                tree[index] = value
+            else:
+                tree.pop(index, None)
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        tree, total = self._tree, 0
+        index = min(index, self.size)
+        while index > 0:
+            total += tree.get(index, 0)
+            index -= index & -index
+        return total
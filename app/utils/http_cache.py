@@ -0,0 +1,69 @@
+# Utilidades de Caché HTTP (ETag / Last-Modified)
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def _to_utc(value: datetime) -> datetime:
+    # MySQL devuelve fechas sin zona horaria: se asumen en UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_to_utc(value), usegmt=True)
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evalúa los encabezados condicionales de la petición.
+    If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Comparación débil: se ignora el prefijo W/
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified tiene resolución de segundos
+        return _to_utc(last_modified).replace(microsecond=0) <= _to_utc(since)
+
+    return False
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: int = 0
+) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: int = 0
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, last_modified, max_age)
+    return response
@@ -0,0 +1,263 @@
+# Peticiones Idempotentes (encabezado Idempotency-Key)
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Coroutine, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.config.settings import settings
+from app.utils.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotencyRequestInProgressException,
+    ValidationException
+)
+from app.utils.rate_limit import client_ip
+from app.utils.security import request_token_subject
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+
+class StoredResponse:
+    """Respuesta guardada para una clave, junto con la huella de la petición"""
+
+    __slots__ = ("fingerprint", "status_code", "body", "headers")
+
+    def __init__(self, fingerprint: str, status_code: int, body: bytes, headers: List[Tuple[bytes, bytes]]):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = [
+            (name, value) for name, value in self.headers if name != b"content-length"
+        ] + [(b"content-length", str(len(self.body)).encode())]
+        response.headers[REPLAYED_HEADER] = "true"
+        return response
+
+# Backends de almacenamiento -->
+
+class IdempotencyBackend:
+    """
+    Interfaz para guardar las respuestas.
+    Un backend compartido (ej: Redis con SET NX) permite que un reintento que
+    llega a otro worker o nodo también se responda sin ejecutar el servicio.
+    """
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, response: StoredResponse, ttl: float) -> None:
+        raise NotImplementedError
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        """Marca la clave como en curso; False si otro proceso ya la tiene"""
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """Respuestas con TTL en memoria, acotadas a `max_entries` (solo este proceso)"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # key -> (vence, respuesta)
+        self._entries: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+        self._locks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, response: StoredResponse, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, response)
+            self._entries.move_to_end(key)
+            # Todas tienen el mismo TTL: las más antiguas son las primeras en vencer
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if oldest[0] >= now and len(self._entries) <= self.max_entries:
+                    break
+                self._entries.popitem(last=False)
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires = self._locks.get(key)
+            if expires is not None and expires > now:
+                return False
+            self._locks[key] = now + ttl
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._locks.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._locks.clear()
+
+
+_backend: IdempotencyBackend = InMemoryIdempotencyBackend(settings.IDEMPOTENCY_MAX_ENTRIES)
+
+
+def get_idempotency_backend() -> IdempotencyBackend:
+    return _backend
+
+
+def set_idempotency_backend(backend: IdempotencyBackend) -> None:
+    """Reemplaza el backend (ej: uno compartido para despliegues multi-nodo)"""
+    global _backend
+    _backend = backend
+
+# Ejecución -->
+
+Handler = Callable[[Request], Coroutine[None, None, Response]]
+
+
+class IdempotencyManager:
+    """
+    Ejecuta una vez cada (usuario, ruta, Idempotency-Key):
+    - Si ya hay una respuesta guardada, se repite sin llamar al servicio
+      (ni a bcrypt, ni a la base de datos, ni al limitador de peticiones)
+    - Los duplicados simultáneos en el mismo proceso esperan a la primera
+      ejecución; en otro proceso esperan a que el backend tenga la respuesta
+    - La misma clave con otro cuerpo es un error del cliente (422)
+
+    Solo se guardan las respuestas exitosas: tras un error (4xx o 5xx) el
+    reintento se ejecuta de nuevo, para que pueda funcionar.
+    Sin token la clave se separa por IP y por cuerpo: dos clientes anónimos
+    con la misma clave nunca ven la respuesta del otro.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Future[Optional[StoredResponse]]"] = {}
+
+    @staticmethod
+    async def _scope(request: Request, key: str, fingerprint: str) -> str:
+        subject = request_token_subject(request.scope)
+        if subject is None:
+            subject = f"anon:{await client_ip(request) or '-'}:{fingerprint}"
+        return f"{subject}:{request.method}:{request.url.path}:{key}"
+
+    @staticmethod
+    def _fingerprint(request: Request, body: bytes) -> str:
+        digest = hashlib.sha256(body)
+        digest.update(request.url.query.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _storable(status_code: int) -> bool:
+        return status_code < 400
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> Response:
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyReusedException()
+        return stored.to_response()
+
+    async def handle(self, request: Request, call_next: Handler) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not settings.IDEMPOTENCY_ENABLED or not key:
+            return await call_next(request)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationException(
+                f"La Idempotency-Key no puede superar {MAX_KEY_LENGTH} caracteres"
+            )
+
+        backend = get_idempotency_backend()
+        fingerprint = self._fingerprint(request, await request.body())
+        scoped = await self._scope(request, key, fingerprint)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+        while True:
+            stored = backend.get(scoped)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+            # Duplicado en este proceso: esperar la primera ejecución
+            inflight = self._inflight.get(scoped)
+            if inflight is not None:
+                stored = await asyncio.shield(inflight)
+                if stored is not None:
+                    return self._replay(stored, fingerprint)
+                # La primera falló sin respuesta guardable: intentarlo de nuevo
+                continue
+
+            if backend.acquire(scoped, settings.IDEMPOTENCY_WAIT_SECONDS):
+                break
+
+            # Duplicado en otro proceso: esperar a que guarde la respuesta
+            if time.monotonic() >= deadline:
+                raise IdempotencyRequestInProgressException()
+            await asyncio.sleep(0.1)
+
+        future: "asyncio.Future[Optional[StoredResponse]]" = asyncio.get_running_loop().create_future()
+        self._inflight[scoped] = future
+        stored = None
+        try:
+            # Las excepciones (HTTPException incluida) siguen su curso sin guardarse
+            response = await call_next(request)
+            body = getattr(response, "body", None)
+            if isinstance(body, bytes) and self._storable(response.status_code):
+                stored = StoredResponse(
+                    fingerprint,
+                    response.status_code,
+                    body,
+                    list(response.raw_headers)
+                )
+                backend.set(scoped, stored, settings.IDEMPOTENCY_TTL_SECONDS)
+            return response
+        finally:
+            backend.release(scoped)
+            self._inflight.pop(scoped, None)
+            future.set_result(stored)
+
+
+idempotency_manager = IdempotencyManager()
+
+
+def not_idempotent(endpoint: Callable) -> Callable:
+    """
+    Excluye un POST de IdempotentRoute (ej: /auth/login, cuya respuesta
+    lleva credenciales que no deben quedar guardadas)
+    """
+    endpoint.idempotent = False
+    return endpoint
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Clase de ruta para los routers que aceptan Idempotency-Key en sus POST:
+    `APIRouter(route_class=IdempotentRoute)`
+    """
+
+    def get_route_handler(self) -> Handler:
+        handler = super().get_route_handler()
+        if "POST" not in self.methods or not getattr(self.endpoint, "idempotent", True):
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            return await idempotency_manager.handle(request, handler)
+
+        return idempotent_handler
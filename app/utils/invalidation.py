@@ -0,0 +1,349 @@
+# Bus de Invalidación de Cachés entre Procesos
+
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# La entrega entre procesos es "best effort": un datagrama o un mensaje
+# pub/sub puede perderse (buffer lleno, reconexión). Los canales que solo
+# invalidan son seguros: en el peor caso se recarga de más. Los canales con
+# deltas (CHANNEL_AVAILABILITY con ocupados/liberados y CHANNEL_USER_HOURS
+# con horas) no se pueden repetir ni reconstruir a partir del mensaje, así
+# que sus consumidores tienen un respaldo por tiempo
+# (AVAILABILITY_INDEX_TTL_SECONDS y USER_HOURS_REBUILD_SECONDS). Un delta
+# perdido solo se ve hasta ese plazo; no desactivar el respaldo con un
+# backend que pueda perder mensajes.
+
+# Canales conocidos
+CHANNEL_ROOMS = "rooms"                # key: "*" (todo el catálogo)
+CHANNEL_USERS = "users"                # key: id del usuario
+CHANNEL_AVAILABILITY = "availability"  # key: "<sala_id>:<fecha>[:<ocupados>:<liberados>]"
+CHANNEL_PRIMARY_PIN = "primary-pin"    # key: id del usuario que acaba de escribir
+CHANNEL_USER_RESERVATIONS = "user-reservations"  # key: id del dueño de las reservas que cambiaron
+CHANNEL_USER_HOURS = "user-hours"  # key: "<usuario_id>:<fecha>:<horas>", "<usuario_id>" o "*"
+
+Handler = Callable[[str], None]
+Deliver = Callable[[str, str], None]
+
+# Backends -->
+
+class InvalidationBackend:
+    """
+    Transporte de los mensajes hacia los demás procesos.
+    El proceso que publica ya aplicó la invalidación localmente.
+    """
+
+    # Los backends remotos envían desde el hilo del bus, no desde el event loop
+    remote = True
+
+    def start(self, deliver: Deliver) -> None:
+        pass
+
+    def publish(self, channel: str, key: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class LocalBackend(InvalidationBackend):
+    """Un solo proceso: no hay nadie más a quien avisar"""
+
+    remote = False
+
+
+class UnixSocketBackend(InvalidationBackend):
+    """
+    Broadcast entre los workers de un mismo host.
+    Cada proceso escucha en un socket UNIX de datagramas dentro de `directory`
+    y publicar es enviar el mensaje a todos los sockets del directorio.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = ""
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self, deliver: Deliver) -> None:
+        # El pid se toma al arrancar: cada worker tiene su propio socket
+        self.path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.settimeout(0.5)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(deliver,),
+            name="invalidation-bus",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, deliver: Deliver) -> None:
+        while self._running:
+            try:
+                data = self._sock.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            _deliver_message(data, deliver)
+
+    def publish(self, channel: str, key: str) -> None:
+        if not os.path.isdir(self.directory):
+            return
+
+        payload = json.dumps({"c": channel, "k": key}).encode()
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # Un worker que no lee (buffer lleno) pierde el mensaje en lugar de
+        # detener el envío a los demás
+        sender.setblocking(False)
+        try:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path == self.path or not name.endswith(".sock"):
+                    continue
+                try:
+                    sender.sendto(payload, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Socket de un worker que ya terminó
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except OSError as e:
+                    logger.warning("No se pudo enviar invalidación a %s: %s", path, e)
+        finally:
+            sender.close()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._sock is not None:
+            self._sock.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def _deliver_message(data: bytes, deliver: Deliver, origin: Optional[str] = None) -> None:
+    """Decodifica y entrega un mensaje; nunca lanza (el hilo que escucha sigue vivo)"""
+    try:
+        message = json.loads(data)
+        channel, key = message["c"], message["k"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Mensaje de invalidación inválido: %r", data)
+        return
+    # Ignorar los mensajes propios
+    if origin is not None and message.get("o") == origin:
+        return
+    try:
+        deliver(channel, key)
+    except Exception:
+        logger.exception("Error entregando invalidación %s:%s", channel, key)
+
+
+class PubSubClient:
+    """
+    Interfaz mínima de un cliente pub/sub tipo Redis.
+    Un adaptador sobre redis-py solo necesita implementar estos dos métodos.
+    """
+
+    def publish(self, topic: str, message: bytes) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, topic: str) -> Iterator[bytes]:
+        """Iterador bloqueante con los mensajes del tópico"""
+        raise NotImplementedError
+
+
+class InMemoryPubSub(PubSubClient):
+    """Sustituto local de Redis (mismo proceso), útil en desarrollo y pruebas"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, message: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers[topic])
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def subscribe(self, topic: str) -> Iterator[bytes]:
+        inbox: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers[topic].append(inbox)
+        while True:
+            message = inbox.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self, topic: str) -> None:
+        with self._lock:
+            subscribers = self._subscribers.pop(topic, [])
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+
+class PubSubBackend(InvalidationBackend):
+    """
+    Backend sobre un cliente pub/sub (Redis o el sustituto en memoria).
+    Si la suscripción se corta se vuelve a suscribir; lo publicado mientras
+    tanto se pierde (ver el respaldo por tiempo de los canales con deltas).
+    """
+
+    def __init__(
+        self,
+        client: PubSubClient,
+        topic: str = "cache-invalidation",
+        retry_seconds: float = 1.0
+    ):
+        self.client = client
+        self.topic = topic
+        self.retry_seconds = retry_seconds
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self, deliver: Deliver) -> None:
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(deliver,),
+            name="invalidation-bus",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, deliver: Deliver) -> None:
+        while self._running:
+            try:
+                for data in self.client.subscribe(self.topic):
+                    _deliver_message(data, deliver, self.origin)
+                return  # El cliente cerró la suscripción
+            except Exception:
+                logger.exception("Suscripción de invalidación interrumpida; reintentando")
+                time.sleep(self.retry_seconds)
+
+    def publish(self, channel: str, key: str) -> None:
+        payload = json.dumps({"c": channel, "k": key, "o": self.origin}).encode()
+        self.client.publish(self.topic, payload)
+
+    def stop(self) -> None:
+        self._running = False
+
+# Bus -->
+
+class InvalidationBus:
+    """
+    Los módulos con caché se suscriben a un canal; las escrituras publican.
+    `publish` invalida primero en el proceso actual y luego avisa al resto.
+
+    El aviso al resto no bloquea a quien publica (normalmente el event
+    loop): va a una cola que un hilo propio entrega al backend en orden.
+    Si la cola se llena el mensaje se descarta y se cuenta en `dropped`.
+    """
+
+    def __init__(self, backend: Optional[InvalidationBackend] = None, queue_size: int = 10000):
+        self.backend = backend or LocalBackend()
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._outbox: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=queue_size)
+        self._sender: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel].append(handler)
+
+    def _deliver(self, channel: str, key: str) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Error invalidando caché %s:%s", channel, key)
+
+    def publish(self, channel: str, key: str = "*") -> None:
+        self._deliver(channel, key)
+        if not self.backend.remote:
+            return
+        if self._sender is None:
+            # Sin hilo de envío (antes de start o después de stop)
+            self._send(channel, key)
+            return
+        try:
+            self._outbox.put_nowait((channel, key))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Cola de invalidación llena; se descarta %s:%s", channel, key)
+
+    def _send(self, channel: str, key: str) -> None:
+        try:
+            self.backend.publish(channel, key)
+        except Exception:
+            logger.exception("Error publicando invalidación %s:%s", channel, key)
+
+    def _run_sender(self) -> None:
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            self._send(*message)
+
+    def set_backend(self, backend: InvalidationBackend) -> None:
+        self.backend = backend
+
+    def start(self) -> None:
+        self.backend.start(self._deliver)
+        if self.backend.remote:
+            self._sender = threading.Thread(
+                target=self._run_sender,
+                name="invalidation-sender",
+                daemon=True
+            )
+            self._sender.start()
+
+    def stop(self) -> None:
+        sender, self._sender = self._sender, None
+        if sender is not None:
+            try:
+                self._outbox.put(None, timeout=1)
+            except queue.Full:
+                pass
+            sender.join(timeout=1)
+        self.backend.stop()
+
+    def metrics(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "queued": self._outbox.qsize(),
+            "dropped": self.dropped
+        }
+
+
+def _build_backend() -> InvalidationBackend:
+    if settings.INVALIDATION_BACKEND == "unix":
+        return UnixSocketBackend(settings.INVALIDATION_SOCKET_DIR)
+    return LocalBackend()
+
+
+# Instancia global del bus (una por proceso)
+invalidation_bus = InvalidationBus(_build_backend(), settings.INVALIDATION_QUEUE_SIZE)
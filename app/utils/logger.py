@@ -0,0 +1,308 @@
+# Logging de la Aplicación (JSON, asíncrono y con muestreo de accesos)
+
+import atexit
+import itertools
+import os
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.utils.tracing import get_current_span
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Ids de petición: prefijo aleatorio por proceso + contador (evita una
+# llamada a os.urandom por petición, que es lo más caro de uuid4)
+_REQUEST_ID_PREFIX = os.urandom(6).hex()
+_request_counter = itertools.count(1)
+
+
+def new_request_id() -> str:
+    return f"{_REQUEST_ID_PREFIX}{next(_request_counter):010x}"
+
+
+def _reset_request_ids() -> None:
+    # Workers creados con fork (gunicorn --preload) no deben repetir ids
+    global _REQUEST_ID_PREFIX, _request_counter
+    _REQUEST_ID_PREFIX = os.urandom(6).hex()
+    _request_counter = itertools.count(1)
+
+
+os.register_at_fork(after_in_child=_reset_request_ids)
+
+# Atributos propios de LogRecord: el resto son campos extra del registro
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+) | {"message", "asctime"}
+
+# Contexto de la petición -->
+
+class RequestContext:
+    """Datos de la petición en curso que se agregan a cada registro"""
+
+    __slots__ = ("request_id", "queries")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.queries = 0
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    return _request_context.get()
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Cuenta las sentencias SQL de cada petición (también desde el threadpool)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        request_context = _request_context.get()
+        if request_context is not None:
+            request_context.queries += 1
+
+# Formato -->
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea, con el request_id y los campos de `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = {
+            key: value for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS and key != "request_id"
+        }
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [{request_id}]" if request_id else line
+
+# Handler asíncrono -->
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Encola el registro sin bloquear: el formato y la escritura a stdout los
+    hace el hilo del QueueListener. Si la cola está llena se descarta el
+    registro (y se cuenta) en lugar de frenar la petición.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El mensaje se resuelve aquí (los argumentos pueden cambiar después);
+        # el formato, incluida la traza de la excepción, queda para el listener.
+        # Este es el único handler del proceso: no hace falta copiar el registro
+        record.msg = record.getMessage()
+        record.args = None
+
+        # El request_id también: el hilo del listener no tiene el contexto
+        request_context = _request_context.get()
+        if request_context is not None and not hasattr(record, "request_id"):
+            record.request_id = request_context.request_id
+        # En las peticiones muestreadas, el registro enlaza con su traza
+        span = get_current_span()
+        if span is not None and not hasattr(record, "trace_id"):
+            record.trace_id = span.trace.trace_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_output: Optional[logging.Handler] = None
+_queue_handler: Optional[ContextQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """
+    Configura el logging del proceso e inicia el hilo que escribe los
+    registros. Es idempotente: se llama al importar la aplicación y de nuevo
+    en el arranque (por si un apagado anterior detuvo el hilo).
+    """
+    global _output, _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    if _output is None:
+        _output = logging.StreamHandler(sys.stdout)
+        _output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+        _queue_handler = ContextQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        atexit.register(shutdown_logging)
+
+    _listener = QueueListener(_queue_handler.queue, _output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    # Uvicorn y gunicorn pasan por el mismo handler; el acceso lo registra
+    # AccessLogMiddleware (con latencia, consultas y muestreo)
+    for name in ("uvicorn", "uvicorn.error", "gunicorn.error"):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+    for name in ("uvicorn.access", "gunicorn.access"):
+        logging.getLogger(name).disabled = True
+
+    # SQL solo fuera de producción y siempre por la cola (nunca echo=True,
+    # que escribe a stdout de forma síncrona con su propio handler)
+    sql_echo = settings.SQL_ECHO and not settings.is_production
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if sql_echo else logging.WARNING)
+
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Escribe los registros pendientes y detiene el hilo del listener.
+    Lo que se registre después se escribe directamente (sin cola).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger().handlers = [_output]
+
+
+def logging_metrics() -> dict:
+    if _queue_handler is None:
+        return {}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped
+    }
+
+# Registro de accesos -->
+
+access_logger = logging.getLogger("app.access")
+
+
+class AccessLogMiddleware:
+    """
+    Asigna un request_id (o respeta el X-Request-ID recibido), cuenta las
+    consultas SQL y registra una línea por petición con su latencia.
+
+    Las rutas de mucho volumen se muestrean (LOG_ACCESS_SAMPLE_ROUTES, por
+    prefijo); los errores 5xx y las peticiones lentas se registran siempre.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        route_sample_rates: Optional[Dict[str, float]] = None,
+        slow_request_ms: float = 1000,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        # Prefijos más largos primero
+        self.route_sample_rates = sorted(
+            (route_sample_rates or {}).items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.slow_request_ms = slow_request_ms
+
+    def _rate_for(self, path: str) -> float:
+        for prefix, rate in self.route_sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_context = RequestContext(request_id or new_request_id())
+        token = _request_context.set(request_context)
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_context.request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            path = scope["path"]
+            if access_logger.isEnabledFor(logging.INFO) and (
+                status_code >= 500
+                or latency_ms >= self.slow_request_ms
+                or random.random() < self._rate_for(path)
+            ):
+                # Registro armado a mano: evita que logging recorra la pila
+                # buscando el archivo y la línea (siempre serían estos)
+                access_logger.handle(access_logger.makeRecord(
+                    access_logger.name,
+                    logging.INFO,
+                    __file__,
+                    0,
+                    "%s %s %s",
+                    (scope["method"], path, status_code),
+                    None,
+                    extra={
+                        "method": scope["method"],
+                        "path": path,
+                        "status": status_code,
+                        "latency_ms": round(latency_ms, 2),
+                        "queries": request_context.queries,
+                    }
+                ))
+            _request_context.reset(token)
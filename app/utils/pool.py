@@ -0,0 +1,212 @@
+# Pool de Conexiones: Métricas, Pre-ping por Inactividad y Autoajuste
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Límites (en ms) del histograma de espera al pedir una conexión
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Tiempos de espera en checkout, timeouts y conexiones en uso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.in_use = 0
+        self.peak_in_use = 0          # Desde el arranque
+        self.window_peak_in_use = 0   # Desde el último autoajuste
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_wait(self, seconds: float) -> None:
+        millis = seconds * 1000
+        index = next(
+            (i for i, limit in enumerate(WAIT_BUCKETS_MS) if millis <= limit),
+            len(WAIT_BUCKETS_MS)
+        )
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.wait_histogram[index] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def connection_out(self) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.window_peak_in_use = max(self.window_peak_in_use, self.in_use)
+
+    def connection_in(self) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def take_window_peak(self) -> int:
+        with self._lock:
+            peak = self.window_peak_in_use
+            self.window_peak_in_use = self.in_use
+            return peak
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            histogram = {
+                f"<={limit}ms": count
+                for limit, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)
+            }
+            histogram[f">{WAIT_BUCKETS_MS[-1]}ms"] = self.wait_histogram[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "wait_histogram": histogram,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto se espera por una conexión"""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Conservar las métricas si el engine recrea el pool (ej: dispose)
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _ping(dbapi_connection) -> None:
+    ping = getattr(dbapi_connection, "ping", None)
+    if ping is not None:
+        # PyMySQL: ping sin reconexión automática
+        ping(False)
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def install_pool_instrumentation(
+    engine: Engine,
+    idle_ping_seconds: Optional[float] = None,
+    autotuner: Optional["PoolAutotuner"] = None
+) -> None:
+    """
+    Registra los eventos del pool:
+    - Conexiones en uso (para métricas y autoajuste)
+    - Pre-ping solo si la conexión estuvo inactiva más de `idle_ping_seconds`
+    """
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedQueuePool):
+            return
+        metrics = pool.metrics
+
+        if idle_ping_seconds is not None:
+            last_used = connection_record.info.get("last_used")
+            if last_used is not None and time.monotonic() - last_used > idle_ping_seconds:
+                metrics.pings += 1
+                try:
+                    _ping(dbapi_connection)
+                except Exception as e:
+                    # El pool descarta la conexión y reintenta con otra
+                    metrics.ping_failures += 1
+                    raise DisconnectionError() from e
+
+        metrics.connection_out()
+        if autotuner is not None:
+            autotuner.maybe_adjust(pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_used"] = time.monotonic()
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.metrics.connection_in()
+
+
+class PoolAutotuner:
+    """
+    Modo adaptativo: cada `interval_seconds` fija el tamaño del pool según
+    la concurrencia máxima observada (+25% de margen), entre `min_size` y `max_size`.
+    Ajusta las conexiones que el pool conserva abiertas; el máximo absoluto
+    sigue siendo pool_size + max_overflow.
+    """
+
+    def __init__(self, min_size: int, max_size: int, interval_seconds: float):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.interval_seconds = interval_seconds
+        self._last_adjust = time.monotonic()
+        self._lock = threading.Lock()
+
+    def maybe_adjust(self, pool: InstrumentedQueuePool) -> None:
+        now = time.monotonic()
+        if now - self._last_adjust < self.interval_seconds:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_adjust = now
+            peak = pool.metrics.take_window_peak()
+            target = min(self.max_size, max(self.min_size, math.ceil(peak * 1.25)))
+            current = pool.size()
+            if target != current:
+                # Queue.maxsize es el número de conexiones que el pool conserva;
+                # las que sobren se cierran al devolverse
+                pool._pool.maxsize = target
+                logger.info("Pool ajustado de %s a %s conexiones (pico %s)", current, target, peak)
+        finally:
+            self._lock.release()
+
+
+def pool_stats(engine: Engine) -> Dict:
+    pool = engine.pool
+    stats = {
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.metrics.snapshot())
+    return stats
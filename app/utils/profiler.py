@@ -0,0 +1,304 @@
+# Profiler Estadístico (muestreo de pilas del worker en caliente)
+
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.model import UserRole
+from app.config.settings import settings
+from app.utils.logger import get_request_context, new_request_id
+from app.utils.security import request_token_claims
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Funciones donde un hilo está esperando (event loop sin trabajo, workers del
+# threadpool sin tareas, hilos de logging y trazas): no son consumo de CPU
+_IDLE_LEAVES = frozenset({
+    ("selectors", "select"),
+    ("threading", "wait"),
+    ("threading", "_wait_for_tstate_lock"),
+    ("queue", "get"),
+    ("concurrent.futures.thread", "_worker"),
+})
+
+# Paquete de cada frame -> categoría del resumen (el frame más cercano a la
+# hoja decide: el tiempo dentro de bcrypt llamado desde el ORM es bcrypt)
+_CATEGORIES = (
+    ("passlib", "bcrypt"),
+    ("bcrypt", "bcrypt"),
+    ("jose", "jwt"),
+    ("pydantic", "pydantic"),
+    ("pydantic_core", "pydantic"),
+    ("sqlalchemy", "sqlalchemy"),
+    ("json", "json"),
+    ("numpy", "numpy"),
+    ("fastapi", "framework"),
+    ("starlette", "framework"),
+    ("anyio", "framework"),
+    ("asyncio", "framework"),
+    ("app", "app"),
+)
+_CATEGORY_OF = dict(_CATEGORIES)
+
+# Un solo profiler a la vez por worker: dos muestreadores se medirían entre sí
+_slot = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    Cada `interval` segundos toma la pila de todos los hilos del proceso
+    (sys._current_frames) desde un hilo propio y cuenta las pilas iguales.
+    No instrumenta llamadas: el costo es fijo por muestra, no por función.
+
+    La salida "collapsed" (una pila por línea, `a;b;c cuenta`) es la que
+    usan flamegraph.pl, speedscope e inferno.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[object, tuple] = {}
+        self._paths = sorted((path for path in sys.path if path), key=len, reverse=True)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.stopped_at or time.monotonic()) - self.started_at
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.stopped_at = time.monotonic()
+        return self
+
+    def _label(self, code) -> tuple:
+        # (módulo, función, etiqueta); cacheado por objeto de código
+        label = self._labels.get(code)
+        if label is None:
+            module = self._module_of(code.co_filename)
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = (module, code.co_name, f"{module}:{name}")
+        return label
+
+    def _module_of(self, filename: str) -> str:
+        for path in self._paths:
+            if filename.startswith(path):
+                relative = filename[len(path):].lstrip("/\\")
+                return relative.rsplit(".", 1)[0].replace("/", ".").replace("\\", ".")
+        return filename
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, "thread")
+                if ident == own or name.startswith("profiler"):
+                    continue
+                self._sample(name, frame)
+
+    def _sample(self, thread_name: str, frame) -> None:
+        leaf = self._label(frame.f_code)
+        if (leaf[0], leaf[1]) in _IDLE_LEAVES:
+            self.idle_samples += 1
+            return
+
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code)[2])
+            frame = frame.f_back
+        stack.append(thread_name)
+        stack.reverse()
+        self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    # Salida -->
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    @staticmethod
+    def _category(label: str) -> Optional[str]:
+        package = label.split(":", 1)[0].split(".", 1)[0]
+        return _CATEGORY_OF.get(package)
+
+    def summary(self, top: int = 20) -> dict:
+        """Reparto por categoría y funciones con más muestras propias"""
+        categories: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1] if frames else stack] += count
+            for label in reversed(frames):
+                category = self._category(label)
+                if category is not None:
+                    categories[category] += count
+                    break
+            else:
+                categories["other"] += count
+
+        total = self.samples or 1
+        return {
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "categories": {
+                name: round(count / total * 100, 1)
+                for name, count in categories.most_common()
+            },
+            "top_functions": [
+                {
+                    "function": label,
+                    "self_samples": count,
+                    "self_percent": round(count / total * 100, 1)
+                }
+                for label, count in own.most_common(top)
+            ]
+        }
+
+
+def acquire_profiler() -> bool:
+    return _slot.acquire(blocking=False)
+
+
+def release_profiler() -> None:
+    _slot.release()
+
+# Perfiles por petición -->
+
+class RequestProfile:
+    __slots__ = ("id", "method", "path", "status", "duration_ms", "created_at", "profiler")
+
+    def __init__(self, profile_id: str, method: str, path: str, profiler: SamplingProfiler):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status: Optional[int] = None
+        self.duration_ms = 0.0
+        self.created_at = datetime.now(timezone.utc)
+        self.profiler = profiler
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": self.profiler.samples,
+            "created_at": self.created_at
+        }
+
+
+class RequestProfileStore:
+    """Últimos perfiles de petición del worker (se consultan por su id)"""
+
+    def __init__(self, max_profiles: int = 50):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+
+request_profiles = RequestProfileStore(settings.PROFILER_MAX_STORED)
+
+
+def _is_admin_token(scope: Scope) -> bool:
+    claims = request_token_claims(scope)
+    return claims is not None and claims.get("rol") == UserRole.ADMIN.value
+
+
+class ProfilingMiddleware:
+    """
+    Perfila una sola petición si trae `X-Profile: 1` y un token de
+    administrador. El perfil queda en GET /admin/profiles/{id} (también
+    protegido) y la respuesta indica el id en X-Profile-Id.
+
+    Se muestrean todos los hilos mientras dura la petición: en un worker con
+    tráfico el perfil puede incluir trabajo de otras peticiones simultáneas.
+    """
+
+    def __init__(self, app: ASGIApp, interval: float = 0.005):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Un perfil en curso (de otra petición o del endpoint) tiene prioridad
+        if not acquire_profiler():
+            await self.app(scope, receive, send)
+            return
+
+        request_context = get_request_context()
+        profile = RequestProfile(
+            request_context.request_id if request_context else new_request_id(),
+            scope["method"],
+            scope["path"],
+            SamplingProfiler(self.interval)
+        )
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile.id
+            await send(message)
+
+        start = time.perf_counter()
+        profile.profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.profiler.stop()
+            release_profiler()
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            request_profiles.add(profile)
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        profile = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                profile = value
+        # El rol viene del token firmado; el perfil solo lo lee un admin vigente
+        return profile in (b"1", b"true") and _is_admin_token(scope)
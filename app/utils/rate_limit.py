@@ -0,0 +1,202 @@
+# Limitación de Peticiones (Token Bucket)
+
+import math
+import threading
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request
+
+from app.config.settings import settings
+from app.utils.exceptions import RateLimitExceededException
+from app.utils.security import request_token_subject
+
+# Backends de almacenamiento -->
+
+class RateLimitBackend:
+    """
+    Interfaz para guardar los buckets.
+    Un backend compartido (ej: Redis) permite limitar entre varios nodos.
+    """
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        """
+        Intenta consumir `cost` tokens del bucket `key`.
+        Retorna 0 si se permitió, o los segundos que faltan para poder hacerlo.
+        """
+        raise NotImplementedError
+
+    def reset(self, key: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, último_refill, momento_en_que_se_llena]
+        self.buckets: Dict[str, List[float]] = {}
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Backend en memoria dividido en shards para reducir la contención del lock.
+    Solo limita dentro del proceso actual.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self.shards = [_Shard() for _ in range(max(1, shards))]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def _shard_for(self, key: str) -> _Shard:
+        return self.shards[zlib.crc32(key.encode()) % len(self.shards)]
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        shard = self._shard_for(key)
+
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                if len(shard.buckets) >= self.max_keys_per_shard:
+                    self._prune(shard, now)
+                tokens = float(capacity)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / refill_rate
+
+            full_at = now + (capacity - tokens) / refill_rate
+            shard.buckets[key] = [tokens, now, full_at]
+            return wait
+
+    def _prune(self, shard: _Shard, now: float) -> None:
+        # Un bucket lleno equivale a uno inexistente: se puede descartar
+        for key in [k for k, b in shard.buckets.items() if b[2] <= now]:
+            del shard.buckets[key]
+
+        # Si aún no hay espacio, descartar los más antiguos
+        overflow = len(shard.buckets) - self.max_keys_per_shard + 1
+        for key in list(shard.buckets)[:max(0, overflow)]:
+            del shard.buckets[key]
+
+    def reset(self, key: Optional[str] = None) -> None:
+        for shard in self.shards:
+            with shard.lock:
+                if key is None:
+                    shard.buckets.clear()
+                else:
+                    shard.buckets.pop(key, None)
+
+
+_backend: RateLimitBackend = InMemoryRateLimitBackend(shards=settings.RATE_LIMIT_SHARDS)
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    return _backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Reemplaza el backend (ej: uno compartido para despliegues multi-nodo)"""
+    global _backend
+    _backend = backend
+
+# Funciones para identificar al cliente -->
+
+KeyFunc = Callable[[Request], Awaitable[Optional[str]]]
+
+
+async def client_ip(request: Request) -> Optional[str]:
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+async def body_email(request: Request) -> Optional[str]:
+    # FastAPI ya leyó el body, así que request.json() no vuelve a leer el socket
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+async def token_subject(request: Request) -> Optional[str]:
+    # Solo se confía en tokens válidos para no agotar el bucket de otra cuenta
+    return request_token_subject(request.scope)
+
+# Dependencia de FastAPI -->
+
+class RateLimiter:
+    """
+    Dependencia que rechaza la petición con 429 cuando se agota el bucket.
+    Se evalúa antes que el handler, es decir, antes de bcrypt o de la BD.
+    """
+
+    def __init__(self, name: str, capacity: int, window_seconds: int, key_func: KeyFunc):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / window_seconds
+        self.key_func = key_func
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        key = await self.key_func(request)
+        if key is None:
+            return
+
+        wait = get_rate_limit_backend().consume(
+            f"{self.name}:{key}",
+            self.capacity,
+            self.refill_rate
+        )
+        if wait > 0:
+            raise RateLimitExceededException(math.ceil(wait))
+
+# Limitadores de la aplicación -->
+
+login_ip_limiter = RateLimiter(
+    "login:ip",
+    settings.RATE_LIMIT_LOGIN_PER_IP,
+    settings.RATE_LIMIT_WINDOW_SECONDS,
+    client_ip
+)
+
+login_account_limiter = RateLimiter(
+    "login:account",
+    settings.RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    settings.RATE_LIMIT_WINDOW_SECONDS,
+    body_email
+)
+
+register_ip_limiter = RateLimiter(
+    "register:ip",
+    settings.RATE_LIMIT_REGISTER_PER_IP,
+    settings.RATE_LIMIT_WINDOW_SECONDS,
+    client_ip
+)
+
+booking_ip_limiter = RateLimiter(
+    "booking:ip",
+    settings.RATE_LIMIT_BOOKING_PER_IP,
+    settings.RATE_LIMIT_WINDOW_SECONDS,
+    client_ip
+)
+
+booking_account_limiter = RateLimiter(
+    "booking:account",
+    settings.RATE_LIMIT_BOOKING_PER_USER,
+    settings.RATE_LIMIT_WINDOW_SECONDS,
+    token_subject
+)
@@ -0,0 +1,147 @@
+# Planificador de Temporizadores (heap con borrado perezoso)
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Recibe las claves vencidas en lote
+ExpireCallback = Callable[[List[Hashable]], Awaitable[None]]
+
+
+class TimerScheduler:
+    """
+    Temporizadores de un solo disparo sobre un heap de plazos.
+
+    - Programar es O(log n) y cancelar es O(1): la entrada queda en el heap
+      y se descarta al salir si su plazo ya no coincide.
+    - Una sola tarea duerme hasta el plazo más próximo, así que el costo en
+      reposo no depende de cuántos temporizadores haya pendientes.
+    - Los plazos que caen dentro de `resolution` segundos se agrupan en un
+      mismo lote, que se entrega en trozos de `batch_size`.
+
+    Debe usarse desde el event loop (no es thread-safe).
+    """
+
+    def __init__(
+        self,
+        callback: ExpireCallback,
+        resolution: float = 1.0,
+        batch_size: int = 500,
+        retry_delay: float = 30.0
+    ):
+        self.callback = callback
+        self.resolution = resolution
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._deadlines: Dict[Hashable, float] = {}
+        self._sequence = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+
+        # Métricas
+        self.fired = 0
+        self.failed_batches = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    # Temporizadores -->
+
+    def schedule(self, key: Hashable, delay: float) -> None:
+        """Programa (o reprograma) `key` para dentro de `delay` segundos"""
+        deadline = time.monotonic() + max(0.0, delay)
+        self._deadlines[key] = deadline
+        # La secuencia desempata plazos iguales sin comparar las claves
+        heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+
+        if self._heap[0][2] == key and self._wakeup is not None:
+            # Es el nuevo plazo más próximo: acortar la espera actual
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        return self._deadlines.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def _pop_due(self, now: float) -> List[Hashable]:
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(heap)
+            # Entradas canceladas o reprogramadas: descartar
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+
+        # Si las entradas descartadas dominan el heap, compactarlo
+        if len(heap) > 2 * len(self._deadlines) + 1024:
+            self._heap = [entry for entry in heap if self._deadlines.get(entry[2]) == entry[0]]
+            heapq.heapify(self._heap)
+        return due
+
+    def _next_timeout(self, now: float) -> Optional[float]:
+        while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - now) + self.resolution
+
+    # Ciclo de vida -->
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="timer-scheduler")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is None:
+            return
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        self._wakeup = None
+
+    async def _run(self) -> None:
+        while self._running:
+            due = self._pop_due(time.monotonic())
+            for start in range(0, len(due), self.batch_size):
+                batch = due[start:start + self.batch_size]
+                try:
+                    await self.callback(batch)
+                    self.fired += len(batch)
+                except Exception:
+                    logger.exception("Error procesando %s temporizadores vencidos", len(batch))
+                    self.failed_batches += 1
+                    for key in batch:
+                        self.schedule(key, self.retry_delay)
+
+            timeout = self._next_timeout(time.monotonic())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def metrics(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "pending": len(self._deadlines),
+            "heap_size": len(self._heap),
+            "fired": self.fired,
+            "failed_batches": self.failed_batches
+        }
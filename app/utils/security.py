@@ -1,20 +1,33 @@
 # Utilidades para el apartado de Seguridad
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Union, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.types import Scope
 
 from app.config.settings import settings
+from app.utils.clock import get_clock
+from app.utils.tracing import traced
 
 # Implementación de hashing para las contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Vigencia de los tokens
+ACCESS_TOKEN_LIFETIME = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+RESET_TOKEN_LIFETIME = timedelta(hours=1)
+
+# Resultado de verificar el token de la petición: (encabezado, claims o None)
+TOKEN_CLAIMS_SCOPE_KEY = "app.token_claims"
+
+@traced("bcrypt.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     
     return pwd_context.verify(plain_password, hashed_password)
 
+@traced("bcrypt.hash")
 def get_password_hash(password: str) -> str:
     
     return pwd_context.hash(password)
@@ -26,9 +39,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     # Configurar tiempo de expiración
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = get_clock().now() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = get_clock().now() + ACCESS_TOKEN_LIFETIME
     
     to_encode.update({"exp": expire})
     
@@ -42,6 +55,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+@traced("jwt.verify_token")
 def verify_token(token: str) -> dict:
     
     credentials_exception = HTTPException(
@@ -68,9 +82,47 @@ def verify_token(token: str) -> dict:
         raise credentials_exception
 
 
+def token_claims(authorization: Optional[str]) -> Optional[dict]:
+    
+    # Verificar un encabezado "Bearer <token>" sin lanzar excepciones
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    
+    try:
+        return verify_token(token)
+    except HTTPException:
+        return None
+
+
+def token_subject(authorization: Optional[str]) -> Optional[str]:
+    
+    # Obtener el 'sub' de un encabezado "Bearer <token>" sin lanzar excepciones
+    claims = token_claims(authorization)
+    return claims.get("sub") if claims else None
+
+
+def request_token_claims(scope: Scope) -> Optional[dict]:
+    
+    # Middlewares y dependencias comparten el scope de la petición: el token
+    # se verifica la primera vez y las siguientes lecturas usan el resultado
+    authorization = Headers(scope=scope).get("authorization")
+    cached = scope.get(TOKEN_CLAIMS_SCOPE_KEY)
+    if cached is not None and cached[0] == authorization:
+        return cached[1]
+    claims = token_claims(authorization)
+    scope[TOKEN_CLAIMS_SCOPE_KEY] = (authorization, claims)
+    return claims
+
+
+def request_token_subject(scope: Scope) -> Optional[str]:
+    claims = request_token_claims(scope)
+    return claims.get("sub") if claims else None
+
+
 def create_reset_token(user_id: int) -> str:
     
-    expire = datetime.utcnow() + timedelta(hours=1)
+    expire = get_clock().now() + RESET_TOKEN_LIFETIME
     to_encode = {
         "sub": str(user_id),
         "type": "reset_password",
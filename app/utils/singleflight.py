@@ -0,0 +1,199 @@
+# Agrupación de Lecturas Idénticas Simultáneas (single-flight)
+
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.concurrency import run_in_threadpool
+
+
+class _KeyStats:
+    __slots__ = ("calls", "executions")
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+
+
+class SingleFlightGroup:
+    """
+    Mientras una llamada con cierta clave está en curso, las demás llamadas
+    con la misma clave esperan su resultado en lugar de repetir el trabajo.
+    No es una caché: al terminar la ejecución la clave se libera.
+
+    El trabajo corre en el threadpool para que el event loop siga atendiendo
+    (y agrupando) las demás peticiones mientras tanto.
+    """
+
+    def __init__(self, name: str, max_tracked_keys: int = 1000):
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._calls = 0
+        self._executions = 0
+        # Métricas por clave (LRU acotado: las claves pueden ser ids de usuario)
+        self._keys: "OrderedDict[Hashable, _KeyStats]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _track(self, key: Hashable, executed: bool) -> None:
+        with self._lock:
+            self._calls += 1
+            stats = self._keys.get(key)
+            if stats is None:
+                stats = self._keys[key] = _KeyStats()
+                if len(self._keys) > self.max_tracked_keys:
+                    self._keys.popitem(last=False)
+            else:
+                self._keys.move_to_end(key)
+            stats.calls += 1
+            if executed:
+                self._executions += 1
+                stats.executions += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Ejecuta `fn` (síncrona) una vez por clave; retorna (resultado, compartido)"""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._track(key, executed=False)
+            return await asyncio.shield(inflight), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita el aviso "exception was never retrieved" si nadie esperaba
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self._track(key, executed=True)
+        try:
+            result = await run_in_threadpool(fn)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def metrics(self, top: int = 10) -> dict:
+        with self._lock:
+            hot = sorted(
+                self._keys.items(),
+                key=lambda item: item[1].calls - item[1].executions,
+                reverse=True
+            )[:top]
+            return {
+                "calls": self._calls,
+                "executions": self._executions,
+                "deduplicated": self._calls - self._executions,
+                "in_flight": len(self._inflight),
+                "top_keys": [
+                    {
+                        "key": repr(key),
+                        "calls": stats.calls,
+                        "deduplicated": stats.calls - stats.executions
+                    }
+                    for key, stats in hot
+                    if stats.calls > stats.executions
+                ]
+            }
+
+
+_groups: Dict[str, SingleFlightGroup] = {}
+
+
+def get_group(name: str) -> SingleFlightGroup:
+    group = _groups.get(name)
+    if group is None:
+        group = _groups.setdefault(name, SingleFlightGroup(name))
+    return group
+
+
+def metrics() -> dict:
+    return {name: group.metrics() for name, group in sorted(_groups.items())}
+
+# Resultados del ORM -->
+
+def _detached_copy(instance: Any) -> Any:
+    """Copia limpia (sin sesión ni cambios) de las columnas de una instancia"""
+    state = inspect(instance)
+    copy = state.mapper.class_manager.new_instance()
+    for attr in state.mapper.column_attrs:
+        if attr.key in state.dict:
+            set_committed_value(copy, attr.key, state.dict[attr.key])
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _is_mapped(value: Any) -> bool:
+    return isinstance(inspect(value, raiseerr=False), InstanceState)
+
+
+def _snapshot(result: Any) -> Any:
+    if isinstance(result, list):
+        return [_detached_copy(item) if _is_mapped(item) else item for item in result]
+    return _detached_copy(result) if result is not None and _is_mapped(result) else result
+
+# Decorador -->
+
+def _bind_of(service: Any) -> Any:
+    """
+    Engine de la sesión del servicio (primario o réplica). Forma parte de la
+    clave: una lectura fijada al primario (read-your-writes) no puede recibir
+    el resultado de una lectura en curso contra una réplica atrasada.
+    """
+    db = getattr(service, "db", None)
+    if db is None:
+        return None
+    try:
+        return db.get_bind()
+    except Exception:
+        return None
+
+
+def single_flight(name: str, key: Optional[Callable[..., Hashable]] = None, merge: bool = False):
+    """
+    Decora un método síncrono de un servicio (que usa `self.db`) y lo
+    convierte en asíncrono: las llamadas simultáneas con los mismos
+    argumentos y la misma base de datos (primario o réplica) comparten una
+    sola ejecución.
+
+    Con `merge=True` el resultado son instancias del ORM: quien ejecuta
+    recibe las suyas y cada llamada que esperó recibe una copia incorporada
+    a su propia sesión con `merge(load=False)`, sin volver a consultar.
+    """
+
+    def decorator(fn):
+        group = get_group(name)
+
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            call_key = (
+                _bind_of(self),
+                key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            )
+
+            if not merge:
+                result, _ = await group.do(call_key, lambda: fn(self, *args, **kwargs))
+                return result
+
+            def run():
+                # La copia se toma antes de que el dueño pueda modificar la instancia
+                result = fn(self, *args, **kwargs)
+                return result, _snapshot(result)
+
+            (result, snapshot), shared = await group.do(call_key, run)
+            if not shared:
+                return result
+            if isinstance(snapshot, list):
+                return [self.db.merge(item, load=False) if _is_mapped(item) else item for item in snapshot]
+            if snapshot is not None and _is_mapped(snapshot):
+                return self.db.merge(snapshot, load=False)
+            return snapshot
+
+        return wrapper
+
+    return decorator
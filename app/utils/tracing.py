@@ -0,0 +1,586 @@
+# Trazas Distribuidas (compatibles con OpenTelemetry / W3C Trace Context)
+
+import atexit
+import functools
+import inspect
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_ID_HEADER = "X-Trace-Id"
+
+# Tipos de span (nombres de OTLP)
+KIND_INTERNAL = "SPAN_KIND_INTERNAL"
+KIND_SERVER = "SPAN_KIND_SERVER"
+KIND_CLIENT = "SPAN_KIND_CLIENT"
+
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+# Largo máximo de la sentencia SQL guardada en el span
+MAX_STATEMENT_LENGTH = 500
+
+# Ids (formato W3C: 16 bytes para la traza y 8 para el span, en hex).
+# getrandbits basta: no son secretos y os.urandom es más caro por llamada
+_random = random.Random()
+
+
+def _new_trace_id() -> str:
+    return f"{_random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{_random.getrandbits(64):016x}"
+
+# Spans -->
+
+class Trace:
+    """
+    Spans terminados de una traza muestreada; se exportan al cerrar la raíz.
+    Un hijo que termina después de la raíz (ej: una tarea que sigue en
+    segundo plano) ya no se exporta: se cuenta en `Tracer.late_spans`.
+    """
+
+    __slots__ = ("trace_id", "root", "spans", "finished")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.root: Optional["Span"] = None
+        self.spans: List["Span"] = []
+        self.finished = False
+
+
+class Span:
+    """
+    Una operación con inicio, fin, atributos y estado. Se usa como context
+    manager: mientras está abierto es el span actual, padre de los siguientes.
+    """
+
+    __slots__ = (
+        "trace", "name", "span_id", "parent_id", "kind",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "_token"
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent_id: Optional[str] = None,
+        kind: str = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes if attributes is not None else {}
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self._token = None
+
+    @property
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if self.trace.finished:
+            tracer.late_spans += 1
+            return
+        self.trace.spans.append(self)
+        if self is self.trace.root:
+            tracer.finish(self.trace)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Span de las peticiones no muestreadas: no mide ni guarda nada"""
+
+    __slots__ = ()
+
+    is_recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: str = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Hijo del span actual. Sin span actual (petición no muestreada o trabajo
+    fuera de una petición) retorna NOOP_SPAN: el costo es una lectura del
+    ContextVar.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Envuelve una función (síncrona o asíncrona) en un span hijo del actual"""
+
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is None:
+                    return await fn(*args, **kwargs)
+                with Span(parent.trace, span_name, parent.span_id):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return fn(*args, **kwargs)
+            with Span(parent.trace, span_name, parent.span_id):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(prefix: str):
+    """Decorador de clase: un span por cada método público (`prefix.método`)"""
+
+    def decorator(cls):
+        for attr_name, attr in list(vars(cls).items()):
+            if attr_name.startswith("_") or not inspect.isfunction(attr):
+                continue
+            setattr(cls, attr_name, traced(f"{prefix}.{attr_name}")(attr))
+        return cls
+
+    return decorator
+
+# Formato OTLP/JSON -->
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    return {"key": key, "value": _otlp_value(value)}
+
+
+def otlp_payload(spans: List[Span]) -> dict:
+    """Mismo formato que ExportTraceServiceRequest de OTLP/JSON"""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [
+                    _otlp_attribute("service.name", settings.APP_NAME),
+                    _otlp_attribute("service.version", settings.VERSION),
+                    _otlp_attribute("deployment.environment", settings.ENVIRONMENT),
+                ]
+            },
+            "scopeSpans": [{
+                "scope": {"name": "app.utils.tracing"},
+                "spans": [span.to_otlp() for span in spans]
+            }]
+        }]
+    }
+
+# Exportadores -->
+
+class SpanExporter:
+    """
+    Interfaz para enviar las trazas terminadas.
+    Un exportador OTLP (HTTP hacia un collector) puede implementarla sin
+    cambiar nada más; por defecto no se necesita un collector externo.
+    """
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Últimos `max_spans` spans en memoria (diagnóstico y pruebas)"""
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Una línea OTLP/JSON por lote, agregada al archivo. El collector de
+    OpenTelemetry (receptor otlpjsonfile) o Jaeger pueden importarlo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def export(self, spans: List[Span]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(otlp_payload(spans), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _default_exporter() -> Optional[SpanExporter]:
+    if settings.TRACING_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    if settings.TRACING_EXPORTER == "memory":
+        return InMemorySpanExporter(settings.TRACING_MEMORY_MAX_SPANS)
+    return None
+
+# Tracer -->
+
+class Tracer:
+    """
+    Decide el muestreo al inicio de cada petición (head-based) y entrega
+    las trazas terminadas al exportador desde un hilo propio, para que
+    escribir el archivo no frene la petición.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter], sample_rate: float, queue_size: int = 1000):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.exported = 0
+        self.dropped = 0
+        # Spans que terminaron después de su raíz (no se exportan)
+        self.late_spans = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def should_sample(self, parent_sampled: Optional[bool] = None) -> bool:
+        if self.exporter is None:
+            return False
+        # Respetar la decisión de quien llama si envió traceparent
+        if parent_sampled is not None:
+            return parent_sampled
+        return self.sample_rate > 0 and _random.random() < self.sample_rate
+
+    def start_trace(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        kind: str = KIND_SERVER,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Span:
+        """Span raíz de una traza ya muestreada"""
+        self.sampled += 1
+        trace = Trace(trace_id or _new_trace_id())
+        trace.root = Span(trace, name, parent_id, kind, attributes)
+        return trace.root
+
+    def finish(self, trace: Trace) -> None:
+        trace.finished = True
+        spans, trace.spans = trace.spans, []
+        if not spans:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            # Juntar lo que haya en espera en un solo lote
+            batch = list(spans)
+            stop = False
+            while len(batch) < 512:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                batch.extend(more)
+            self._export(batch)
+            if stop:
+                return
+
+    def _export(self, batch: List[Span]) -> None:
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(batch)
+            self.exported += len(batch)
+        except Exception:
+            # Las trazas no pueden tirar el proceso; se cuentan como perdidas
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Espera a que se exporten las trazas en cola (pruebas y apagado)"""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # El último lote puede seguir en export(): el hilo lo toma antes de vaciar
+        time.sleep(0.01)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    def metrics(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "sampled_traces": self.sampled,
+            "exported_spans": self.exported,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "late_spans": self.late_spans,
+        }
+
+
+tracer = Tracer(
+    _default_exporter() if settings.TRACING_ENABLED else None,
+    settings.TRACING_SAMPLE_RATE,
+    settings.TRACING_QUEUE_SIZE
+)
+atexit.register(tracer.shutdown)
+
+
+def get_span_exporter() -> Optional[SpanExporter]:
+    return tracer.exporter
+
+
+def set_span_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Reemplaza el exportador (ej: uno OTLP hacia un collector); None desactiva"""
+    tracer.exporter = exporter
+
+# Propagación W3C -->
+
+def parse_traceparent(value: str) -> Optional[tuple]:
+    """'00-<trace_id>-<span_id>-<flags>' -> (trace_id, span_id, muestreado)"""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    version, trace_id, span_id, flags = parts
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+# SQL -->
+
+def install_sql_tracing(engine: Engine) -> None:
+    """Un span por sentencia SQL de las peticiones muestreadas"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None or context is None:
+            return
+        # Sin los parámetros: pueden tener datos personales
+        context._trace_span = Span(parent.trace, "db.query", parent.span_id, KIND_CLIENT, {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": executemany,
+        })
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.attributes["db.rowcount"] = cursor.rowcount
+            span.end()
+            context._trace_span = None
+
+    @event.listens_for(engine, "handle_error")
+    def _fail_query_span(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+            context._trace_span = None
+
+# Middleware -->
+
+class TracingMiddleware:
+    """
+    Span raíz por petición. Continúa la traza del encabezado traceparent
+    (y respeta su decisión de muestreo); si no viene, muestrea con
+    TRACING_SAMPLE_RATE. Las peticiones no muestreadas no crean spans.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or tracer.exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+
+        if not tracer.should_sample(incoming[2] if incoming else None):
+            await self.app(scope, receive, send)
+            return
+
+        root = tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            trace_id=incoming[0] if incoming else None,
+            parent_id=incoming[1] if incoming else None,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            }
+        )
+
+        async def send_with_trace_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+                MutableHeaders(scope=message)[TRACE_ID_HEADER] = root.trace.trace_id
+            await send(message)
+
+        with root:
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                # El nombre con la plantilla de la ruta agrupa mejor ("/users/{user_id}")
+                route = scope.get("route")
+                route_path = getattr(route, "path", None)
+                if route_path:
+                    root.name = f"{scope['method']} {route_path}"
+                    root.attributes["http.route"] = route_path
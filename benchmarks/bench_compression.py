@@ -0,0 +1,104 @@
+# Benchmark de Compresión: ancho de banda vs CPU
+#
+#   python -m benchmarks.bench_compression
+#   python -m benchmarks.bench_compression --rooms 50 200 1000 --repeat 50
+#
+# Para cuerpos JSON con la forma de RoomList mide, por nivel de gzip y
+# calidad de brotli (si está instalado), la razón de compresión, los bytes
+# ahorrados y el tiempo de CPU por respuesta. Con el presupuesto de CPU del
+# middleware (COMPRESSION_CPU_BUDGET) indica cuántas respuestas por segundo
+# se pueden comprimir antes de empezar a enviarlas sin comprimir.
+
+import gzip
+import json
+import random
+import time
+
+from benchmarks.common import parser, print_table, summarize
+from app.config.settings import settings
+from app.utils.compression import brotli
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+SEDES = ("Campus Norte", "Campus Sur", "Centro", "Chapinero", "Usaquén")
+
+
+def room_list_body(rooms: int) -> bytes:
+    """Cuerpo de GET /rooms/ con `rooms` salas, serializado como lo hace FastAPI"""
+    rng = random.Random(30)
+    payload = {
+        "rooms": [
+            {
+                "id": i,
+                "nombre": f"Sala {rng.choice(('Reuniones', 'Creativa', 'Ejecutiva'))} {i}",
+                "sede": rng.choice(SEDES),
+                "capacidad": rng.randint(2, 30),
+                "is_active": True,
+                "recursos_count": rng.randint(0, 6),
+            }
+            for i in range(1, rooms + 1)
+        ],
+        "total": rooms,
+        "page": 1,
+        "per_page": rooms,
+        "pages": 1,
+    }
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def codecs():
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality)
+
+
+def cpu_ms(compress, body: bytes, repeat: int) -> dict:
+    compress(body)
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        compress(body)
+        samples.append((time.process_time() - start) * 1000)
+    return summarize(samples)
+
+
+def main() -> None:
+    arguments = parser("Ancho de banda vs CPU por nivel de compresión")
+    arguments.add_argument("--rooms", type=int, nargs="+", default=[20, 200, 2000])
+    arguments.add_argument("--repeat", type=int, default=100)
+    args = arguments.parse_args()
+
+    budget_ms = settings.COMPRESSION_CPU_BUDGET * 1000
+    configured = {f"gzip-{settings.COMPRESSION_GZIP_LEVEL}", f"br-{settings.COMPRESSION_BROTLI_QUALITY}"}
+    if brotli is None:
+        print("brotli no está instalado: solo se mide gzip")
+
+    for rooms in args.rooms:
+        body = room_list_body(rooms)
+        rows = []
+        for name, compress in codecs():
+            size = len(compress(body))
+            stats = cpu_ms(compress, body, args.repeat)
+            cpu = stats["mean_ms"]
+            rows.append([
+                name + (" *" if name in configured else ""),
+                size,
+                round(len(body) / size, 2),
+                f"{(len(body) - size) / 1024:.1f}",
+                cpu,
+                stats["p95_ms"],
+                # KB ahorrados por ms de CPU: lo que "compra" cada ms del presupuesto
+                round((len(body) - size) / 1024 / cpu, 1) if cpu else "-",
+                int(budget_ms / cpu) if cpu else "-",
+            ])
+        print_table(
+            f"{rooms} salas, {len(body)} bytes sin comprimir (* = configuración actual)",
+            ["codec", "bytes", "razón", "KB ahorrados", "cpu media ms", "cpu p95 ms", "KB/ms", "resp/s en presupuesto"],
+            rows
+        )
+
+
+if __name__ == "__main__":
+    main()
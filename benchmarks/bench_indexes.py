@@ -0,0 +1,167 @@
+# Benchmark de los Índices Compuestos de Reservas
+#
+#   python -m benchmarks.bench_indexes                  # 1.000.000 de reservas, SQLite
+#   python -m benchmarks.bench_indexes --rows 200000 --database-url mysql+pymysql://...
+#
+# Carga la tabla, mide las consultas frecuentes con los índices compuestos
+# (y su plan de ejecución), borra esos índices y vuelve a medir.
+
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from benchmarks.common import bench_engine, measure, parser, print_table
+from app.auth.model import User
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.rooms.model import Room
+
+ROOMS = 200
+USERS = 5000
+HOURS = range(8, 18)
+FIRST_DAY = date(2030, 1, 1)
+COMPOSITE_INDEXES = (
+    "idx_reservations_sala_fecha_estado",
+    "idx_reservations_usuario_fecha_estado",
+    "idx_reservations_estado_expira",
+)
+
+
+def load(engine: Engine, rows: int, chunk: int = 20000) -> float:
+    """Inserta `rows` reservas (un bloque por sala, día y hora); retorna los segundos"""
+    rng = random.Random(26)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": i, "nombre": f"Usuario {i}", "email": f"u{i}@bench.local", "contraseña_hash": "x"}
+            for i in range(1, USERS + 1)
+        ])
+        conn.execute(insert(Room.__table__), [
+            {"id": i, "nombre": f"Sala {i}", "sede": f"Sede {i % 5}", "capacidad": 8, "recursos": {}}
+            for i in range(1, ROOMS + 1)
+        ])
+
+    batch: List[dict] = []
+    created = datetime(2029, 12, 1, tzinfo=timezone.utc)
+    for n in range(rows):
+        day, rest = divmod(n, ROOMS * len(HOURS))
+        sala, hour = divmod(rest, len(HOURS))
+        estado = rng.choices(
+            (ReservationStatus.CONFIRMADA, ReservationStatus.CANCELADA, ReservationStatus.PENDIENTE),
+            weights=(80, 15, 5)
+        )[0]
+        fecha = FIRST_DAY + timedelta(days=day)
+        batch.append({
+            "usuario_id": rng.randint(1, USERS),
+            "sala_id": sala + 1,
+            "fecha": fecha,
+            "hora_inicio": dtime(HOURS[hour]),
+            "hora_fin": dtime(HOURS[hour] + 1),
+            "estado": estado,
+            "expires_at": created + timedelta(days=day) if estado == ReservationStatus.PENDIENTE else None,
+            "created_at": created,
+            "updated_at": datetime.combine(fecha, dtime(7), timezone.utc),
+        })
+        if len(batch) == chunk:
+            with engine.begin() as conn:
+                conn.execute(insert(Reservation.__table__), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(Reservation.__table__), batch)
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE TABLE reservations"))
+    return time.perf_counter() - start
+
+
+def hot_queries(days: int) -> Dict[str, Callable[[Session, random.Random], Query]]:
+    def day(rng):
+        return FIRST_DAY + timedelta(days=rng.randrange(days))
+
+    return {
+        # Disponibilidad de una sala en un día
+        "ocupación sala/día": lambda db, rng: db.query(Reservation.hora_inicio).filter(
+            Reservation.sala_id == rng.randint(1, ROOMS),
+            Reservation.fecha == day(rng),
+            Reservation.estado.in_(ACTIVE_STATUSES)
+        ),
+        # Cupo diario (MAX_DAILY_RESERVATIONS_PER_USER)
+        "cupo usuario/día": lambda db, rng: db.query(func.count(Reservation.id)).filter(
+            Reservation.usuario_id == rng.randint(1, USERS),
+            Reservation.fecha == day(rng),
+            Reservation.estado.in_(ACTIVE_STATUSES)
+        ),
+        # Reconstrucción de los temporizadores de vencimiento
+        "pendientes con plazo": lambda db, rng: db.query(Reservation.id, Reservation.expires_at).filter(
+            Reservation.estado == ReservationStatus.PENDIENTE,
+            Reservation.expires_at.isnot(None)
+        ),
+    }
+
+
+def explain(db: Session, query: Query) -> str:
+    statement = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+    if db.bind.dialect.name == "sqlite":
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+        return " | ".join(row[3] for row in rows)
+    rows = db.execute(text(f"EXPLAIN {statement}")).mappings().all()
+    return " | ".join(f"type={row['type']} key={row['key']}" for row in rows)
+
+
+def run_queries(engine: Engine, days: int, repeat: int) -> List[Tuple[str, Dict[str, float], str]]:
+    results = []
+    with Session(bind=engine) as db:
+        for name, build in hot_queries(days).items():
+            rng = random.Random(name)
+            # La lista de pendientes trae muchas filas: menos repeticiones
+            times = repeat if name != "pendientes con plazo" else max(3, repeat // 20)
+            stats = measure(lambda: build(db, rng).all(), times)
+            results.append((name, stats, explain(db, build(db, rng))))
+    return results
+
+
+def main() -> None:
+    arguments = parser("Consultas frecuentes de reservas con y sin índices compuestos")
+    arguments.add_argument("--rows", type=int, default=1_000_000)
+    arguments.add_argument("--repeat", type=int, default=200)
+    args = arguments.parse_args()
+
+    engine = bench_engine(args.database_url)
+    seconds = load(engine, args.rows)
+    days = -(-args.rows // (ROOMS * len(HOURS)))
+    print(f"{args.rows} reservas cargadas en {seconds:.1f} s ({engine.dialect.name})")
+
+    with_indexes = run_queries(engine, days, args.repeat)
+    for index in Reservation.__table__.indexes:
+        if index.name in COMPOSITE_INDEXES:
+            index.drop(engine)
+    # Conexiones nuevas: SQLite guarda los EXPLAIN ya preparados por conexión
+    engine.dispose()
+    without_indexes = run_queries(engine, days, args.repeat)
+
+    print_table(
+        "Latencia por consulta (ms)",
+        ("consulta", "p50 con", "p95 con", "p50 sin", "p95 sin", "mejora p50"),
+        [
+            (
+                name, stats["p50_ms"], stats["p95_ms"], base["p50_ms"], base["p95_ms"],
+                f"{base['p50_ms'] / stats['p50_ms']:.1f}x"
+            )
+            for (name, stats, _), (_, base, _) in zip(with_indexes, without_indexes)
+        ]
+    )
+    print("\nPlanes con los índices compuestos:")
+    for name, _, plan in with_indexes:
+        print(f"  {name}: {plan}")
+    print("\nPlanes sin ellos:")
+    for name, _, plan in without_indexes:
+        print(f"  {name}: {plan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Benchmark del Costo por Petición del Registro de Accesos
+#
+#   python -m benchmarks.bench_logging
+#   python -m benchmarks.bench_logging --requests 50000 --repeat 5
+#
+# Llama directamente (sin servidor HTTP) a una aplicación ASGI mínima, sola
+# y envuelta en AccessLogMiddleware con distintas configuraciones de
+# logging. La diferencia con "sin middleware" es el costo que agrega el
+# registro de accesos a cada petición. La salida va a /dev/null.
+#
+# Las peticiones de prueba duran microsegundos: con la cola, el hilo del
+# listener no alcanza a escribir y se descartan registros ("descartados").
+# Con /dev/null la escritura nunca bloquea; la ventaja de la cola frente al
+# handler síncrono crece cuando stdout es lento (pipe lleno, contenedor).
+
+import asyncio
+import logging
+import os
+import queue
+import statistics
+import time
+from logging.handlers import QueueListener
+
+from benchmarks.common import parser, print_table
+from app.config.settings import settings
+from app.utils.logger import AccessLogMiddleware, ContextQueueHandler, JsonFormatter
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/reservations/availability",
+    "query_string": b"sala_id=1&fecha=2030-01-01",
+    "headers": [(b"host", b"bench"), (b"authorization", b"Bearer x")],
+}
+BODY = b'{"sala_id":1,"fecha":"2030-01-01","horas_libres":[8,9,10,11,12,13,14,15,16,17]}'
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def discard(message) -> None:
+    pass
+
+
+async def drive(app, requests: int) -> float:
+    """Microsegundos por petición"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, discard)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def devnull_handler() -> logging.Handler:
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+class Variant:
+    """Configura el logging raíz para un caso y lo deshace al terminar"""
+
+    def __init__(self, name: str, middleware: bool, mode: str = "off", sample_rate: float = 1.0):
+        self.name = name
+        self.middleware = middleware
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.listener = None
+        self.queue_handler = None
+
+    def __enter__(self):
+        root = logging.getLogger()
+        self._saved = (root.handlers, root.level)
+        if self.mode == "queue":
+            # Como configure_logging: formato y escritura en el hilo del listener
+            self.queue_handler = ContextQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+            self.listener = QueueListener(self.queue_handler.queue, devnull_handler())
+            self.listener.start()
+            root.handlers = [self.queue_handler]
+        elif self.mode == "sync":
+            # Formato y escritura en el hilo de la petición
+            root.handlers = [devnull_handler()]
+        else:
+            root.handlers = [logging.NullHandler()]
+        root.setLevel(logging.INFO if self.mode != "off" else logging.WARNING)
+        return self
+
+    def __exit__(self, *exc):
+        if self.listener is not None:
+            self.listener.stop()
+        root = logging.getLogger()
+        root.handlers, level = self._saved
+        root.setLevel(level)
+
+    def app(self):
+        if not self.middleware:
+            return endpoint
+        return AccessLogMiddleware(endpoint, sample_rate=self.sample_rate)
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped if self.queue_handler is not None else 0
+
+
+VARIANTS = (
+    Variant("sin middleware", middleware=False),
+    Variant("middleware, acceso en WARNING", middleware=True, mode="off"),
+    Variant("middleware + cola (actual)", middleware=True, mode="queue"),
+    Variant("middleware + cola, muestreo 10%", middleware=True, mode="queue", sample_rate=0.1),
+    Variant("middleware + handler síncrono", middleware=True, mode="sync"),
+)
+
+
+def main() -> None:
+    arguments = parser("Costo por petición de AccessLogMiddleware y del handler en cola")
+    arguments.add_argument("--requests", type=int, default=20000, help="Peticiones por repetición")
+    arguments.add_argument("--repeat", type=int, default=5)
+    args = arguments.parse_args()
+
+    rows = []
+    baseline = None
+    for variant in VARIANTS:
+        with variant:
+            app = variant.app()
+            asyncio.run(drive(app, 1000))
+            samples = [asyncio.run(drive(app, args.requests)) for _ in range(args.repeat)]
+        per_request = statistics.median(samples)
+        baseline = per_request if baseline is None else baseline
+        rows.append([
+            variant.name,
+            round(per_request, 2),
+            round(per_request - baseline, 2),
+            int(1_000_000 / per_request),
+            variant.dropped,
+        ])
+
+    print_table(
+        f"{args.requests} peticiones x {args.repeat} (mediana, µs por petición)",
+        ["caso", "µs/petición", "costo agregado µs", "peticiones/s", "descartados"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
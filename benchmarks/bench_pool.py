@@ -0,0 +1,124 @@
+# Benchmark del Pool de Conexiones: latencia de checkout según el pre-ping
+#
+#   python -m benchmarks.bench_pool
+#   python -m benchmarks.bench_pool --threads 32 --pool-size 10 --database-url mysql+pymysql://...
+#
+# Varios hilos piden una conexión, ejecutan una consulta corta y la devuelven,
+# con DB_POOL_PRE_PING en "always", "idle" y "off". Se mide el checkout
+# (incluye el ping y la espera por una conexión libre) y la petición completa.
+# Contra SQLite el ping es casi gratis; el costo real (un viaje de red por
+# checkout) se ve con --database-url apuntando a MySQL.
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from benchmarks.common import bench_engine, parser, print_table, summarize
+from app.config.settings import settings
+from app.utils.pool import InstrumentedQueuePool, install_pool_instrumentation
+
+MODES = ("always", "idle", "off")
+
+
+def run_mode(
+    mode: str,
+    url: Optional[str],
+    threads: int,
+    iterations: int,
+    pool_size: int,
+    max_overflow: int,
+    idle_seconds: float,
+    think_ms: float
+) -> Dict[str, object]:
+    engine = bench_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=mode == "always",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    install_pool_instrumentation(engine, idle_ping_seconds=idle_seconds if mode == "idle" else None)
+
+    checkout_ms: List[float] = []
+    request_ms: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker() -> None:
+        own_checkout, own_request = [], []
+        barrier.wait()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            with engine.connect() as conn:
+                checked_out = time.perf_counter()
+                conn.execute(text("SELECT 1")).scalar()
+            end = time.perf_counter()
+            own_checkout.append((checked_out - start) * 1000)
+            own_request.append((end - start) * 1000)
+            if think_ms:
+                time.sleep(think_ms / 1000)
+        with lock:
+            checkout_ms.extend(own_checkout)
+            request_ms.extend(own_request)
+
+    # Calentar el pool para no medir la apertura de conexiones
+    warm = [engine.connect() for _ in range(min(threads, pool_size))]
+    for conn in warm:
+        conn.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    metrics = engine.pool.metrics.snapshot()
+    engine.dispose()
+    checkout, request = summarize(checkout_ms), summarize(request_ms)
+    return {
+        "mode": mode,
+        "checkout_p50": checkout["p50_ms"],
+        "checkout_p95": checkout["p95_ms"],
+        "request_p50": request["p50_ms"],
+        "request_p95": request["p95_ms"],
+        "throughput": int(len(request_ms) / elapsed),
+        # Con "always" los pings los hace SQLAlchemy y no pasan por las métricas
+        "pings": len(request_ms) if mode == "always" else metrics["pings"],
+        "max_wait": metrics["max_wait_ms"],
+    }
+
+
+def main() -> None:
+    arguments = parser("Latencia de checkout del pool con pre-ping always / idle / off")
+    arguments.add_argument("--threads", type=int, default=16)
+    arguments.add_argument("--iterations", type=int, default=2000, help="Checkouts por hilo")
+    arguments.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    arguments.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    arguments.add_argument("--idle-seconds", type=float, default=settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    arguments.add_argument("--think-ms", type=float, default=0.0, help="Pausa entre peticiones de cada hilo")
+    args = arguments.parse_args()
+
+    rows = []
+    for mode in MODES:
+        result = run_mode(
+            mode, args.database_url, args.threads, args.iterations,
+            args.pool_size, args.max_overflow, args.idle_seconds, args.think_ms
+        )
+        rows.append(list(result.values()))
+
+    print_table(
+        f"{args.threads} hilos, pool {args.pool_size}+{args.max_overflow}, "
+        f"{args.iterations} checkouts por hilo (ms)",
+        ["pre-ping", "checkout p50", "checkout p95", "petición p50", "petición p95",
+         "peticiones/s", "pings", "espera máx"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
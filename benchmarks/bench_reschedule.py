@@ -0,0 +1,156 @@
+# Benchmark de Reprogramaciones Concurrentes
+#
+#   python -m benchmarks.bench_reschedule
+#   python -m benchmarks.bench_reschedule --threads 16 --moves 200 --database-url mysql+pymysql://...
+#
+# Varios hilos mueven reservas de una misma sala entre los bloques de dos
+# días (ReservationService.reschedule_reservation, como el PATCH de la API).
+# Al final verifica que ningún horario quedó con dos reservas activas y que
+# el índice de disponibilidad coincide con la base de datos.
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from datetime import time as dtime, timedelta
+from typing import List
+
+from sqlalchemy import event, func, insert
+
+from benchmarks.common import bench_engine, parser, print_table, summarize
+import app.utils.database as database
+from app.auth.model import User, UserRole
+from app.auth.principal import Principal
+from app.reservations.availability import availability_index, mask_to_hours
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.reservations.schemas import ReservationUpdate
+from app.reservations.service import ReservationService
+from app.rooms.model import Room
+from app.utils.clock import get_clock
+
+HOURS = range(8, 18)
+SALA_ID = 1
+
+
+def seed(engine, reservations: int, days) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": i, "nombre": f"Usuario {i}", "email": f"u{i}@bench.local", "contraseña_hash": "x"}
+            for i in range(1, reservations + 2)
+        ])
+        conn.execute(insert(Room.__table__), [
+            {"id": SALA_ID, "nombre": "Sala 1", "sede": "Centro", "capacidad": 8, "recursos": {}}
+        ])
+        # Un usuario por reserva: el cupo diario no interviene
+        conn.execute(insert(Reservation.__table__), [
+            {
+                "usuario_id": i + 1,
+                "sala_id": SALA_ID,
+                "fecha": days[0],
+                "hora_inicio": dtime(HOURS[i]),
+                "hora_fin": dtime(HOURS[i] + 1),
+                "estado": ReservationStatus.CONFIRMADA,
+            }
+            for i in range(reservations)
+        ])
+
+
+def main() -> None:
+    arguments = parser("Reprogramaciones concurrentes sobre una misma sala")
+    arguments.add_argument("--threads", type=int, default=8)
+    arguments.add_argument("--moves", type=int, default=200, help="Intentos por hilo")
+    arguments.add_argument("--reservations", type=int, default=6, help="Reservas que se mueven (máx. 10)")
+    args = arguments.parse_args()
+
+    engine = bench_engine(args.database_url, pool_size=args.threads, max_overflow=0)
+    if engine.dialect.name == "sqlite":
+        # SQLite serializa las escrituras: esperar el bloqueo en lugar de fallar
+        @event.listens_for(engine, "connect")
+        def _busy_timeout(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA busy_timeout=30000")
+
+    # El servicio y las cachés globales usan SessionLocal
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+
+    today = get_clock().today()
+    days = [today + timedelta(days=3), today + timedelta(days=4)]
+    seed(engine, min(args.reservations, len(HOURS)), days)
+    with database.SessionLocal() as db:
+        ids = [r.id for r in db.query(Reservation.id).order_by(Reservation.id)]
+        # Días cargados en el índice: desde aquí solo cambian por los deltas
+        for fecha in days:
+            availability_index.get_mask(db, SALA_ID, fecha)
+    admin = Principal(0, "admin@bench.local", UserRole.ADMIN, True)
+
+    outcomes: Counter = Counter()
+    latencies: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        loop = asyncio.new_event_loop()
+        own_outcomes: Counter = Counter()
+        own_latencies: List[float] = []
+        barrier.wait()
+        for _ in range(args.moves):
+            update = ReservationUpdate(fecha=rng.choice(days), hora_inicio=dtime(rng.choice(HOURS)))
+            start = time.perf_counter()
+            with database.SessionLocal() as db:
+                try:
+                    loop.run_until_complete(
+                        ReservationService(db).reschedule_reservation(rng.choice(ids), update, admin)
+                    )
+                    own_outcomes["movida"] += 1
+                except Exception as e:
+                    own_outcomes[type(e).__name__] += 1
+            own_latencies.append((time.perf_counter() - start) * 1000)
+        loop.close()
+        with lock:
+            outcomes.update(own_outcomes)
+            latencies.extend(own_latencies)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Invariantes: un horario activo por bloque y el índice igual a la base
+    with database.SessionLocal() as db:
+        duplicated = (
+            db.query(Reservation.fecha, Reservation.hora_inicio)
+            .filter(Reservation.sala_id == SALA_ID, Reservation.estado.in_(ACTIVE_STATUSES))
+            .group_by(Reservation.fecha, Reservation.hora_inicio)
+            .having(func.count() > 1)
+            .all()
+        )
+        index_matches = True
+        for fecha in days:
+            cached = availability_index.peek(SALA_ID, fecha)
+            availability_index.invalidate(SALA_ID, fecha)
+            fresh = availability_index.get_mask(db, SALA_ID, fecha)
+            index_matches &= cached == fresh
+
+    stats = summarize(latencies)
+    print_table(
+        f"{args.threads} hilos x {args.moves} intentos sobre {len(ids)} reservas ({engine.dialect.name})",
+        ["intentos", "reprog./s", "p50 ms", "p95 ms", "media ms"],
+        [[len(latencies), int(len(latencies) / elapsed), stats["p50_ms"], stats["p95_ms"], stats["mean_ms"]]]
+    )
+    print_table("Resultados", ["resultado", "cantidad"], sorted(outcomes.items(), key=lambda item: -item[1]))
+    print(f"\nHorarios con dos reservas activas: {len(duplicated)}")
+    print(f"Índice de disponibilidad igual a la base: {'sí' if index_matches else 'NO'}")
+    for fecha in days:
+        with database.SessionLocal() as db:
+            print(f"  {fecha}: ocupadas {mask_to_hours(availability_index.get_mask(db, SALA_ID, fecha))}")
+    if duplicated or not index_matches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
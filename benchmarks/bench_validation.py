@@ -0,0 +1,95 @@
+# Microbenchmark de Validación de los Esquemas de Entrada
+#
+#   python -m benchmarks.bench_validation
+#   python -m benchmarks.bench_validation --number 20000 --repeat 7
+#
+# Mide ReservationCreate, UserCreate y RoomCreate con cuerpos válidos e
+# inválidos, desde un dict (model_validate, lo que hace FastAPI tras leer
+# el JSON) y desde los bytes (model_validate_json). Cada caso se repite
+# `repeat` veces y se reporta la mediana por operación.
+
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from pydantic import BaseModel, ValidationError
+
+from benchmarks.common import parser, print_table
+from app.auth.schemas import UserCreate
+from app.reservations.schemas import ReservationCreate
+from app.rooms.schemas import RoomCreate
+
+FECHA = (date.today() + timedelta(days=3)).isoformat()
+
+CASES = (
+    (ReservationCreate, "válido", {"sala_id": 12, "fecha": FECHA, "hora_inicio": "10:00", "hora_fin": "11:00"}),
+    (ReservationCreate, "bloque de 2 h", {"sala_id": 12, "fecha": FECHA, "hora_inicio": "10:00", "hora_fin": "12:00"}),
+    (UserCreate, "válido", {"nombre": "juan pérez", "email": "juan.perez@example.com", "password": "Password1"}),
+    (UserCreate, "email inválido", {"nombre": "juan pérez", "email": "juan.perez", "password": "Password1"}),
+    (RoomCreate, "válido", {
+        "nombre": "sala reuniones a", "sede": "campus norte", "capacidad": 8,
+        "recursos": {"proyector": True, "wifi": True, "pizarra": True}
+    }),
+    (RoomCreate, "recurso desconocido", {
+        "nombre": "sala reuniones a", "sede": "campus norte", "capacidad": 8,
+        "recursos": {"jacuzzi": True}
+    }),
+)
+
+
+def per_call_us(fn: Callable[[], object], number: int, repeat: int) -> float:
+    """Mediana (en microsegundos) del costo de una llamada"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1_000_000)
+    return statistics.median(samples)
+
+
+def validator(model: type, method: str, payload):
+    validate = getattr(model, method)
+
+    def call():
+        try:
+            validate(payload)
+        except ValidationError:
+            pass
+
+    return call
+
+
+def main() -> None:
+    arguments = parser("Costo de validar los esquemas de entrada")
+    arguments.add_argument("--number", type=int, default=10000, help="Llamadas por repetición")
+    arguments.add_argument("--repeat", type=int, default=5)
+    args = arguments.parse_args()
+
+    rows = []
+    for model, case, payload in CASES:
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            model.model_validate(payload)
+            valid = "sí"
+        except ValidationError:
+            valid = "no"
+        from_dict = per_call_us(validator(model, "model_validate", payload), args.number, args.repeat)
+        from_json = per_call_us(validator(model, "model_validate_json", body), args.number, args.repeat)
+        rows.append([
+            model.__name__, case, valid,
+            round(from_dict, 2), int(1_000_000 / from_dict),
+            round(from_json, 2), int(1_000_000 / from_json),
+        ])
+
+    print_table(
+        f"Validación ({args.number} llamadas x {args.repeat}, mediana)",
+        ["esquema", "caso", "válido", "dict µs", "dict ops/s", "json µs", "json ops/s"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
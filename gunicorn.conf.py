@@ -0,0 +1,28 @@
+# Configuración de Gunicorn (modo multi-worker)
+#
+# Uso: gunicorn app.main:app -c gunicorn.conf.py
+#
+# Cada worker es un proceso con sus propias cachés en memoria; las
+# invalidaciones viajan entre ellos por sockets UNIX (INVALIDATION_BACKEND=unix).
+
+import multiprocessing
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8443')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers asíncronos: uno por núcleo es suficiente
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Los workers deben usar el bus entre procesos
+os.environ.setdefault("INVALIDATION_BACKEND", "unix")
+
+graceful_timeout = 30
+keepalive = 5
+
+
+def on_starting(server):
+    # Eliminar sockets de una ejecución anterior
+    directory = os.environ.get("INVALIDATION_SOCKET_DIR", "/tmp/coworking-invalidation")
+    shutil.rmtree(directory, ignore_errors=True)
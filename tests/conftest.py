@@ -0,0 +1,106 @@
+# Configuración de las Pruebas (SQLite en memoria en lugar de MySQL)
+
+import os
+import tempfile
+
+# Antes de importar la aplicación: sin hilos de fondo ni límites por IP
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("LOG_ACCESS_ENABLED", "false")
+os.environ.setdefault("OUTBOX_ENABLED", "false")
+os.environ.setdefault("RESERVATION_EXPIRY_ENABLED", "false")
+os.environ.setdefault("PROFILER_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+import app.utils.database as database
+
+
+def make_engine(path: str = None):
+    """
+    Base SQLite con claves foráneas. Sin `path` es en memoria (una conexión
+    compartida); con `path` cada sesión tiene su propia conexión, como en
+    MySQL, y cerrar una sesión no deshace el trabajo de otra.
+    """
+    if path is None:
+        new_engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        new_engine = create_engine(
+            f"sqlite:///{path}",
+            connect_args={"check_same_thread": False}
+        )
+
+    @event.listens_for(new_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    return new_engine
+
+
+engine = make_engine(os.path.join(tempfile.mkdtemp(prefix="gestor-reservas-"), "test.db"))
+database.engine = engine
+database.SessionLocal.configure(bind=engine)
+
+from app.main import app as fastapi_app  # noqa: E402
+from app.utils.database import Base  # noqa: E402
+import app.auth.model  # noqa: E402,F401
+import app.rooms.model  # noqa: E402,F401
+import app.reservations.model  # noqa: E402,F401
+import app.events.model  # noqa: E402,F401
+
+
+@pytest.fixture(autouse=True)
+def _fresh_database():
+    from app.auth.principal import principal_cache
+
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+    # Los ids se repiten en la siguiente prueba: un rol en caché no debe pasar
+    principal_cache.clear()
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(fastapi_app) as test_client:
+        yield test_client
+
+
+def make_user(client, email="ana@example.com", admin=False) -> dict:
+    """Registra un usuario y retorna los headers con su token"""
+    from app.auth.model import User, UserRole
+    from app.auth.principal import principal_cache
+
+    response = client.post(
+        "/auth/register",
+        json={"nombre": "Ana", "email": email, "password": "Password1"}
+    )
+    assert response.status_code == 201, response.text
+    if admin:
+        session = database.SessionLocal()
+        user = session.query(User).filter_by(email=email).one()
+        user.rol = UserRole.ADMIN
+        session.commit()
+        principal_cache.invalidate(user.id)
+        session.close()
+
+    response = client.post("/auth/login", json={"email": email, "password": "Password1"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
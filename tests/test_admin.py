@@ -0,0 +1,88 @@
+# Pruebas de los Endpoints de Administración (profiler)
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.main import app as fastapi_app
+from app.utils.profiler import PROFILE_ID_HEADER, ProfilingMiddleware
+from tests.conftest import make_user
+
+
+@pytest.fixture
+def profiler_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+
+
+@pytest.fixture
+def profiled_client():
+    # Las pruebas arrancan con PROFILER_ENABLED=false: sin el middleware en la app
+    with TestClient(ProfilingMiddleware(fastapi_app, interval=0.001)) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/admin/profile?seconds=0.1"),
+    ("get", "/admin/profiles"),
+    ("get", "/admin/profiles/abc"),
+])
+def test_non_admins_are_forbidden(client, profiler_enabled, method, path):
+    headers = make_user(client)
+    assert getattr(client, method)(path, headers=headers).status_code == 403
+
+
+def test_worker_profile_returns_a_json_summary(client, profiler_enabled):
+    admin = make_user(client, "admin@example.com", admin=True)
+    response = client.post("/admin/profile", params={"seconds": 0.1, "format": "json"}, headers=admin)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    # El worker está ocioso: las pilas en espera cuentan aparte
+    assert summary["samples"] + summary["idle_samples"] > 0
+    assert summary["duration_seconds"] >= 0.1
+
+
+def test_concurrent_worker_profile_is_busy(client, profiler_enabled):
+    admin = make_user(client, "admin@example.com", admin=True)
+    first = {}
+
+    def long_profile():
+        first["response"] = client.post("/admin/profile", params={"seconds": 0.5}, headers=admin)
+
+    thread = threading.Thread(target=long_profile)
+    thread.start()
+    time.sleep(0.2)
+    busy = client.post("/admin/profile", params={"seconds": 0.1}, headers=admin)
+    thread.join()
+
+    assert busy.status_code == 409
+    assert busy.json()["detail"] == "Ya hay un perfil en curso en este worker"
+    assert busy.headers["retry-after"] == "5"
+    assert first["response"].status_code == 200
+    # Al terminar el primero el perfilador queda libre
+    assert client.post("/admin/profile", params={"seconds": 0.1}, headers=admin).status_code == 200
+
+
+def test_x_profile_round_trip(profiled_client):
+    admin = make_user(profiled_client, "admin@example.com", admin=True)
+
+    response = profiled_client.get("/rooms/", headers={**admin, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    listed = profiled_client.get("/admin/profiles", headers=admin).json()
+    assert any(profile["id"] == profile_id and profile["path"] == "/rooms/" for profile in listed)
+
+    detail = profiled_client.get(f"/admin/profiles/{profile_id}", params={"format": "json"}, headers=admin)
+    assert detail.status_code == 200, detail.text
+    assert "samples" in detail.json()
+    assert profiled_client.get("/admin/profiles/desconocido", headers=admin).status_code == 404
+
+
+def test_x_profile_is_ignored_for_non_admins(profiled_client):
+    headers = make_user(profiled_client)
+    response = profiled_client.get("/rooms/", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert PROFILE_ID_HEADER not in response.headers
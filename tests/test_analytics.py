@@ -0,0 +1,116 @@
+# Pruebas de los Reportes de Ocupación (NumPy frente a agregados SQL)
+
+import random
+from datetime import date, time, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.auth.model import User
+from app.reports.analytics import HOURS, SLOTS, load_occupancy
+from app.reservations.availability import OPENING_HOUR
+from app.reservations.model import Reservation, ReservationStatus, ACTIVE_STATUSES
+from app.rooms.model import Room
+from app.rooms.schemas import RoomResponse
+from tests.conftest import engine
+
+START, END = date(2030, 1, 20), date(2030, 2, 28)
+
+
+@pytest.fixture
+def session():
+    rng = random.Random(42)
+    with Session(bind=engine) as db:
+        db.add(User(id=1, nombre="Ana", email="ana@example.com", contraseña_hash="x"))
+        db.add_all([
+            Room(id=1, nombre="Sala A", sede="Centro", capacidad=4, recursos={}),
+            Room(id=2, nombre="Sala B", sede="Centro", capacidad=6, recursos={}),
+            Room(id=3, nombre="Sala C", sede="Norte", capacidad=8, recursos={}, is_active=False),
+            Room(id=4, nombre="Sala D", sede="Norte", capacidad=8, recursos={}),
+        ])
+        # Días antes y después del rango: no deben contar
+        for offset in range(-5, (END - START).days + 6):
+            fecha = START + timedelta(days=offset)
+            for sala_id in (1, 2, 3):
+                for hour in rng.sample(HOURS, rng.randint(0, 6)):
+                    db.add(Reservation(
+                        usuario_id=1, sala_id=sala_id, fecha=fecha,
+                        hora_inicio=time(hour), hora_fin=time(hour + 1),
+                        estado=rng.choice(list(ReservationStatus))
+                    ))
+        db.commit()
+        rooms = [RoomResponse.model_validate(room) for room in db.query(Room).order_by(Room.id)]
+        yield db, rooms
+
+
+def _active_in_range(query):
+    return query.filter(
+        Reservation.fecha.between(START, END),
+        Reservation.estado.in_(ACTIVE_STATUSES)
+    )
+
+
+def test_hours_per_room_and_slot_match_sql(session):
+    db, rooms = session
+    matrix = load_occupancy(db, rooms, START, END)
+
+    per_room = dict(_active_in_range(
+        db.query(Reservation.sala_id, func.count()).group_by(Reservation.sala_id)
+    ).all())
+    assert matrix.hours_per_room().tolist() == [per_room.get(room.id, 0) for room in rooms]
+
+    per_hour = {
+        hora.hour: count for hora, count in _active_in_range(
+            db.query(Reservation.hora_inicio, func.count()).group_by(Reservation.hora_inicio)
+        ).all()
+    }
+    assert matrix.hours_per_slot().tolist() == [per_hour.get(hour, 0) for hour in HOURS]
+
+    total = _active_in_range(db.query(func.count(Reservation.id))).scalar()
+    days = (END - START).days + 1
+    assert matrix.overall_utilization() == pytest.approx(total / (len(rooms) * days * SLOTS))
+
+
+def test_top_rooms_match_sql_order(session):
+    db, rooms = session
+    matrix = load_occupancy(db, rooms, START, END)
+
+    ranking = _active_in_range(
+        db.query(Reservation.sala_id, func.count().label("horas"))
+    ).group_by(Reservation.sala_id).order_by(func.count().desc(), Reservation.sala_id).limit(2).all()
+    assert [rooms[i].id for i in matrix.top_rooms(2)] == [sala_id for sala_id, _ in ranking]
+
+
+def test_heatmap_and_sede_months_match_sql(session):
+    db, rooms = session
+    matrix = load_occupancy(db, rooms, START, END)
+    rows = _active_in_range(
+        db.query(Reservation.sala_id, Reservation.fecha, Reservation.hora_inicio)
+    ).all()
+
+    # Día de la semana x hora, sobre la capacidad de cada día de la semana
+    used = np.zeros((7, SLOTS))
+    for _, fecha, hora in rows:
+        used[fecha.weekday(), hora.hour - OPENING_HOUR] += 1
+    days_per_weekday = np.zeros(7)
+    for offset in range((END - START).days + 1):
+        days_per_weekday[(START + timedelta(days=offset)).weekday()] += 1
+    np.testing.assert_allclose(matrix.weekday_heatmap(), used / (days_per_weekday[:, None] * len(rooms)))
+
+    # Sede x mes
+    sede_of = {room.id: room.sede for room in rooms}
+    rooms_per_sede = {sede: sum(1 for room in rooms if room.sede == sede) for sede in sede_of.values()}
+    counts = {}
+    for sala_id, fecha, _ in rows:
+        key = (sede_of[sala_id], fecha.month)
+        counts[key] = counts.get(key, 0) + 1
+    days_in_month = {1: (date(2030, 1, 31) - START).days + 1, 2: 28}
+
+    sedes, months, utilization = matrix.sede_monthly_utilization()
+    assert (sedes, months) == (["Centro", "Norte"], [date(2030, 1, 1), date(2030, 2, 1)])
+    for i, sede in enumerate(sedes):
+        for j, month in enumerate(months):
+            capacity = rooms_per_sede[sede] * days_in_month[month.month] * SLOTS
+            assert utilization[i, j] == pytest.approx(counts.get((sede, month.month), 0) / capacity)
@@ -0,0 +1,182 @@
+# Pruebas del Índice de Disponibilidad y de la Reprogramación
+
+from datetime import date, time, timedelta
+
+import pytest
+
+import app.utils.database as database
+from app.reservations.availability import (
+    AvailabilityIndex, FULL_MASK, availability_index, hour_bit, mask_to_hours
+)
+from app.reservations.model import Reservation, ReservationStatus
+from app.utils.clock import get_clock
+from tests.conftest import make_user
+
+DAY = date(2030, 3, 4)
+
+
+@pytest.fixture(autouse=True)
+def _empty_index():
+    # El índice global sobrevive entre pruebas; las bases no
+    availability_index.clear()
+    yield
+    availability_index.clear()
+
+
+def _add(db, sala_id: int, hour: int, estado=ReservationStatus.CONFIRMADA, fecha=DAY) -> Reservation:
+    reservation = Reservation(
+        usuario_id=1, sala_id=sala_id, fecha=fecha,
+        hora_inicio=time(hour), hora_fin=time(hour + 1), estado=estado
+    )
+    db.add(reservation)
+    db.commit()
+    return reservation
+
+
+@pytest.fixture
+def sala(db):
+    from app.auth.model import User
+    from app.rooms.model import Room
+
+    db.add(User(id=1, nombre="Ana", email="ana@example.com", contraseña_hash="x"))
+    db.add(Room(id=1, nombre="Sala Norte", sede="Centro", capacidad=6))
+    db.commit()
+    return 1
+
+
+def test_mask_bits():
+    assert hour_bit(time(8)) == 1
+    assert hour_bit(time(17)) == 1 << 9
+    assert mask_to_hours(hour_bit(time(9)) | hour_bit(time(15))) == [9, 15]
+    assert mask_to_hours(FULL_MASK) == list(range(8, 18))
+
+
+def test_mask_counts_only_active_reservations(db, sala):
+    _add(db, sala, 9)
+    _add(db, sala, 10, ReservationStatus.PENDIENTE)
+    _add(db, sala, 11, ReservationStatus.CANCELADA)
+
+    index = AvailabilityIndex()
+    assert mask_to_hours(index.get_mask(db, sala, DAY)) == [9, 10]
+    assert 11 in index.free_hours(db, sala, DAY)
+
+
+def test_deltas_update_a_loaded_day_without_queries(db, sala):
+    index = AvailabilityIndex()
+    index.get_mask(db, sala, DAY)
+    # Cambio en la base que el índice no ve: solo cuenta el delta publicado
+    _add(db, sala, 12)
+    index.apply(sala, DAY, occupied=hour_bit(time(14)))
+    assert mask_to_hours(index.peek(sala, DAY)) == [14]
+
+    index._on_message(f"{sala}:{DAY}:{hour_bit(time(15))}:{hour_bit(time(14))}")
+    assert mask_to_hours(index.peek(sala, DAY)) == [15]
+
+    # Un delta para un día no cargado no crea la entrada
+    index.apply(sala, DAY + timedelta(days=1), occupied=1)
+    assert index.peek(sala, DAY + timedelta(days=1)) is None
+
+
+def test_load_that_overlaps_a_change_is_not_stored(db, sala, monkeypatch):
+    index = AvailabilityIndex()
+    query = db.query
+
+    def query_then_change(*args):
+        # Llega un cambio mientras la carga consulta la base
+        index.apply(sala, DAY, occupied=1)
+        return query(*args)
+
+    monkeypatch.setattr(db, "query", query_then_change)
+    index.get_mask(db, sala, DAY)
+    assert index.peek(sala, DAY) is None
+
+
+def test_oldest_day_is_evicted(db, sala):
+    index = AvailabilityIndex(max_entries=2)
+    for offset in range(3):
+        index.get_mask(db, sala, DAY + timedelta(days=offset))
+
+    assert index.peek(sala, DAY) is None
+    assert index.peek(sala, DAY + timedelta(days=2)) == 0
+
+
+def test_loaded_day_expires_after_ttl(db, sala, monkeypatch):
+    import app.reservations.availability as availability
+
+    now = [1000.0]
+    monkeypatch.setattr(availability, "monotonic", lambda: now[0])
+    index = AvailabilityIndex(ttl_seconds=60)
+    index.get_mask(db, sala, DAY)
+
+    now[0] += 61
+    assert index.peek(sala, DAY) is None
+
+
+# Reprogramación por la API -->
+
+def _slot(days=3, hour=10) -> dict:
+    fecha = get_clock().today() + timedelta(days=days)
+    return {"fecha": fecha.isoformat(), "hora_inicio": f"{hour:02d}:00", "hora_fin": f"{hour + 1:02d}:00"}
+
+
+@pytest.fixture
+def room_id(client):
+    admin = make_user(client, "admin@example.com", admin=True)
+    response = client.post(
+        "/rooms/",
+        json={"nombre": "Sala Norte", "sede": "Centro", "capacidad": 6},
+        headers=admin
+    )
+    return response.json()["id"]
+
+
+def _free_hours(client, headers, room_id, days=3):
+    response = client.get(
+        "/reservations/availability",
+        params={"sala_id": room_id, "fecha": _slot(days)["fecha"]},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["horas_libres"]
+
+
+def test_reschedule_moves_the_slot_in_the_index(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    reservation = client.post(
+        "/reservations/", json={"sala_id": room_id, **_slot(hour=10)}, headers=ana
+    ).json()
+    assert 10 not in _free_hours(client, ana, room_id)
+
+    response = client.patch(f"/reservations/{reservation['id']}", json=_slot(hour=15), headers=ana)
+    assert response.status_code == 200, response.text
+
+    free = _free_hours(client, ana, room_id)
+    assert 10 in free and 15 not in free
+
+
+def test_reschedule_to_another_day_frees_the_old_one(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    reservation = client.post(
+        "/reservations/", json={"sala_id": room_id, **_slot(hour=10)}, headers=ana
+    ).json()
+    _free_hours(client, ana, room_id, days=4)
+
+    response = client.patch(f"/reservations/{reservation['id']}", json=_slot(days=4, hour=10), headers=ana)
+    assert response.status_code == 200, response.text
+
+    assert 10 in _free_hours(client, ana, room_id, days=3)
+    assert 10 not in _free_hours(client, ana, room_id, days=4)
+
+
+def test_reschedule_into_taken_slot_keeps_the_current_one(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = make_user(client, "luis@example.com")
+    moving = client.post("/reservations/", json={"sala_id": room_id, **_slot(hour=10)}, headers=ana).json()
+    client.post("/reservations/", json={"sala_id": room_id, **_slot(hour=11)}, headers=luis)
+
+    response = client.patch(f"/reservations/{moving['id']}", json=_slot(hour=11), headers=ana)
+    assert response.status_code == 409
+
+    with database.SessionLocal() as session:
+        assert session.get(Reservation, moving["id"]).hora_inicio == time(10)
+    assert 10 not in _free_hours(client, ana, room_id)
@@ -0,0 +1,104 @@
+# Pruebas de las Operaciones Masivas sobre Usuarios (Admin)
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+import app.utils.database as database
+from app.auth.model import User, UserRole
+from app.auth.schemas import BulkUserSelection
+from app.auth.service import UserService
+from app.config.settings import settings
+from tests.conftest import engine, make_user
+
+EMAILS = ("ana@empresa.com", "luis@empresa.com", "eva@otra.com")
+
+
+@pytest.fixture
+def admin(client):
+    return make_user(client, "admin@example.com", admin=True)
+
+
+@pytest.fixture
+def users(client, admin):
+    for email in EMAILS:
+        make_user(client, email)
+    with database.SessionLocal() as session:
+        return {email: session.query(User.id).filter_by(email=email).scalar() for email in EMAILS}
+
+
+def _state(email: str):
+    with database.SessionLocal() as session:
+        user = session.query(User).filter_by(email=email).first()
+        return None if user is None else (user.is_active, user.rol)
+
+
+def test_result_counts_matched_and_affected_separately(client, admin, users):
+    ana, luis = users["ana@empresa.com"], users["luis@empresa.com"]
+    client.patch(f"/auth/users/{luis}/deactivate", headers=admin)
+
+    # 999 no existe y Luis ya estaba inactivo
+    response = client.post("/auth/users/bulk/deactivate", headers=admin, json={"ids": [luis, 999, ana]})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"matched": 2, "affected": 1, "ids": [ana, luis]}
+    assert _state("ana@empresa.com") == (False, UserRole.USER)
+    assert _state("eva@otra.com") == (True, UserRole.USER)
+
+
+def test_filter_narrows_the_selection(client, admin, users):
+    response = client.post("/auth/users/bulk/role", headers=admin, json={
+        "filter": {"email_domain": "@EMPRESA.com"}, "rol": "admin"
+    })
+    assert response.json() == {
+        "matched": 2, "affected": 2, "ids": sorted([users["ana@empresa.com"], users["luis@empresa.com"]])
+    }
+
+    # Con ids y filtro, solo los ids que además cumplen el filtro
+    response = client.post("/auth/users/bulk/activate", headers=admin, json={
+        "ids": [users["ana@empresa.com"], users["eva@otra.com"]], "filter": {"is_active": False}
+    })
+    assert response.json() == {"matched": 0, "affected": 0, "ids": []}
+
+
+def test_delete_returns_the_deleted_ids(client, admin, users):
+    response = client.post("/auth/users/bulk/delete", headers=admin, json={"filter": {"email_domain": "otra.com"}})
+    assert response.json() == {"matched": 1, "affected": 1, "ids": [users["eva@otra.com"]]}
+    assert _state("eva@otra.com") is None
+    assert _state("ana@empresa.com") is not None
+
+
+def test_invalid_selections_are_rejected(client, admin, users, monkeypatch):
+    assert client.post("/auth/users/bulk/delete", headers=admin, json={}).status_code == 422
+
+    with database.SessionLocal() as session:
+        admin_id = session.query(User.id).filter_by(email="admin@example.com").scalar()
+    own = client.post("/auth/users/bulk/deactivate", headers=admin, json={"ids": [admin_id]})
+    assert own.status_code == 400
+
+    monkeypatch.setattr(settings, "MAX_BULK_USER_OPERATIONS", 2)
+    too_many = client.post("/auth/users/bulk/deactivate", headers=admin, json={"filter": {"is_active": True}})
+    assert too_many.status_code == 400
+    assert all(_state(email)[0] for email in EMAILS)
+
+
+def test_failure_inside_a_batch_changes_nobody(users):
+    # Un usuario de la selección hace fallar la sentencia a mitad de camino
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER no_borrar_eva BEFORE DELETE ON users "
+            "WHEN OLD.email = 'eva@otra.com' BEGIN SELECT RAISE(ABORT, 'bloqueado'); END"
+        ))
+    try:
+        with database.SessionLocal() as session:
+            selection = BulkUserSelection(ids=list(users.values()))
+            with pytest.raises(IntegrityError):
+                asyncio.run(UserService(session).bulk_delete_users(selection, admin_id=0))
+            session.rollback()
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TRIGGER no_borrar_eva"))
+
+    # Una sola sentencia: no quedan borrados a medias
+    assert all(_state(email) is not None for email in EMAILS)
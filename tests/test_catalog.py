@@ -0,0 +1,68 @@
+# Pruebas del Catálogo de Salas en Memoria
+
+import asyncio
+import threading
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.rooms.catalog import RoomCatalog
+from app.rooms.model import Room
+from app.rooms.service import RoomService
+from app.utils.database import Base
+from tests.conftest import engine, make_engine
+
+
+def _add_room(bind, nombre: str) -> None:
+    with Session(bind=bind) as session:
+        session.add(Room(nombre=nombre, sede="Centro", capacidad=4, recursos={}))
+        session.commit()
+
+
+def test_snapshot_is_rebuilt_after_bump():
+    catalog = RoomCatalog(sessionmaker(bind=engine))
+    _add_room(engine, "Sala A")
+    first = catalog.get_snapshot()
+    assert catalog.get_snapshot() is first
+
+    _add_room(engine, "Sala B")
+    catalog.bump()
+    second = catalog.get_snapshot()
+    assert [room.nombre for room in second.rooms] == ["Sala A", "Sala B"]
+    assert second.version == catalog.version
+
+
+def test_snapshot_ignores_lagging_replica():
+    replica = make_engine()
+    Base.metadata.create_all(replica)
+    _add_room(engine, "Sala A")
+
+    # Una lectura servida por la réplica (vacía) no define el catálogo
+    catalog = RoomCatalog(sessionmaker(bind=engine))
+    with Session(bind=replica) as replica_db:
+        assert replica_db.query(Room).count() == 0
+        assert [room.nombre for room in catalog.get_snapshot().rooms] == ["Sala A"]
+    replica.dispose()
+
+
+def test_service_rebuilds_off_the_event_loop_once(monkeypatch):
+    catalog = RoomCatalog(sessionmaker(bind=engine))
+    monkeypatch.setattr("app.rooms.service.room_catalog", catalog)
+    _add_room(engine, "Sala A")
+    build, threads = catalog.get_snapshot, []
+
+    def recording_build():
+        threads.append(threading.get_ident())
+        return build()
+
+    catalog.get_snapshot = recording_build
+
+    async def scenario():
+        return await asyncio.gather(*(RoomService().get_catalog() for _ in range(5)))
+
+    snapshots = asyncio.run(scenario())
+    assert len({id(snapshot) for snapshot in snapshots}) == 1
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    # Con el snapshot vigente no se sale del event loop
+    assert asyncio.run(RoomService().get_catalog()) is snapshots[0]
+    assert len(threads) == 1
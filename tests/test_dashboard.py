@@ -0,0 +1,49 @@
+# Pruebas de la Caché de Dashboards
+
+from datetime import date
+
+from app.reservations.dashboard import DashboardCache
+
+TODAY = date(2030, 6, 10)
+
+
+def test_build_that_raced_an_invalidation_is_not_stored():
+    cache = DashboardCache(ttl_seconds=60)
+    generation = cache.generation(1)
+    stale = object()
+    # La reserva cambia mientras se construye el dashboard
+    cache.invalidate(1)
+    cache.set(1, TODAY, stale, generation)
+    assert cache.get(1, TODAY) is None
+
+    fresh = object()
+    cache.set(1, TODAY, fresh, cache.generation(1))
+    assert cache.get(1, TODAY) is fresh
+
+
+def test_invalidation_of_another_user_does_not_discard():
+    cache = DashboardCache(ttl_seconds=60)
+    generation = cache.generation(1)
+    cache.invalidate(2)
+    dashboard = object()
+    cache.set(1, TODAY, dashboard, generation)
+    assert cache.get(1, TODAY) is dashboard
+
+
+def test_clear_discards_every_build_in_progress():
+    cache = DashboardCache(ttl_seconds=60)
+    generations = {user_id: cache.generation(user_id) for user_id in (1, 2)}
+    cache.clear()
+    for user_id, generation in generations.items():
+        cache.set(user_id, TODAY, object(), generation)
+        assert cache.get(user_id, TODAY) is None
+
+
+def test_generation_counters_stay_bounded():
+    cache = DashboardCache(ttl_seconds=60, max_entries=3)
+    generation = cache.generation(1)
+    for user_id in range(10):
+        cache.invalidate(user_id)
+    assert len(cache._user_generations) <= 3
+    cache.set(1, TODAY, object(), generation)
+    assert cache.get(1, TODAY) is None
@@ -0,0 +1,80 @@
+# Pruebas del Vencimiento de Reservas Pendientes
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.auth.model import User
+from app.reservations.expiry import ReservationExpiry
+from app.reservations.model import Reservation, ReservationStatus
+from app.rooms.model import Room
+from app.utils.clock import FixedClock, get_clock, set_clock
+from tests.conftest import engine
+
+NOW = datetime(2030, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def clock():
+    previous = get_clock()
+    fixed = FixedClock(NOW)
+    set_clock(fixed)
+    yield fixed
+    set_clock(previous)
+
+
+@pytest.fixture
+def session():
+    with Session(bind=engine) as db:
+        db.add(User(id=1, nombre="Ana", email="ana@example.com", contraseña_hash="x"))
+        db.add(Room(id=1, nombre="Sala A", sede="Centro", capacidad=4, recursos={}))
+        db.commit()
+        yield db
+
+
+def _pending(db: Session, hour: int, expires_at=None) -> int:
+    reservation = Reservation(
+        usuario_id=1, sala_id=1, fecha=date(2030, 6, 12),
+        hora_inicio=time(hour), hora_fin=time(hour + 1),
+        estado=ReservationStatus.PENDIENTE, expires_at=expires_at
+    )
+    db.add(reservation)
+    db.commit()
+    return reservation.id
+
+
+def _estado(db: Session, reservation_id: int):
+    db.expire_all()
+    return db.get(Reservation, reservation_id)
+
+
+def test_legacy_pending_untouched_without_confirmation(session, clock):
+    legacy = _pending(session, 9)
+    timed = _pending(session, 10, expires_at=NOW + timedelta(minutes=5))
+    expiry = ReservationExpiry(sessionmaker(bind=engine), requires_confirmation=False)
+
+    assert asyncio.run(expiry.rebuild()) == 1
+    clock.advance(hours=1)
+    released, _ = expiry.expire(session, [legacy, timed])
+
+    assert len(released) == 1
+    assert _estado(session, legacy).estado == ReservationStatus.PENDIENTE
+    assert _estado(session, legacy).expires_at is None
+    assert _estado(session, timed).estado == ReservationStatus.EXPIRADA
+
+
+def test_legacy_pending_gets_a_deadline_with_confirmation(session, clock):
+    legacy = _pending(session, 9)
+    expiry = ReservationExpiry(sessionmaker(bind=engine), requires_confirmation=True)
+
+    assert asyncio.run(expiry.rebuild()) == 1
+    assert _estado(session, legacy).expires_at is not None
+
+    # El plazo cuenta desde el arranque, no desde la creación
+    released, not_yet = expiry.expire(session, [legacy])
+    assert released == [] and legacy in not_yet
+    clock.advance(hours=1)
+    expiry.expire(session, [legacy])
+    assert _estado(session, legacy).estado == ReservationStatus.EXPIRADA
@@ -0,0 +1,61 @@
+# Pruebas de los Árboles de Fenwick y de las Horas por Usuario
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.reports.user_hours import FIRST_DAY, LAST_DAY, UserHours
+from app.utils.fenwick import FenwickTree, SparseFenwickTree
+
+
+@pytest.mark.parametrize("tree_class", [FenwickTree, SparseFenwickTree])
+def test_sums_match_a_plain_list(tree_class):
+    rng = random.Random(43)
+    size = 257
+    tree, values = tree_class(size), [0] * (size + 1)
+    for _ in range(2000):
+        index, delta = rng.randint(1, size), rng.randint(-5, 5)
+        tree.add(index, delta)
+        values[index] += delta
+
+        start, end = sorted(rng.randint(1, size) for _ in range(2))
+        assert tree.range_sum(start, end) == sum(values[start:end + 1])
+    assert tree.prefix(size + 10) == sum(values)
+    assert tree.range_sum(5, 4) == 0
+
+
+def test_sparse_tree_drops_positions_that_return_to_zero():
+    tree = SparseFenwickTree(1 << 20)
+    tree.add(1000, 3)
+    tree.add(1000, -3)
+    assert tree._tree == {}
+    assert tree.prefix(1 << 20) == 0
+
+
+def test_user_hours_ranges_across_months_and_years():
+    rng = random.Random(26)
+    hours, by_day = UserHours(), {}
+    base = date(2029, 11, 15)
+    for _ in range(500):
+        fecha = base + timedelta(days=rng.randint(0, 500))
+        delta = rng.choice((1, 1, 2, -1))
+        hours.add(fecha, delta)
+        by_day[fecha] = by_day.get(fecha, 0) + delta
+
+    for _ in range(300):
+        start = base + timedelta(days=rng.randint(-30, 530))
+        end = start + timedelta(days=rng.randint(0, 400))
+        expected = sum(value for fecha, value in by_day.items() if start <= fecha <= end)
+        assert hours.range_sum(start, end) == expected
+    assert hours.total() == sum(by_day.values())
+
+
+def test_user_hours_clamps_to_the_indexed_range():
+    hours = UserHours()
+    hours.add(FIRST_DAY, 1)
+    hours.add(LAST_DAY, 2)
+
+    assert hours.range_sum(date(1990, 1, 1), date(2100, 1, 1)) == 1
+    assert hours.range_sum(date(1990, 1, 1), date(9999, 12, 31)) == 3
+    assert hours.range_sum(date(2030, 2, 1), date(2030, 1, 1)) == 0
@@ -0,0 +1,21 @@
+# Pruebas de los Endpoints de Salud
+
+import pytest
+
+from tests.conftest import make_user
+
+DIAGNOSTICS = (
+    "/health/db", "/health/outbox", "/health/expiry", "/health/logging",
+    "/health/tracing", "/health/invalidation", "/health/singleflight"
+)
+
+
+def test_health_is_public(client):
+    assert client.get("/health").json()["status"] == "healthy"
+
+
+@pytest.mark.parametrize("path", DIAGNOSTICS)
+def test_diagnostics_require_admin(client, path):
+    assert client.get(path).status_code in (401, 403)
+    assert client.get(path, headers=make_user(client, "ana@example.com")).status_code == 403
+    assert client.get(path, headers=make_user(client, "admin@example.com", admin=True)).status_code == 200
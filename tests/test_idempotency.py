@@ -0,0 +1,210 @@
+# Pruebas de las Peticiones Idempotentes (Idempotency-Key)
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+import app.utils.database as database
+from app.config.settings import settings
+from app.reservations.model import Reservation
+from app.utils.clock import get_clock
+from app.utils.exceptions import IdempotencyRequestInProgressException
+from app.utils.idempotency import (
+    REPLAYED_HEADER, IdempotencyManager, InMemoryIdempotencyBackend, StoredResponse,
+    get_idempotency_backend
+)
+from tests.conftest import make_user
+
+
+@pytest.fixture(autouse=True)
+def _empty_backend():
+    # Los ids de usuario se repiten entre pruebas: sin limpiar, una clave
+    # de otra prueba se repetiría
+    get_idempotency_backend().clear()
+    yield
+    get_idempotency_backend().clear()
+
+
+@pytest.fixture
+def room_id(client):
+    admin = make_user(client, "admin@example.com", admin=True)
+    response = client.post(
+        "/rooms/",
+        json={"nombre": "Sala Norte", "sede": "Centro", "capacidad": 6},
+        headers=admin
+    )
+    return response.json()["id"]
+
+
+def _booking(room_id, hour=10) -> dict:
+    fecha = get_clock().today() + timedelta(days=3)
+    return {"sala_id": room_id, "fecha": fecha.isoformat(), "hora_inicio": f"{hour}:00", "hora_fin": f"{hour + 1}:00"}
+
+
+def _count_reservations() -> int:
+    with database.SessionLocal() as session:
+        return session.query(Reservation).count()
+
+
+def test_retry_replays_the_first_response(client, room_id):
+    headers = {**make_user(client), "Idempotency-Key": "reserva-1"}
+
+    first = client.post("/reservations/", json=_booking(room_id), headers=headers)
+    retry = client.post("/reservations/", json=_booking(room_id), headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert _count_reservations() == 1
+
+
+def test_same_key_with_another_body_is_rejected(client, room_id):
+    headers = {**make_user(client), "Idempotency-Key": "reserva-1"}
+
+    client.post("/reservations/", json=_booking(room_id, hour=10), headers=headers)
+    response = client.post("/reservations/", json=_booking(room_id, hour=11), headers=headers)
+
+    assert response.status_code == 422
+    assert _count_reservations() == 1
+
+
+def test_client_errors_are_not_replayed(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = {**make_user(client, "luis@example.com"), "Idempotency-Key": "reserva-1"}
+    taken = client.post("/reservations/", json=_booking(room_id), headers=ana)
+
+    first = client.post("/reservations/", json=_booking(room_id), headers=luis)
+    client.patch(f"/reservations/{taken.json()['id']}/cancel", headers=ana)
+    retry = client.post("/reservations/", json=_booking(room_id), headers=luis)
+
+    assert (first.status_code, retry.status_code) == (409, 201)
+    assert REPLAYED_HEADER not in retry.headers
+
+
+def test_login_response_is_never_stored(client):
+    make_user(client)
+    headers = {"Idempotency-Key": "login-1"}
+    credentials = {"email": "ana@example.com", "password": "Password1"}
+
+    first = client.post("/auth/login", json=credentials, headers=headers)
+    retry = client.post("/auth/login", json=credentials, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert REPLAYED_HEADER not in retry.headers
+    assert not any(
+        b"access_token" in stored.body
+        for _, stored in get_idempotency_backend()._entries.values()
+    )
+
+
+def test_anonymous_keys_are_scoped_per_client_and_body(client):
+    headers = {"Idempotency-Key": "registro"}
+    ana = client.post("/auth/register", headers=headers, json={
+        "nombre": "Ana", "email": "ana@example.com", "password": "Password1"
+    })
+    # Otro cliente anónimo con la misma clave no recibe la respuesta de Ana
+    luis = client.post("/auth/register", headers=headers, json={
+        "nombre": "Luis", "email": "luis@example.com", "password": "Password1"
+    })
+
+    assert ana.status_code == luis.status_code == 201
+    assert luis.json()["email"] == "luis@example.com"
+    assert REPLAYED_HEADER not in luis.headers
+
+
+def test_keys_are_scoped_per_user(client, room_id):
+    ana = {**make_user(client, "ana@example.com"), "Idempotency-Key": "misma"}
+    luis = {**make_user(client, "luis@example.com"), "Idempotency-Key": "misma"}
+
+    assert client.post("/reservations/", json=_booking(room_id, 10), headers=ana).status_code == 201
+    assert client.post("/reservations/", json=_booking(room_id, 11), headers=luis).status_code == 201
+    assert _count_reservations() == 2
+
+
+def test_overlong_key_is_rejected(client, room_id):
+    headers = {**make_user(client), "Idempotency-Key": "x" * 256}
+    response = client.post("/reservations/", json=_booking(room_id), headers=headers)
+    assert response.status_code == 400
+
+
+# El gestor sin la aplicación -->
+
+def _request(body: bytes = b"{}", key: str = "clave") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/reservations/",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", key.encode())],
+    }, receive)
+
+
+def test_concurrent_duplicates_run_the_handler_once():
+    manager = IdempotencyManager()
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return JSONResponse({"id": len(calls)}, status_code=201)
+
+    async def scenario():
+        return await asyncio.gather(*(manager.handle(_request(), handler) for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert {response.body for response in responses} == {b'{"id":1}'}
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 4
+
+
+def test_server_errors_are_not_stored():
+    manager = IdempotencyManager()
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) == 1:
+            return JSONResponse({"detail": "error"}, status_code=500)
+        return JSONResponse({"id": 1}, status_code=201)
+
+    first = asyncio.run(manager.handle(_request(), handler))
+    retry = asyncio.run(manager.handle(_request(), handler))
+
+    assert (first.status_code, retry.status_code) == (500, 201)
+    assert len(calls) == 2
+
+
+def test_duplicate_in_another_worker_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    manager = IdempotencyManager()
+    # Otro proceso tomó la clave y todavía no guardó la respuesta
+    request = _request()
+    scope = asyncio.run(manager._scope(request, "clave", manager._fingerprint(request, b"{}")))
+    assert get_idempotency_backend().acquire(scope, 60)
+
+    async def handler(request):
+        raise AssertionError("no debe ejecutarse")
+
+    start = time.monotonic()
+    with pytest.raises(IdempotencyRequestInProgressException):
+        asyncio.run(manager.handle(_request(), handler))
+    assert time.monotonic() - start >= 0.2
+
+
+def test_memory_backend_evicts_oldest_and_expired():
+    backend = InMemoryIdempotencyBackend(max_entries=2)
+    for key in ("a", "b", "c"):
+        backend.set(key, StoredResponse("f", 201, b"{}", []), ttl=60)
+    assert backend.get("a") is None
+    assert backend.get("c") is not None
+
+    backend.set("d", StoredResponse("f", 201, b"{}", []), ttl=-1)
+    assert backend.get("d") is None
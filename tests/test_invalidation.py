@@ -0,0 +1,119 @@
+# Pruebas del Bus de Invalidación
+
+import socket
+import threading
+import time
+from datetime import date
+
+from app.reservations.availability import AvailabilityIndex
+from app.utils.invalidation import (
+    InvalidationBackend, InvalidationBus, InMemoryPubSub, PubSubBackend, UnixSocketBackend
+)
+
+
+def _wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class _SlowBackend(InvalidationBackend):
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def publish(self, channel, key):
+        self.release.wait(2)
+        self.sent.append((channel, key))
+
+
+def _bus_with_inbox(backend):
+    bus = InvalidationBus(backend)
+    inbox = []
+    bus.subscribe("test", inbox.append)
+    return bus, inbox
+
+
+def test_publish_does_not_wait_for_the_backend():
+    backend = _SlowBackend()
+    bus, inbox = _bus_with_inbox(backend)
+    bus.start()
+    try:
+        start = time.perf_counter()
+        for key in ("a", "b", "c"):
+            bus.publish("test", key)
+        assert time.perf_counter() - start < 0.5
+        # Local de inmediato, al resto en orden cuando el backend responde
+        assert inbox == ["a", "b", "c"]
+        backend.release.set()
+        assert _wait_for(lambda: len(backend.sent) == 3)
+        assert backend.sent == [("test", "a"), ("test", "b"), ("test", "c")]
+    finally:
+        backend.release.set()
+        bus.stop()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    backend = _SlowBackend()
+    bus = InvalidationBus(backend, queue_size=1)
+    bus.start()
+    try:
+        for key in range(5):
+            bus.publish("test", str(key))
+        assert bus.dropped >= 3
+    finally:
+        backend.release.set()
+        bus.stop()
+
+
+def test_pubsub_listener_survives_bad_messages():
+    client = InMemoryPubSub()
+    sender, _ = _bus_with_inbox(PubSubBackend(client))
+    receiver, inbox = _bus_with_inbox(PubSubBackend(client))
+
+    def failing_handler(key):
+        raise RuntimeError("falla del suscriptor")
+
+    receiver.subscribe("test", failing_handler)
+    receiver.start()
+    try:
+        client.publish("cache-invalidation", b"no es json")
+        client.publish("cache-invalidation", b'{"k": "sin canal"}')
+        client.publish("cache-invalidation", b"[1, 2]")
+        sender.publish("test", "after")
+        assert _wait_for(lambda: inbox == ["after"])
+    finally:
+        receiver.stop()
+        client.close("cache-invalidation")
+
+
+def test_unix_listener_survives_bad_datagrams(tmp_path):
+    receiver, inbox = _bus_with_inbox(UnixSocketBackend(str(tmp_path)))
+    sender = InvalidationBus(UnixSocketBackend(str(tmp_path)))
+    receiver.start()
+    try:
+        raw = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        raw.sendto(b'{"c": "test"}', receiver.backend.path)
+        raw.close()
+        sender.publish("test", "after")
+        assert _wait_for(lambda: inbox == ["after"])
+    finally:
+        receiver.stop()
+
+
+def test_availability_ttl_recovers_a_lost_delta(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.reservations.availability.monotonic", lambda: clock[0])
+    index = AvailabilityIndex(ttl_seconds=60)
+    day = date(2030, 6, 3)
+    index._masks[(1, day)] = (index._expires_at(), 0b1)
+
+    assert index.peek(1, day) == 0b1
+    # Los deltas se aplican pero no renuevan el plazo
+    index.apply(1, day, occupied=0b10)
+    assert index.peek(1, day) == 0b11
+    clock[0] += 61
+    assert index.peek(1, day) is None
@@ -0,0 +1,197 @@
+# Pruebas del Despachador del Outbox
+
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.events.dispatcher import OutboxDispatcher, outbox_dispatcher
+from app.events.model import OutboxEvent
+from app.events.service import RESERVATION_RESCHEDULED, add_reservation_event
+from app.reservations.model import Reservation, ReservationStatus
+from app.utils.clock import FixedClock, get_clock, set_clock
+from app.utils.invalidation import (
+    CHANNEL_AVAILABILITY, CHANNEL_USER_HOURS, CHANNEL_USER_RESERVATIONS
+)
+from tests.conftest import engine, make_user
+
+NOW = datetime(2030, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def clock():
+    previous = get_clock()
+    fixed = FixedClock(NOW)
+    set_clock(fixed)
+    yield fixed
+    set_clock(previous)
+
+
+@pytest.fixture
+def dispatcher():
+    return OutboxDispatcher(sessionmaker(bind=engine), retry_base_seconds=5, lease_seconds=60)
+
+
+def _add_event(event_type: str = "reservation.created", **fields) -> int:
+    with Session(bind=engine) as db:
+        event = OutboxEvent(event_type=event_type, aggregate_id=1, payload={}, **fields)
+        db.add(event)
+        db.commit()
+        return event.id
+
+
+def _event(event_id: int) -> OutboxEvent:
+    with Session(bind=engine) as db:
+        return db.get(OutboxEvent, event_id)
+
+
+def test_events_without_handlers_are_not_marked(dispatcher):
+    event_id = _add_event()
+
+    assert asyncio.run(dispatcher.dispatch_once()) == 0
+    assert _event(event_id).dispatched_at is None
+
+
+def test_start_without_handlers_still_runs_retention(dispatcher, monkeypatch):
+    cleanups = []
+    monkeypatch.setattr(dispatcher, "cleanup", lambda: cleanups.append(1) or 0)
+
+    async def scenario():
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        running = dispatcher._task is not None
+        await dispatcher.stop()
+        return running
+
+    assert asyncio.run(scenario())
+    assert cleanups == [1]
+
+
+def test_only_handled_types_are_claimed(dispatcher, clock):
+    received = []
+    dispatcher.register("reservation.created", received.extend)
+    handled = _add_event("reservation.created")
+    unhandled = _add_event("reservation.cancelled")
+
+    assert asyncio.run(dispatcher.dispatch_once()) == 1
+    assert [event["id"] for event in received] == [handled]
+    assert _event(handled).dispatched_at is not None
+    assert _event(handled).claimed_until is None
+    assert _event(unhandled).dispatched_at is None
+
+
+def test_claim_is_committed_before_handlers_run(dispatcher, clock):
+    other = OutboxDispatcher(sessionmaker(bind=engine))
+    other.register("reservation.created", lambda events: None)
+    seen_by_other = []
+
+    def handler(events):
+        # Otro worker sondea mientras este consumidor corre: el evento está prestado
+        seen_by_other.extend(other._claim(["reservation.created"]))
+
+    dispatcher.register("reservation.created", handler)
+    _add_event()
+
+    assert asyncio.run(dispatcher.dispatch_once()) == 1
+    assert seen_by_other == []
+
+
+def test_expired_lease_makes_the_event_available_again(dispatcher, clock):
+    dispatcher.register("reservation.created", lambda events: None)
+    event_id = _add_event()
+
+    # Un worker lo reclamó y murió antes de terminar
+    assert len(dispatcher._claim(["reservation.created"])) == 1
+    assert dispatcher._claim(["reservation.created"]) == []
+    clock.advance(seconds=61)
+    assert [event["id"] for event in dispatcher._claim(["reservation.created"])] == [event_id]
+
+
+def test_failed_events_back_off_before_retrying(dispatcher, clock):
+    calls = []
+
+    def flaky(events):
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise RuntimeError("consumidor caído")
+
+    dispatcher.register("reservation.created", flaky)
+    event_id = _add_event()
+
+    asyncio.run(dispatcher.dispatch_once())
+    event = _event(event_id)
+    assert (event.attempts, event.dispatched_at) == (1, None)
+    assert "consumidor caído" in event.last_error
+
+    # Dentro de la espera no se reintenta
+    clock.advance(seconds=4)
+    assert asyncio.run(dispatcher.dispatch_once()) == 0
+    clock.advance(seconds=2)
+    assert asyncio.run(dispatcher.dispatch_once()) == 1
+    assert _event(event_id).dispatched_at is not None
+    assert calls == [1, 1]
+
+
+def test_retry_delay_is_exponential_and_capped(dispatcher):
+    dispatcher.retry_max_seconds = 30
+    assert [dispatcher.retry_delay(n) for n in (1, 2, 3, 4, 5)] == [5, 10, 20, 30, 30]
+
+
+def test_cleanup_removes_old_dispatched_and_dead_letters(dispatcher):
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    recent = datetime.now(timezone.utc) - timedelta(hours=1)
+    old_dispatched = _add_event(dispatched_at=old, created_at=old)
+    old_dead = _add_event(attempts=dispatcher.max_attempts, created_at=old)
+    recent_dispatched = _add_event(dispatched_at=recent)
+    old_pending = _add_event(created_at=old)
+
+    dispatcher.cleanup_batch_size = 1
+    assert dispatcher.cleanup() == 2
+    assert _event(old_dispatched) is None
+    assert _event(old_dead) is None
+    assert _event(recent_dispatched) is not None
+    assert _event(old_pending) is not None
+
+
+# Consumidores registrados -->
+
+def test_events_without_handlers_are_not_written(db, monkeypatch):
+    reservation = Reservation(
+        id=7, usuario_id=1, sala_id=1, fecha=date(2030, 6, 10),
+        hora_inicio=time(9), hora_fin=time(10), estado=ReservationStatus.CONFIRMADA
+    )
+    assert outbox_dispatcher.handles(RESERVATION_RESCHEDULED)
+    assert add_reservation_event(db, RESERVATION_RESCHEDULED, reservation) is not None
+
+    monkeypatch.setattr(outbox_dispatcher, "_handlers", defaultdict(list))
+    assert add_reservation_event(db, RESERVATION_RESCHEDULED, reservation) is None
+
+
+def test_consumers_republish_invalidations(client, monkeypatch):
+    admin = make_user(client, "admin@example.com", admin=True)
+    room = client.post("/rooms/", json={"nombre": "Sala A", "sede": "Centro", "capacidad": 4}, headers=admin)
+    headers = make_user(client)
+    fecha = get_clock().today() + timedelta(days=3)
+    created = client.post("/reservations/", headers=headers, json={
+        "sala_id": room.json()["id"], "fecha": fecha.isoformat(),
+        "hora_inicio": "10:00", "hora_fin": "11:00"
+    })
+    assert created.status_code == 201, created.text
+
+    published = []
+    monkeypatch.setattr(
+        "app.events.consumers.invalidation_bus.publish",
+        lambda channel, key: published.append((channel, key))
+    )
+    assert asyncio.run(outbox_dispatcher.dispatch_once()) == 1
+
+    sala_id, usuario_id = room.json()["id"], created.json()["usuario_id"]
+    assert sorted(published) == sorted([
+        (CHANNEL_AVAILABILITY, f"{sala_id}:{fecha.isoformat()}"),
+        (CHANNEL_USER_RESERVATIONS, str(usuario_id)),
+        (CHANNEL_USER_HOURS, str(usuario_id)),
+    ])
+    with Session(bind=engine) as session:
+        assert session.query(OutboxEvent).one().dispatched_at is not None
@@ -0,0 +1,101 @@
+# Pruebas de la Caché de Principals (identidad del usuario autenticado)
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+import app.utils.database as database
+from app.auth.model import User, UserRole
+from app.auth.principal import Principal, PrincipalCache, principal_cache
+from tests.conftest import engine, make_user
+
+
+@contextmanager
+def principal_loads():
+    """Cuenta las consultas de UserService._load_principal"""
+    loads = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement and "penalized_until" in statement:
+            loads.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield loads
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def _user_id(email: str) -> int:
+    with database.SessionLocal() as session:
+        return session.query(User.id).filter_by(email=email).scalar()
+
+
+def _principal(user_id: int = 1, rol: UserRole = UserRole.USER) -> Principal:
+    return Principal(user_id, "ana@example.com", rol, True)
+
+
+def test_cache_hit_and_stale_generation():
+    cache = PrincipalCache(ttl_seconds=60)
+    generation = cache.generation
+    cache.set(_principal(), generation)
+    assert cache.get(1).rol == UserRole.USER
+
+    # Una carga que empezó antes de una invalidación no se guarda
+    cache._on_message("1")
+    cache.set(_principal(rol=UserRole.ADMIN), generation)
+    assert cache.get(1) is None
+
+    cache.set(_principal(), cache.generation)
+    cache._on_message("*")
+    assert cache.get(1) is None
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.auth.principal.time.monotonic", lambda: clock[0])
+    cache = PrincipalCache(ttl_seconds=60)
+    cache.set(_principal(), cache.generation)
+
+    clock[0] += 61
+    assert cache.get(1) is None
+
+
+def test_authenticated_requests_reuse_the_cached_principal(client):
+    headers = make_user(client)
+    with principal_loads() as loads:
+        for _ in range(3):
+            assert client.get("/reservations/dashboard", headers=headers).status_code == 200
+    assert len(loads) == 1
+    assert principal_cache.get(_user_id("ana@example.com")) is not None
+
+
+def test_deactivated_user_stops_authenticating(client):
+    admin = make_user(client, "admin@example.com", admin=True)
+    headers = make_user(client)
+    user_id = _user_id("ana@example.com")
+    assert client.get("/reservations/dashboard", headers=headers).status_code == 200
+
+    response = client.patch(f"/auth/users/{user_id}/deactivate", headers=admin)
+    assert response.status_code == 200, response.text
+    assert principal_cache.get(user_id) is None
+
+    response = client.get("/reservations/dashboard", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Usuario inactivo"
+
+
+def test_role_change_applies_to_the_next_request(client):
+    admin = make_user(client, "admin@example.com", admin=True)
+    headers = make_user(client)
+    user_id = _user_id("ana@example.com")
+    assert client.get("/health/db", headers=headers).status_code == 403
+
+    response = client.put(f"/auth/users/{user_id}", headers=admin, json={"rol": "admin"})
+    assert response.status_code == 200, response.text
+    assert client.get("/health/db", headers=headers).status_code == 200
+
+    # Los cambios masivos vacían la caché entera
+    response = client.post("/auth/users/bulk/role", headers=admin, json={"ids": [user_id], "rol": "user"})
+    assert response.status_code == 200, response.text
+    assert client.get("/health/db", headers=headers).status_code == 403
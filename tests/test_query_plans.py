@@ -0,0 +1,84 @@
+# Planes de Ejecución de las Consultas Frecuentes (EXPLAIN)
+#
+# Cada consulta caliente debe buscar por su índice compuesto (SEARCH ...
+# USING COVERING INDEX), nunca recorrer la tabla. Las sentencias se capturan
+# de los servicios reales y se explican con los mismos parámetros.
+
+import asyncio
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.reservations.availability import AvailabilityIndex
+from app.reservations.expiry import ReservationExpiry
+from app.reservations.service import ReservationService
+from tests.conftest import engine
+
+DAY = date(2030, 6, 10)
+
+
+@contextmanager
+def captured_selects():
+    statements: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "reservations" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(statement: str, parameters) -> List[str]:
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def assert_uses_index(statements, index_name: str) -> None:
+    assert statements, "no se ejecutó ninguna consulta sobre reservations"
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        assert any(
+            step.startswith("SEARCH reservations USING COVERING INDEX " + index_name)
+            for step in plan
+        ), f"{index_name} no se usa: {plan}\n{statement}"
+        assert not any(step == "SCAN reservations" for step in plan), plan
+
+
+@pytest.fixture
+def db():
+    with Session(bind=engine) as session:
+        yield session
+
+
+def test_daily_quota_uses_user_day_index(db):
+    with captured_selects() as statements:
+        asyncio.run(ReservationService(db).count_user_reservations_for_day(1, DAY))
+    assert_uses_index(statements, "idx_reservations_usuario_fecha_estado")
+
+
+def test_slot_check_uses_room_day_index(db):
+    with captured_selects() as statements:
+        asyncio.run(ReservationService(db).is_slot_taken(1, DAY, datetime(2030, 6, 10, 10).time()))
+    assert_uses_index(statements, "idx_reservations_sala_fecha_estado")
+
+
+def test_room_occupancy_uses_room_day_index(db):
+    with captured_selects() as statements:
+        AvailabilityIndex().get_mask(db, 1, DAY)
+    assert_uses_index(statements, "idx_reservations_sala_fecha_estado")
+
+
+def test_pending_rebuild_uses_expiry_index():
+    expiry = ReservationExpiry(sessionmaker(bind=engine))
+    with captured_selects() as statements:
+        expiry._load_pending()
+    assert_uses_index(statements, "idx_reservations_estado_expira")
+
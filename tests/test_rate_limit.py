@@ -0,0 +1,103 @@
+# Pruebas de la Limitación de Peticiones (reservas, login y registro)
+
+import pytest
+
+from app.config.settings import settings
+from app.utils import rate_limit
+from tests.conftest import make_user
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    previous = rate_limit.get_rate_limit_backend()
+    rate_limit.set_rate_limit_backend(rate_limit.InMemoryRateLimitBackend())
+    yield
+    rate_limit.set_rate_limit_backend(previous)
+
+
+def _limit(monkeypatch, limiter, capacity: int, refill_rate: float = 0.001) -> None:
+    monkeypatch.setattr(limiter, "capacity", capacity)
+    monkeypatch.setattr(limiter, "refill_rate", refill_rate)
+
+
+@pytest.fixture
+def limits(monkeypatch, enabled):
+    _limit(monkeypatch, rate_limit.booking_ip_limiter, 2)
+
+
+def test_reads_do_not_consume_the_booking_limit(client, limits):
+    headers = make_user(client)
+    for _ in range(5):
+        assert client.get("/reservations/me", headers=headers).status_code == 200
+
+
+def test_writes_consume_the_booking_limit(client, limits):
+    headers = make_user(client)
+    body = {"sala_id": 999, "fecha": "2030-06-10", "hora_inicio": "10:00", "hora_fin": "11:00"}
+
+    statuses = [client.post("/reservations/", json=body, headers=headers).status_code for _ in range(3)]
+    assert statuses[-1] == 429
+    assert 429 not in statuses[:2]
+
+
+# Login y registro -->
+
+def _login(client, email: str, password: str = "incorrecta", **headers):
+    return client.post("/auth/login", json={"email": email, "password": password}, headers=headers)
+
+
+def _register(client, n: int, **headers):
+    return client.post(
+        "/auth/register",
+        json={"nombre": "Ana", "email": f"ana{n}@example.com", "password": "Password1"},
+        headers=headers
+    )
+
+
+def test_login_is_limited_per_account(client, monkeypatch, enabled):
+    make_user(client, "ana@example.com")
+    make_user(client, "luis@example.com")
+    # Los logins de make_user no cuentan
+    rate_limit.get_rate_limit_backend().reset()
+    _limit(monkeypatch, rate_limit.login_account_limiter, 2)
+
+    assert [_login(client, "ana@example.com").status_code for _ in range(2)] == [401, 401]
+    # El email se normaliza: mayúsculas y espacios son la misma cuenta
+    blocked = _login(client, " ANA@example.com ", "Password1")
+    assert blocked.status_code == 429
+    assert int(blocked.headers["retry-after"]) >= 1
+
+    # Otra cuenta desde la misma IP sigue pudiendo entrar
+    assert _login(client, "luis@example.com", "Password1").status_code == 200
+
+
+def test_login_is_limited_per_ip(client, monkeypatch, enabled):
+    _limit(monkeypatch, rate_limit.login_ip_limiter, 3)
+    statuses = [_login(client, f"nadie{n}@example.com").status_code for n in range(4)]
+    assert statuses == [401, 401, 401, 429]
+
+
+def test_register_is_limited_per_ip(client, monkeypatch, enabled):
+    _limit(monkeypatch, rate_limit.register_ip_limiter, 2)
+    assert [_register(client, n).status_code for n in range(3)] == [201, 201, 429]
+
+
+def test_retry_after_is_the_wait_for_the_next_token(client, monkeypatch, enabled):
+    # Un token cada 4 s: tras agotar el bucket hay que esperar 4 s
+    _limit(monkeypatch, rate_limit.register_ip_limiter, 1, refill_rate=0.25)
+    assert _register(client, 1).status_code == 201
+
+    response = _register(client, 2)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "4"
+
+
+def test_forwarded_for_is_only_trusted_behind_a_proxy(client, monkeypatch, enabled):
+    _limit(monkeypatch, rate_limit.register_ip_limiter, 1)
+    assert _register(client, 1, **{"X-Forwarded-For": "203.0.113.1"}).status_code == 201
+    assert _register(client, 2, **{"X-Forwarded-For": "203.0.113.2"}).status_code == 429
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_PROXY", True)
+    assert _register(client, 3, **{"X-Forwarded-For": "203.0.113.3"}).status_code == 201
+    assert _register(client, 4, **{"X-Forwarded-For": "203.0.113.3"}).status_code == 429
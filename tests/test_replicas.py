@@ -0,0 +1,144 @@
+# Pruebas de las Réplicas de Lectura (dos bases SQLite: primario y réplica)
+
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import insert, text
+
+import app.utils.database as database
+import app.utils.security as security
+from app.auth.model import User
+from app.utils.database import Base, ReplicaRouter
+from tests.conftest import make_engine, make_user
+
+
+@pytest.fixture
+def replica():
+    replica_engine = make_engine(os.path.join(tempfile.mkdtemp(prefix="gestor-replica-"), "replica.db"))
+    Base.metadata.create_all(replica_engine)
+    yield replica_engine
+    replica_engine.dispose()
+
+
+@pytest.fixture
+def broken_replica():
+    # El directorio no existe: cada conexión falla como una réplica caída
+    broken = make_engine(os.path.join(tempfile.mkdtemp(prefix="gestor-replica-"), "caida", "replica.db"))
+    yield broken
+    broken.dispose()
+
+
+@pytest.fixture
+def routed(monkeypatch, replica):
+    """Activa una réplica para get_db/get_read_db como si viniera de DB_REPLICA_HOSTS"""
+    router = ReplicaRouter(database.engine, [replica], retry_seconds=30)
+    monkeypatch.setattr(database, "replica_engines", [replica])
+    monkeypatch.setattr(database, "replica_router", router)
+    # Los pines llegan por el bus a la instancia global: vaciarlos al terminar
+    monkeypatch.setattr(database.primary_pins, "_pins", {})
+    return router
+
+
+def _read_one(bind) -> int:
+    with database.SessionLocal(bind=bind) as session:
+        return session.execute(text("SELECT 1")).scalar()
+
+
+def test_failed_replica_leaves_rotation_and_reads_go_to_primary(broken_replica):
+    router = ReplicaRouter(database.engine, [broken_replica], retry_seconds=30)
+
+    assert router.choose() is broken_replica
+    with pytest.raises(Exception):
+        _read_one(router.choose())
+
+    # El error de conexión la sacó de rotación: el primario atiende
+    assert router.choose() is database.engine
+    assert _read_one(router.choose()) == 1
+
+
+def test_healthy_replica_keeps_serving_when_another_fails(replica, broken_replica):
+    router = ReplicaRouter(database.engine, [broken_replica, replica], retry_seconds=30)
+
+    with pytest.raises(Exception):
+        _read_one(router.choose())
+
+    assert [router.choose() for _ in range(3)] == [replica] * 3
+
+
+def test_replica_returns_to_rotation_after_retry_window(broken_replica):
+    router = ReplicaRouter(database.engine, [broken_replica], retry_seconds=0)
+
+    with pytest.raises(Exception):
+        _read_one(router.choose())
+
+    assert router.choose() is broken_replica
+
+
+def test_reads_use_replica_until_the_user_writes(client, replica, routed):
+    headers = make_user(client)
+    # Copia atrasada del usuario en la réplica
+    with database.SessionLocal() as session:
+        user = session.query(User).filter_by(email="ana@example.com").one()
+        row = {c.name: getattr(user, c.name) for c in User.__table__.columns}
+    with replica.begin() as conn:
+        conn.execute(insert(User.__table__), [{**row, "nombre": "Ana Réplica"}])
+
+    assert client.get("/auth/me", headers=headers).json()["nombre"] == "Ana Réplica"
+
+    # Tras escribir, el usuario lee del primario (read-your-writes)
+    response = client.put("/auth/me", headers=headers, json={"nombre": "Ana Primario"})
+    assert response.status_code == 200, response.text
+    assert client.get("/auth/me", headers=headers).json()["nombre"] == "Ana Primario"
+
+
+def test_reads_fall_back_to_primary_when_replica_is_down(client, broken_replica, monkeypatch):
+    headers = make_user(client)
+    router = ReplicaRouter(database.engine, [broken_replica], retry_seconds=30)
+    monkeypatch.setattr(database, "replica_engines", [broken_replica])
+    monkeypatch.setattr(database, "replica_router", router)
+    router.mark_down(broken_replica)
+
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "ana@example.com"
+
+
+def test_dashboard_is_built_from_the_primary(client, replica, routed):
+    headers = make_user(client)
+    with database.SessionLocal() as session:
+        user = session.query(User).filter_by(email="ana@example.com").one()
+        row = {c.name: getattr(user, c.name) for c in User.__table__.columns}
+    with replica.begin() as conn:
+        conn.execute(insert(User.__table__), [row])
+        # La réplica tiene una reserva cancelada que el primario no tiene
+        conn.execute(text(
+            "INSERT INTO rooms (id, nombre, sede, capacidad, recursos_mask, is_active) "
+            "VALUES (1, 'Sala A', 'Centro', 4, 0, 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO reservations (usuario_id, sala_id, fecha, hora_inicio, hora_fin, estado) "
+            f"VALUES ({row['id']}, 1, '2030-06-10', '09:00:00', '10:00:00', 'CANCELADA')"
+        ))
+
+    response = client.get("/reservations/dashboard", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["cancelled_reservations_count"] == 0
+
+
+def test_token_is_verified_once_per_request(client, routed, monkeypatch):
+    headers = {**make_user(client), "Idempotency-Key": "perfil-1"}
+    calls = []
+    verify_token = security.verify_token
+
+    def counting_verify_token(token):
+        calls.append(token)
+        return verify_token(token)
+
+    monkeypatch.setattr(security, "verify_token", counting_verify_token)
+
+    # get_current_user, get_db (pin tras escribir) e idempotencia leen el mismo token
+    response = client.put("/auth/me", headers=headers, json={"nombre": "Ana Primario"})
+    assert response.status_code == 200, response.text
+    assert len(calls) == 1
+    assert database.primary_pins.is_pinned(str(response.json()["id"]))
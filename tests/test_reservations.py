@@ -0,0 +1,130 @@
+# Pruebas de Reservas (horarios liberados por cancelación o vencimiento)
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.utils.database as database
+from app.reservations.model import Reservation, ReservationStatus
+from app.utils.clock import FixedClock, get_clock, set_clock
+from tests.conftest import make_user
+
+
+def _slot(days=3, hour=10) -> dict:
+    fecha = get_clock().today() + timedelta(days=days)
+    return {
+        "fecha": fecha.isoformat(),
+        "hora_inicio": f"{hour:02d}:00",
+        "hora_fin": f"{hour + 1:02d}:00"
+    }
+
+
+@pytest.fixture
+def room_id(client):
+    admin = make_user(client, "admin@example.com", admin=True)
+    response = client.post(
+        "/rooms/",
+        json={"nombre": "Sala Norte", "sede": "Centro", "capacidad": 6},
+        headers=admin
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _book(client, headers, room_id, **slot):
+    return client.post("/reservations/", json={"sala_id": room_id, **_slot(**slot)}, headers=headers)
+
+
+def _set_estado(reservation_id: int, estado: ReservationStatus) -> None:
+    session = database.SessionLocal()
+    session.get(Reservation, reservation_id).estado = estado
+    session.commit()
+    session.close()
+
+
+def test_slot_taken_while_active(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = make_user(client, "luis@example.com")
+
+    assert _book(client, ana, room_id).status_code == 201
+    assert _book(client, luis, room_id).status_code == 409
+
+
+def test_cancelled_slot_can_be_booked_again(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = make_user(client, "luis@example.com")
+
+    reservation = _book(client, ana, room_id).json()
+    response = client.patch(f"/reservations/{reservation['id']}/cancel", headers=ana)
+    assert response.status_code == 200, response.text
+
+    response = _book(client, luis, room_id)
+    assert response.status_code == 201, response.text
+
+
+def test_expired_slot_can_be_booked_again(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = make_user(client, "luis@example.com")
+
+    reservation = _book(client, ana, room_id).json()
+    _set_estado(reservation["id"], ReservationStatus.EXPIRADA)
+    # Dos veces: varias filas inactivas pueden compartir el horario
+    for headers in (luis, ana):
+        response = _book(client, headers, room_id)
+        assert response.status_code == 201, response.text
+        _set_estado(response.json()["id"], ReservationStatus.EXPIRADA)
+
+
+def test_reschedule_into_expired_slot(client, room_id):
+    ana = make_user(client, "ana@example.com")
+    luis = make_user(client, "luis@example.com")
+
+    expired = _book(client, ana, room_id, hour=10).json()
+    _set_estado(expired["id"], ReservationStatus.EXPIRADA)
+    moving = _book(client, luis, room_id, hour=14).json()
+
+    response = client.patch(
+        f"/reservations/{moving['id']}",
+        json=_slot(hour=10),
+        headers=luis
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["hora_inicio"] == "10:00:00"
+
+
+@pytest.fixture
+def bogota_clock():
+    # 02:00 UTC del 10 de junio: en Bogotá todavía es el 9 de junio
+    clock = FixedClock(
+        datetime(2030, 6, 10, 2, 0, tzinfo=timezone.utc),
+        sede_timezones={"Campus Norte": "America/Bogota"}
+    )
+    previous = get_clock()
+    set_clock(clock)
+    yield clock
+    set_clock(previous)
+
+
+def test_booking_dates_use_the_room_timezone(client, bogota_clock):
+    admin = make_user(client, "admin@example.com", admin=True)
+    ana = make_user(client, "ana@example.com")
+    room = client.post(
+        "/rooms/",
+        json={"nombre": "Sala Sur", "sede": "Campus Norte", "capacidad": 4},
+        headers=admin
+    ).json()
+
+    def book(fecha):
+        return client.post(
+            "/reservations/",
+            json={"sala_id": room["id"], "fecha": fecha, "hora_inicio": "10:00", "hora_fin": "11:00"},
+            headers=ana
+        )
+
+    # "Hoy" en la sede, aunque en UTC ya sea mañana
+    assert book("2030-06-09").status_code == 201
+    assert book("2030-06-08").status_code == 400
+    assert book("2030-07-09").status_code == 201
+    response = book("2030-07-10")
+    assert response.status_code == 400
+    assert "anticipación" in response.json()["detail"]
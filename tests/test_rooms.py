@@ -0,0 +1,107 @@
+# Pruebas de las Salas (recursos como máscara de bits)
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.rooms.model import Room
+from app.rooms.resources import names_to_mask
+from app.rooms.schemas import RoomUpdate
+from tests.conftest import engine, make_user
+
+
+def test_has_recursos_matches_rooms_with_every_requested_resource():
+    with Session(bind=engine) as session:
+        session.add_all([
+            Room(nombre="Sala A", sede="Centro", capacidad=4, recursos={"wifi": True, "tv": True}),
+            Room(nombre="Sala B", sede="Centro", capacidad=4, recursos={"wifi": True, "tv": False}),
+            Room(nombre="Sala C", sede="Centro", capacidad=4, recursos={}),
+        ])
+        session.commit()
+
+        required = names_to_mask(["wifi", "tv"])
+        rooms = session.query(Room).filter(Room.is_active, Room.has_recursos(required)).all()
+        assert [room.nombre for room in rooms] == ["Sala A"]
+        assert session.query(Room).filter(Room.has_recursos(0)).count() == 3
+
+
+def test_update_rejects_unknown_resources():
+    assert RoomUpdate(recursos={"wifi": True}).recursos == {"wifi": True}
+    assert RoomUpdate().recursos is None
+    with pytest.raises(ValidationError, match="jacuzzi"):
+        RoomUpdate(recursos={"wifi": True, "jacuzzi": True})
+
+
+# Endpoints de salas -->
+
+def _mask(room_id: int) -> int:
+    with Session(bind=engine) as session:
+        return session.get(Room, room_id).recursos_mask
+
+
+@pytest.fixture
+def admin(client):
+    return make_user(client, "admin@example.com", admin=True)
+
+
+def test_create_and_update_keep_recursos_mask_in_sync(client, admin):
+    response = client.post("/rooms/", headers=admin, json={
+        "nombre": "sala norte", "sede": "centro", "capacidad": 6,
+        "recursos": {"proyector": True, "wifi": True, "tv": False}
+    })
+    assert response.status_code == 201, response.text
+    room = response.json()
+    assert (room["nombre"], room["sede"]) == ("Sala Norte", "Centro")
+    assert _mask(room["id"]) == names_to_mask(["proyector", "wifi"])
+
+    response = client.put(f"/rooms/{room['id']}", headers=admin, json={"recursos": {"tv": True}})
+    assert response.status_code == 200, response.text
+    assert response.json()["recursos"] == {"tv": True}
+    assert _mask(room["id"]) == names_to_mask(["tv"])
+
+    # Un cambio sin recursos no toca la máscara
+    client.put(f"/rooms/{room['id']}", headers=admin, json={"capacidad": 8})
+    assert _mask(room["id"]) == names_to_mask(["tv"])
+
+    listed = client.get("/rooms/", params={"recursos": "tv"}).json()
+    assert [r["id"] for r in listed] == [room["id"]]
+    assert client.get("/rooms/", params={"recursos": "proyector"}).json() == []
+
+
+def test_unknown_resources_are_rejected(client, admin):
+    created = client.post("/rooms/", headers=admin, json={
+        "nombre": "Sala Sur", "sede": "Centro", "capacidad": 4, "recursos": {"jacuzzi": True}
+    })
+    assert created.status_code == 422
+
+    room = client.post("/rooms/", headers=admin, json={"nombre": "Sala Sur", "sede": "Centro", "capacidad": 4})
+    updated = client.put(f"/rooms/{room.json()['id']}", headers=admin, json={"recursos": {"jacuzzi": True}})
+    assert updated.status_code == 422
+    assert client.get("/rooms/", params={"recursos": "jacuzzi"}).status_code == 400
+
+
+def test_only_admins_write_rooms(client):
+    user = make_user(client)
+    response = client.post("/rooms/", headers=user, json={"nombre": "Sala Sur", "sede": "Centro", "capacidad": 4})
+    assert response.status_code == 403
+
+
+def test_if_none_match_returns_304_until_the_room_changes(client, admin):
+    room = client.post("/rooms/", headers=admin, json={"nombre": "Sala Sur", "sede": "Centro", "capacidad": 4}).json()
+
+    first = client.get(f"/rooms/{room['id']}")
+    etag = first.headers["etag"]
+    cached = client.get(f"/rooms/{room['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    listing = client.get("/rooms/")
+    assert client.get("/rooms/", headers={"If-None-Match": listing.headers["etag"]}).status_code == 304
+
+    client.put(f"/rooms/{room['id']}", headers=admin, json={"capacidad": 9})
+    changed = client.get(f"/rooms/{room['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["capacidad"] == 9
+    assert changed.headers["etag"] != etag
+    assert client.get("/rooms/", headers={"If-None-Match": listing.headers["etag"]}).status_code == 200
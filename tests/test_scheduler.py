@@ -0,0 +1,110 @@
+# Pruebas del Planificador de Temporizadores
+
+import asyncio
+import time
+
+from app.utils.scheduler import TimerScheduler
+
+
+async def _noop(keys):
+    pass
+
+
+def _collector():
+    batches = []
+
+    async def callback(keys):
+        batches.append(list(keys))
+
+    return batches, callback
+
+
+def test_due_keys_come_out_in_deadline_order():
+    scheduler = TimerScheduler(_noop)
+    scheduler.schedule("c", 3)
+    scheduler.schedule("a", 1)
+    scheduler.schedule("b", 2)
+
+    now = time.monotonic()
+    assert scheduler._pop_due(now + 2.5) == ["a", "b"]
+    assert len(scheduler) == 1
+    assert scheduler._pop_due(now + 10) == ["c"]
+
+
+def test_cancelled_and_rescheduled_entries_are_skipped():
+    scheduler = TimerScheduler(_noop)
+    scheduler.schedule("a", 1)
+    scheduler.schedule("b", 1)
+    scheduler.schedule("b", 5)
+    assert scheduler.cancel("a")
+    assert not scheduler.cancel("a")
+
+    now = time.monotonic()
+    assert scheduler._pop_due(now + 2) == []
+    assert scheduler._pop_due(now + 6) == ["b"]
+
+
+def test_heap_is_compacted_when_stale_entries_dominate():
+    scheduler = TimerScheduler(_noop)
+    for n in range(3000):
+        scheduler.schedule(n, 60)
+    for n in range(2990):
+        scheduler.cancel(n)
+
+    scheduler._pop_due(time.monotonic())
+    assert len(scheduler._heap) == len(scheduler) == 10
+
+
+def test_expired_keys_are_delivered_in_batches():
+    batches, callback = _collector()
+    scheduler = TimerScheduler(callback, resolution=0.01, batch_size=2)
+
+    async def scenario():
+        for key in range(5):
+            scheduler.schedule(key, 0)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert batches == [[0, 1], [2, 3], [4]]
+    assert scheduler.fired == 5
+
+
+def test_earlier_deadline_wakes_the_sleeping_task():
+    batches, callback = _collector()
+    scheduler = TimerScheduler(callback, resolution=0.01)
+
+    async def scenario():
+        scheduler.schedule("tarde", 60)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.schedule("pronto", 0)
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert batches == [["pronto"]]
+    assert len(scheduler) == 1
+
+
+def test_failed_batch_is_retried():
+    attempts = []
+
+    async def flaky(keys):
+        attempts.append(list(keys))
+        if len(attempts) == 1:
+            raise RuntimeError("base de datos caída")
+
+    scheduler = TimerScheduler(flaky, resolution=0.01, retry_delay=0.05)
+
+    async def scenario():
+        scheduler.schedule("a", 0)
+        scheduler.start()
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert attempts == [["a"], ["a"]]
+    assert scheduler.failed_batches == 1
+    assert scheduler.fired == 1
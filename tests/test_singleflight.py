@@ -0,0 +1,106 @@
+# Pruebas de single_flight (agrupación de lecturas simultáneas)
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.auth.model import User, UserRole
+from app.auth.service import UserService
+from app.utils.database import Base
+from app.utils.singleflight import single_flight
+from tests.conftest import engine, make_engine
+
+
+class _FakeSession:
+    def __init__(self, bind):
+        self.bind = bind
+
+    def get_bind(self):
+        return self.bind
+
+
+class _SlowService:
+    """Servicio de prueba: la lectura espera a `release` antes de terminar"""
+
+    executions = []
+    release = threading.Event()
+
+    def __init__(self, bind):
+        self.db = _FakeSession(bind)
+
+    @single_flight("tests.slow")
+    def load(self, key):
+        self.executions.append(self.db.bind)
+        self.release.wait(5)
+        return f"{key}@{self.db.bind}"
+
+
+@pytest.fixture(autouse=True)
+def _reset_slow_service():
+    _SlowService.executions = []
+    _SlowService.release = threading.Event()
+    yield
+    _SlowService.release.set()
+
+
+async def _gather_while_blocked(*calls):
+    tasks = [asyncio.create_task(call) for call in calls]
+    # Deja que todas las llamadas lleguen al grupo antes de liberar la primera
+    await asyncio.sleep(0.05)
+    _SlowService.release.set()
+    return await asyncio.gather(*tasks)
+
+
+def test_same_bind_shares_execution():
+    results = asyncio.run(_gather_while_blocked(
+        _SlowService("primary").load(1),
+        _SlowService("primary").load(1)
+    ))
+
+    assert results == ["1@primary", "1@primary"]
+    assert _SlowService.executions == ["primary"]
+
+
+def test_different_binds_never_share():
+    results = asyncio.run(_gather_while_blocked(
+        _SlowService("replica").load(1),
+        _SlowService("primary").load(1)
+    ))
+
+    assert results == ["1@replica", "1@primary"]
+    assert sorted(_SlowService.executions) == ["primary", "replica"]
+
+
+def test_pinned_read_does_not_join_stale_replica_read():
+    replica = make_engine()
+    Base.metadata.create_all(replica)
+    for bind, rol in ((engine, UserRole.ADMIN), (replica, UserRole.USER)):
+        with Session(bind=bind) as session:
+            session.add(User(id=1, nombre="Ana", email="ana@example.com", contraseña_hash="x", rol=rol))
+            session.commit()
+
+    entered, release = threading.Event(), threading.Event()
+
+    @event.listens_for(replica, "before_cursor_execute")
+    def _stall(*args):
+        entered.set()
+        release.wait(5)
+
+    async def scenario():
+        with Session(bind=replica) as replica_db, Session(bind=engine) as primary_db:
+            replica_read = asyncio.create_task(UserService(replica_db).get_user_by_id(1))
+            await asyncio.to_thread(entered.wait, 5)
+            # La réplica sigue consultando: el primario no debe esperar su resultado
+            primary_user = await asyncio.wait_for(UserService(primary_db).get_user_by_id(1), 2)
+            release.set()
+            replica_user = await replica_read
+            return primary_user.rol, replica_user.rol
+
+    try:
+        assert asyncio.run(scenario()) == (UserRole.ADMIN, UserRole.USER)
+    finally:
+        release.set()
+        replica.dispose()
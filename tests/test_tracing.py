@@ -0,0 +1,101 @@
+# Pruebas de las Trazas (W3C traceparent, spans de la petición y de SQL)
+
+import pytest
+
+from app.utils.tracing import (
+    KIND_CLIENT, KIND_SERVER, TRACE_ID_HEADER, InMemorySpanExporter, Span,
+    install_sql_tracing, parse_traceparent, tracer
+)
+from tests.conftest import engine
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _sql_spans():
+    # El engine de las pruebas no pasa por database._create_engine
+    install_sql_tracing(engine)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    return exporter
+
+
+def _finished(exporter):
+    tracer.flush()
+    return exporter.get_finished_spans()
+
+
+@pytest.mark.parametrize("value, expected", [
+    (f"00-{TRACE_ID}-{PARENT_ID}-01", (TRACE_ID, PARENT_ID, True)),
+    (f" 00-{TRACE_ID.upper()}-{PARENT_ID}-00 ", (TRACE_ID, PARENT_ID, False)),
+])
+def test_parse_valid_traceparent(value, expected):
+    assert parse_traceparent(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "",
+    f"ff-{TRACE_ID}-{PARENT_ID}-01",       # versión prohibida
+    f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",  # trace id corto
+    f"00-{'0' * 32}-{PARENT_ID}-01",       # trace id nulo
+    f"00-{TRACE_ID}-{'0' * 16}-01",        # span id nulo
+    f"00-{TRACE_ID}-{PARENT_ID}-zz",       # flags no hexadecimales
+    f"00-{TRACE_ID}-{PARENT_ID}",
+])
+def test_parse_invalid_traceparent(value):
+    assert parse_traceparent(value) is None
+
+
+def test_sampled_request_has_server_root_and_query_children(client, exporter):
+    response = client.post(
+        "/auth/register",
+        json={"nombre": "Ana", "email": "ana@example.com", "password": "Password1"}
+    )
+    assert response.status_code == 201
+
+    spans = _finished(exporter)
+    roots = [span for span in spans if span.parent_id is None]
+    assert len(roots) == 1
+    root = roots[0]
+    assert (root.kind, root.name) == (KIND_SERVER, "POST /auth/register")
+    assert root.attributes["http.response.status_code"] == 201
+    assert response.headers[TRACE_ID_HEADER] == root.trace.trace_id
+
+    queries = [span for span in spans if span.name == "db.query"]
+    assert queries
+    assert all(span.kind == KIND_CLIENT and span.trace is root.trace for span in queries)
+    assert {span.parent_id for span in spans if span is not root} <= {span.span_id for span in spans}
+    assert any("INSERT INTO users" in span.attributes["db.statement"] for span in queries)
+
+
+def test_incoming_traceparent_is_continued(client, exporter):
+    response = client.get("/health", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    assert response.headers[TRACE_ID_HEADER] == TRACE_ID
+    [root] = _finished(exporter)
+    assert (root.trace.trace_id, root.parent_id) == (TRACE_ID, PARENT_ID)
+
+
+def test_caller_decision_not_to_sample_is_respected(client, exporter):
+    response = client.get("/health", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+
+    assert TRACE_ID_HEADER not in response.headers
+    assert _finished(exporter) == []
+
+
+def test_child_ending_after_the_root_is_counted_not_exported(exporter):
+    late_spans = tracer.late_spans
+    root = tracer.start_trace("GET /lento")
+    child = Span(root.trace, "tarea", root.span_id)
+
+    root.end()
+    child.end()
+
+    assert _finished(exporter) == [root]
+    assert tracer.late_spans == late_spans + 1
@@ -0,0 +1,144 @@
+# Pruebas del Índice de Horas por Usuario
+
+import asyncio
+import threading
+from time import sleep
+from datetime import date, time
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.auth.model import User
+from app.reports.service import ReportService
+from app.reports.user_hours import UserHoursIndex
+from app.reservations.model import Reservation, ReservationStatus
+from app.rooms.model import Room
+from tests.conftest import engine
+
+JUNE = (date(2030, 6, 1), date(2030, 6, 30))
+
+
+@pytest.fixture
+def session():
+    with Session(bind=engine) as db:
+        db.add(User(id=1, nombre="Ana", email="ana@example.com", contraseña_hash="x"))
+        db.add(Room(id=1, nombre="Sala A", sede="Centro", capacidad=4, recursos={}))
+        db.commit()
+        yield db
+
+
+def _confirm(db: Session, fecha: date, hour: int) -> None:
+    db.add(Reservation(
+        usuario_id=1, sala_id=1, fecha=fecha,
+        hora_inicio=time(hour), hora_fin=time(hour + 1),
+        estado=ReservationStatus.CONFIRMADA
+    ))
+    db.commit()
+
+
+def test_loads_from_session_factory_and_applies_deltas(session):
+    _confirm(session, date(2030, 6, 3), 9)
+    index = UserHoursIndex(sessionmaker(bind=engine))
+    assert index.hours(1, *JUNE) == 1
+
+    index.apply(1, date(2030, 6, 4), 1)
+    assert index.hours(1, *JUNE) == 2
+    assert index.top_users(*JUNE, limit=5) == [(1, 2)]
+
+
+def test_rebuild_recovers_a_lost_delta(session, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.reports.user_hours.time.monotonic", lambda: clock[0])
+    index = UserHoursIndex(sessionmaker(bind=engine), rebuild_seconds=60)
+    assert index.hours(1, *JUNE) == 0
+
+    # Reserva confirmada cuyo delta nunca llegó a este worker
+    _confirm(session, date(2030, 6, 10), 11)
+    assert index.hours(1, *JUNE) == 0
+
+    clock[0] += 61
+    assert index.hours(1, *JUNE) == 1
+
+
+def test_load_started_before_a_change_is_not_kept(session):
+    _confirm(session, date(2030, 6, 3), 9)
+    index = UserHoursIndex(sessionmaker(bind=engine))
+    query = index._query
+
+    def query_then_change():
+        users = query()
+        # Llega un delta mientras la consulta está en curso
+        index.apply(1, date(2030, 6, 5), 1)
+        return users
+
+    index._query = query_then_change
+    index.hours(1, *JUNE)
+    assert index._users is None
+
+    index._query = query
+    assert index.hours(1, *JUNE) == 1
+
+
+def test_concurrent_first_loads_query_once(session):
+    _confirm(session, date(2030, 6, 3), 9)
+    index = UserHoursIndex(sessionmaker(bind=engine))
+    query, calls = index._query, []
+
+    def slow_query():
+        calls.append(1)
+        sleep(0.05)
+        return query()
+
+    index._query = slow_query
+    threads = [threading.Thread(target=index.hours, args=(1, *JUNE)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert index.hours(1, *JUNE) == 1
+
+
+def test_report_loads_the_index_off_the_event_loop(session, monkeypatch):
+    _confirm(session, date(2030, 6, 3), 9)
+    index = UserHoursIndex(sessionmaker(bind=engine))
+    query, threads = index._query, []
+
+    def recording_query():
+        threads.append(threading.get_ident())
+        return query()
+
+    index._query = recording_query
+    monkeypatch.setattr("app.reports.service.user_hours_index", index)
+
+    report = asyncio.run(ReportService(session).get_user_hours(1, *JUNE))
+    assert report.horas == 1
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_refresh_reloads_only_the_marked_user(session):
+    session.add(User(id=2, nombre="Luis", email="luis@example.com", contraseña_hash="x"))
+    session.commit()
+    _confirm(session, date(2030, 6, 3), 9)
+    index = UserHoursIndex(sessionmaker(bind=engine))
+    assert index.hours(1, *JUNE) == 1
+
+    # Delta perdido y un delta local que la base no respalda
+    _confirm(session, date(2030, 6, 4), 9)
+    index.apply(2, date(2030, 6, 4), 5)
+    query, calls = index._query, []
+
+    def recording_query(user_ids=None):
+        calls.append(user_ids)
+        return query(user_ids)
+
+    index._query = recording_query
+    index.refresh(1)
+    assert index.hours(1, *JUNE) == 2
+    assert index.hours(2, *JUNE) == 5
+    assert calls == [{1}]
+
+    index.refresh(2)
+    assert index.hours(2, *JUNE) == 0
+    assert 2 not in index._users